@@ -0,0 +1,153 @@
+"""
+Derslik kullanım ve kapasite israfı analizi
+
+Program öğeleri derslik x gün x ders saati biçiminde bir doluluk matrisine
+(dolu dakika) NumPy ile tek seferde dökülür; kullanım oranı, en yoğun saatler,
+boş bloklar ve kapasite israfı bu matris üzerinden vektörel hesaplanır.
+Veriler ORM nesneleri yerine bellekteki doluluk indeksinden ve tek bir sütun
+sorgusundan alınır; sonuç veri sürümü ve şube mevcuduna göre önbelleğe alınır.
+
+Derslik talebi olarak (öğrenci sayısı tutulmadığı için) program oluşturma
+motorundaki beklenen şube mevcudu kullanılır.
+"""
+import numpy as np
+import pandas as pd
+
+from models import db, Classroom, DAYS, minutes_to_time
+from occupancy import schedule_index
+from timetable import DAY_BLOCKS, DEFAULT_GROUP_SIZE, PERIOD_MINUTES, PERIODS
+from versioning import VersionedCache
+
+# Bu kullanım oranının (%) altındaki derslikler az kullanılan sayılır
+UNDERUSED_PERCENT = 25
+
+# Analiz sonuçlarının veri sürümü ve şube mevcuduna göre önbelleği
+_analytics_cache = VersionedCache(maxsize=8)
+
+
+def occupancy_matrix(rooms, placements):
+    """
+    Derslik x gün x ders saati doluluk matrisini (dolu dakika) oluşturur
+    :param rooms: id sütunlu DataFrame (satır sırası matrisin ilk eksenidir)
+    :param placements: Placement listesi
+    :return: (matris, derslik bazında oturum sayısı)
+    """
+    matrix = np.zeros((len(rooms), len(DAYS), len(PERIODS)))
+    sessions = np.zeros(len(rooms), dtype=int)
+    if not placements or rooms.empty:
+        return matrix, sessions
+
+    frame = pd.DataFrame(placements, columns=placements[0]._fields)
+    frame['room'] = frame['classroom_id'].map(pd.Series(np.arange(len(rooms)), index=rooms['id']))
+    frame['day_no'] = frame['day'].map({day: i for i, day in enumerate(DAYS)})
+    frame = frame.dropna(subset=['room', 'day_no'])
+    room = frame['room'].to_numpy(dtype=int)
+    day = frame['day_no'].to_numpy(dtype=int)
+
+    # Her öğenin her ders saatiyle kesişen dakikaları (öğe x ders saati)
+    period_start = np.array([period[0] for period in PERIODS])
+    period_end = np.array([period[1] for period in PERIODS])
+    start = frame['start'].to_numpy()[:, None]
+    end = frame['end'].to_numpy()[:, None]
+    overlap = np.clip(np.minimum(end, period_end) - np.maximum(start, period_start), 0, None)
+
+    np.add.at(matrix, (room, day), overlap)
+    np.add.at(sessions, room, 1)
+    # Çakışan kayıtlar ders saatini %100'ün üzerine çıkarmasın
+    return np.minimum(matrix, PERIOD_MINUTES), sessions
+
+
+def idle_blocks(occupied):
+    """
+    Gün blokları (öğleden önce / sonra) içindeki kesintisiz boş ders saati dizilerini sayar
+    :param occupied: Derslik x gün x ders saati bool matrisi
+    :return: Derslik bazında boş blok sayısı
+    """
+    free = ~occupied
+    previous_free = np.zeros_like(free)
+    previous_free[:, :, 1:] = free[:, :, :-1]
+    # Blok başındaki ders saati, önceki bloğun son saatine bağlı değildir
+    block_start = np.array([index == 0 or PERIODS[index - 1][2] != period[2]
+                            for index, period in enumerate(PERIODS)])
+    previous_free[:, :, block_start] = False
+    return (free & ~previous_free).sum(axis=(1, 2))
+
+
+def build_utilization(placements, group_size=DEFAULT_GROUP_SIZE):
+    """
+    Derslik kullanımı, en yoğun saatler ve kapasite israfı analizini hesaplar
+    :param placements: Program öğeleri (Placement listesi)
+    :param group_size: Derslik talebi olarak kullanılan şube mevcudu
+    :return: JSON'a uygun sözlük
+    """
+    rows = db.session.query(Classroom.id, Classroom.code, Classroom.capacity, Classroom.type).all()
+    rooms = pd.DataFrame(rows, columns=['id', 'code', 'capacity', 'type'])
+    rooms['capacity'] = rooms['capacity'].fillna(0).astype(int)
+
+    matrix, sessions = occupancy_matrix(rooms, placements)
+    occupied = matrix > 0
+    available_minutes = len(DAYS) * len(PERIODS) * PERIOD_MINUTES
+
+    # Derslik bazında
+    minutes = matrix.sum(axis=(1, 2))
+    rooms['sessions'] = sessions
+    rooms['occupied_hours'] = minutes / 60
+    rooms['utilization'] = 100 * minutes / available_minutes
+    rooms['idle_blocks'] = idle_blocks(occupied)
+    capacity = rooms['capacity'].to_numpy()
+    # Boş kalan koltuk x saat (kapasite talebi aşıyorsa) ve sığmayan öğrenci x saat (talep kapasiteyi aşıyorsa)
+    rooms['wasted_seat_hours'] = np.clip(capacity - group_size, 0, None) * minutes / 60
+    rooms['overflow_seat_hours'] = np.clip(group_size - capacity, 0, None) * minutes / 60
+    seat_hours = capacity * minutes / 60
+    rooms['waste_percent'] = np.divide(100 * rooms['wasted_seat_hours'], seat_hours,
+                                       out=np.zeros(len(rooms)), where=seat_hours > 0)
+    rooms = rooms.sort_values(['utilization', 'code'])
+
+    # Gün x ders saati bazında aynı anda kullanılan derslik sayısı
+    concurrency = occupied.sum(axis=0)
+    peak = int(concurrency.max()) if concurrency.size else 0
+    peak_slots = [{'day': DAYS[day], 'start_time': minutes_to_time(PERIODS[period][0]),
+                   'end_time': minutes_to_time(PERIODS[period][1])}
+                  for day, period in zip(*np.nonzero(concurrency == peak))] if peak else []
+
+    total_minutes = minutes.sum()
+    total_seat_hours = seat_hours.sum()
+    return {
+        'group_size': group_size,
+        'periods': [f'{minutes_to_time(start)}-{minutes_to_time(end)}' for start, end, _ in PERIODS],
+        'day_blocks': [f'{start}-{end}' for start, end in DAY_BLOCKS],
+        'summary': {
+            'classrooms': len(rooms),
+            'utilization': round(float(100 * total_minutes / (available_minutes * len(rooms))), 2) if len(rooms) else 0,
+            'peak_concurrency': peak,
+            'peak_slots': peak_slots,
+            'underused_classrooms': int((rooms['utilization'] < UNDERUSED_PERCENT).sum()),
+            'unused_classrooms': int((rooms['sessions'] == 0).sum()),
+            'wasted_seat_hours': round(float(rooms['wasted_seat_hours'].sum()), 1),
+            'waste_percent': round(float(100 * rooms['wasted_seat_hours'].sum() / total_seat_hours), 2)
+            if total_seat_hours else 0,
+        },
+        'concurrency': {day: concurrency[i].tolist() for i, day in enumerate(DAYS)},
+        'classrooms': [{
+            'id': int(row.id),
+            'code': row.code,
+            'type': row.type,
+            'capacity': int(row.capacity),
+            'sessions': int(row.sessions),
+            'occupied_hours': round(float(row.occupied_hours), 2),
+            'utilization': round(float(row.utilization), 2),
+            'idle_blocks': int(row.idle_blocks),
+            'wasted_seat_hours': round(float(row.wasted_seat_hours), 1),
+            'overflow_seat_hours': round(float(row.overflow_seat_hours), 1),
+            'waste_percent': round(float(row.waste_percent), 2),
+        } for row in rooms.itertuples(index=False)],
+    }
+
+
+def classroom_utilization(group_size=DEFAULT_GROUP_SIZE):
+    """
+    Güncel veri sürümü için analiz sonucunu döndürür (önbellekten veya hesaplayarak)
+    """
+    occupancy = schedule_index.ensure_built()
+    return _analytics_cache.get_or_create((occupancy.version, group_size),
+                                          lambda: build_utilization(occupancy.placements(), group_size))
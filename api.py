@@ -0,0 +1,363 @@
+"""
+Salt okunur JSON API (bölüm ekranları, mobil uygulama vb. için)
+
+    GET /api/v1/schedule     ?department=BLM,YZM&semester=&course_id=&classroom_id=&instructor_id=&day=
+    GET /api/v1/courses      ?department=&semester=&instructor_id=
+    GET /api/v1/classrooms   ?type=&min_capacity=
+    GET /api/v1/departments
+    GET /api/v1/courses/<id>/free-slots  ?length=&kind=T|P&group_size=&limit=
+    GET /api/v1/analytics/utilization    ?group_size=&underused=1&limit=
+    GET /api/v1/terms
+    GET /api/v1/terms/<id>/schedule      ?cursor=&limit=
+
+Program listeleri aktif dönemle sınırlıdır; geçmiş ve arşivlenmiş dönemlerin
+programı /terms/<id>/schedule ile okunur.
+
+Listeler id sırasına göre anahtar tabanlı (keyset) sayfalanır: yanıttaki
+next_cursor değeri bir sonraki istekte ?cursor= ile gönderilir; sayfa boyutu
+?limit= ile seçilir. Sayfa derinliğinden bağımsız olarak her sayfa birincil
+anahtar indeksi üzerinden okunur.
+
+Her yanıtın ETag'i veri sürümüdür. If-None-Match ile gelen istek güncelse
+liste sorgusu çalıştırılmadan 304 döner; dakikada bir yoklama yapan
+istemciler için maliyet tek bir sürüm sorgusudur.
+"""
+from functools import wraps
+
+from flask import Blueprint, jsonify, make_response, request
+from flask_login import login_required
+
+from models import Classroom, Course, Department, Schedule, Term, User, DAYS, day_to_index, in_active_term
+from analytics import UNDERUSED_PERCENT, classroom_utilization
+from free_slots import find_free_slots, slot_report
+from monitoring import query_budget
+from terms import term_schedule
+from timetable import DEFAULT_GROUP_SIZE, PRACTICE, THEORY
+from versioning import current_version
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class ApiError(Exception):
+    """
+    İstemciye 400 olarak döndürülen geçersiz parametre hatası
+    """
+
+
+@api.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({'error': str(error)}), 400
+
+
+@api.errorhandler(401)
+def handle_unauthorized(error):
+    return jsonify({'error': 'Giriş yapmanız gerekiyor'}), 401
+
+
+def int_arg(name, minimum=None):
+    """
+    Sorgu parametresini tamsayı olarak okur
+    :return: Değer veya parametre yoksa None
+    """
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(f'{name} bir tamsayı olmalıdır')
+    if minimum is not None and value < minimum:
+        raise ApiError(f'{name} en az {minimum} olmalıdır')
+    return value
+
+
+def list_arg(name):
+    """
+    Virgülle ayrılmış sorgu parametresini liste olarak okur
+    :return: Değerler veya parametre yoksa None
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def versioned(view):
+    """
+    Yanıta veri sürümünü ETag olarak ekler; istemcinin sürümü güncelse görünümü çalıştırmadan 304 döner
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = f'api-{current_version()}'
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
+
+
+def paginate(query, model, serialize):
+    """
+    Sorguyu id'ye göre anahtar tabanlı sayfalar
+    :param query: Filtrelenmiş sorgu
+    :param model: Sayfalanan model (id sütunu kullanılır)
+    :param serialize: Kayıt -> sözlük fonksiyonu
+    :return: JSON'a çevrilecek sayfa sözlüğü
+    """
+    limit = int_arg('limit', minimum=1) or DEFAULT_LIMIT
+    limit = min(limit, MAX_LIMIT)
+    cursor = int_arg('cursor', minimum=0)
+    if cursor is not None:
+        query = query.filter(model.id > cursor)
+    # Bir fazla kayıt okunarak sonraki sayfanın varlığı ek sorgu olmadan anlaşılır
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    items = [serialize(row) for row in rows[:limit]]
+    return {
+        'items': items,
+        'next_cursor': items[-1]['id'] if has_more else None,
+        'limit': limit,
+    }
+
+
+def department_filter(query, column):
+    """
+    ?department=BLM,YZM parametresini bölüm kodu filtresi olarak uygular
+    """
+    codes = list_arg('department')
+    if codes:
+        query = query.filter(column.in_(Department.query.with_entities(Department.id)
+                                        .filter(Department.code.in_(codes))))
+    return query
+
+
+def serialize_schedule(row):
+    item, course, department_code, instructor_name, classroom_code = row
+    return {
+        'id': item.id,
+        'day': item.day,
+        'day_index': item.day_index,
+        'start_time': item.start_time,
+        'end_time': item.end_time,
+        'start_minute': item.start_minute,
+        'end_minute': item.end_minute,
+        'course': {
+            'id': course.id,
+            'code': course.code,
+            'name': course.name,
+            'department': department_code,
+            'semester': course.semester,
+            'is_elective': bool(course.is_elective),
+        },
+        'classroom': {'id': item.classroom_id, 'code': classroom_code},
+        'instructor': {'id': course.instructor_id, 'name': instructor_name} if course.instructor_id else None,
+    }
+
+
+def serialize_course(row):
+    course, department_code, instructor_name = row
+    return {
+        'id': course.id,
+        'code': course.code,
+        'name': course.name,
+        'theory': course.theory,
+        'practice': course.practice,
+        'credits': course.credits,
+        'semester': course.semester,
+        'is_elective': bool(course.is_elective),
+        'has_fixed_time': bool(course.has_fixed_time),
+        'department': department_code,
+        'instructor': {'id': course.instructor_id, 'name': instructor_name} if course.instructor_id else None,
+    }
+
+
+def serialize_classroom(classroom):
+    return {'id': classroom.id, 'code': classroom.code, 'capacity': classroom.capacity, 'type': classroom.type}
+
+
+def serialize_department(department):
+    return {'id': department.id, 'code': department.code, 'name': department.name}
+
+
+def serialize_term(term):
+    return {
+        'id': term.id,
+        'code': term.code,
+        'name': term.name,
+        'is_active': bool(term.is_active),
+        'archived_at': term.archived_at.isoformat() if term.archived_at else None,
+    }
+
+
+# Program öğeleri listesi endpoint'i
+@api.route('/schedule')
+@query_budget(3)
+@login_required
+@versioned
+def schedule():
+    """
+    Program öğelerini ders, derslik ve öğretim üyesi bilgileriyle listeler
+    """
+    query = (Schedule.query
+             .join(Course, Schedule.course_id == Course.id)
+             .outerjoin(Department, Course.department_id == Department.id)
+             .outerjoin(User, Course.instructor_id == User.id)
+             .outerjoin(Classroom, Schedule.classroom_id == Classroom.id)
+             .with_entities(Schedule, Course, Department.code, User.name, Classroom.code)
+             .filter(in_active_term()))
+    query = department_filter(query, Course.department_id)
+    for name, column in (('semester', Course.semester), ('course_id', Schedule.course_id),
+                         ('classroom_id', Schedule.classroom_id), ('instructor_id', Course.instructor_id)):
+        value = int_arg(name)
+        if value is not None:
+            query = query.filter(column == value)
+    day = request.args.get('day')
+    if day:
+        # Gün adı (Pazartesi) veya gün numarası (0 = Pazartesi)
+        day_index = int(day) if day.isdigit() else day_to_index(day)
+        if day_index is None or not 0 <= day_index < len(DAYS):
+            raise ApiError(f'Geçersiz gün: {day}')
+        query = query.filter(Schedule.day_index == day_index)
+    return paginate(query, Schedule, serialize_schedule)
+
+
+# Ders listesi endpoint'i
+@api.route('/courses')
+@query_budget(3)
+@login_required
+@versioned
+def courses():
+    """
+    Dersleri bölüm kodu ve öğretim üyesi adıyla listeler
+    """
+    query = (Course.query
+             .outerjoin(Department, Course.department_id == Department.id)
+             .outerjoin(User, Course.instructor_id == User.id)
+             .with_entities(Course, Department.code, User.name))
+    query = department_filter(query, Course.department_id)
+    for name, column in (('semester', Course.semester), ('instructor_id', Course.instructor_id)):
+        value = int_arg(name)
+        if value is not None:
+            query = query.filter(column == value)
+    return paginate(query, Course, serialize_course)
+
+
+# Derslik listesi endpoint'i
+@api.route('/classrooms')
+@query_budget(3)
+@login_required
+@versioned
+def classrooms():
+    """
+    Derslikleri listeler
+    """
+    query = Classroom.query
+    if request.args.get('type'):
+        query = query.filter(Classroom.type == request.args['type'])
+    min_capacity = int_arg('min_capacity')
+    if min_capacity is not None:
+        query = query.filter(Classroom.capacity >= min_capacity)
+    return paginate(query, Classroom, serialize_classroom)
+
+
+# Bölüm listesi endpoint'i
+@api.route('/departments')
+@query_budget(3)
+@login_required
+@versioned
+def departments():
+    """
+    Bölümleri listeler
+    """
+    return paginate(Department.query, Department, serialize_department)
+
+
+# Ders için boş zaman ve derslik seçenekleri endpoint'i
+@api.route('/courses/<int:course_id>/free-slots')
+@query_budget(7)
+@login_required
+@versioned
+def free_slots(course_id):
+    """
+    Dersin öğretim üyesi ve sınıf grubu çakışması olmadan yerleştirilebileceği
+    (gün, başlangıç, derslik) seçeneklerini derslik uygunluğuna göre sıralı listeler
+    """
+    course = Course.query.get(course_id)
+    if course is None:
+        return jsonify({'error': 'Ders bulunamadı'}), 404
+    kind = request.args.get('kind', THEORY).upper()
+    if kind not in (THEORY, PRACTICE):
+        raise ApiError(f'kind {THEORY} (teorik) veya {PRACTICE} (uygulama) olmalıdır')
+    limit = min(int_arg('limit', minimum=1) or DEFAULT_LIMIT, MAX_LIMIT)
+    group_size = int_arg('group_size', minimum=0)
+    try:
+        total, slots = find_free_slots(course, int_arg('length'), kind,
+                                       DEFAULT_GROUP_SIZE if group_size is None else group_size, limit)
+    except ValueError as e:
+        raise ApiError(str(e))
+    return {
+        'course': {'id': course.id, 'code': course.code, 'name': course.name},
+        'kind': kind,
+        'total': total,
+        'items': [slot_report(slot) for slot in slots],
+    }
+
+
+# Derslik kullanım analizi endpoint'i
+@api.route('/analytics/utilization')
+@query_budget(6)
+@login_required
+@versioned
+def utilization():
+    """
+    Derslik kullanım oranları, en yoğun saatler, boş bloklar ve kapasite israfı
+    Derslikler kullanım oranına göre artan sırada (az kullanılanlar önce) listelenir
+    """
+    group_size = int_arg('group_size', minimum=1) or DEFAULT_GROUP_SIZE
+    result = classroom_utilization(group_size)
+    classrooms = result['classrooms']
+    if request.args.get('underused') in ('1', 'true'):
+        classrooms = [room for room in classrooms if room['utilization'] < UNDERUSED_PERCENT]
+    limit = int_arg('limit', minimum=1)
+    return dict(result, classrooms=classrooms[:limit] if limit else classrooms)
+
+
+# Dönem listesi endpoint'i
+@api.route('/terms')
+@query_budget(3)
+@login_required
+@versioned
+def terms():
+    """
+    Aktif, geçmiş ve arşivlenmiş dönemleri listeler
+    """
+    return paginate(Term.query, Term, serialize_term)
+
+
+# Dönem programı endpoint'i
+@api.route('/terms/<int:term_id>/schedule')
+@query_budget(4)
+@login_required
+@versioned
+def term_schedule_items(term_id):
+    """
+    Dönemin program öğelerini listeler; arşivlenmiş dönemler arşiv veritabanından okunur
+    Öğeler dönem sonundaki ders, bölüm, öğretim üyesi ve derslik bilgilerini taşır.
+    """
+    term = Term.query.get(term_id)
+    if term is None:
+        return jsonify({'error': 'Dönem bulunamadı'}), 404
+    limit = min(int_arg('limit', minimum=1) or DEFAULT_LIMIT, MAX_LIMIT)
+    items, has_more = term_schedule(term, int_arg('cursor', minimum=0), limit)
+    return {
+        'term': serialize_term(term),
+        'items': items,
+        'next_cursor': items[-1]['schedule_id'] if has_more else None,
+        'limit': limit,
+    }
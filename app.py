@@ -1,16 +1,43 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, send_file, jsonify, make_response, session
+from operator import attrgetter
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from functools import wraps
+import logging
 import os
-from datetime import datetime
-import csv
+import click
 import io
-import tempfile
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from models import db, User, Department, Course, Classroom, Schedule
-from sqlalchemy import inspect, text
+from openpyxl.utils import get_column_letter
+from models import (
+    db, User, Department, Course, Classroom, Schedule, Term, DAYS, day_to_index, minutes_to_time, search_key,
+    time_to_minutes
+)
+from timetable import DEFAULT_GROUP_SIZE, load_problem, solve, apply_solution
+from portfolio import start_job, get_job
+from schedule_data import GRADES, NO_FILTER, ScheduleFilter, load_schedule_items, build_grid
+from importer import (
+    COLUMNS as IMPORT_COLUMNS, COURSES, IMPORT_KINDS, REQUIRED as IMPORT_REQUIRED, import_table, read_table
+)
+from bulk_export import FORMATS as EXPORT_FORMATS, take_snapshot, group_timetables, stream_zip
+from versioning import VersionedCache, current_version
+from repair import (
+    CourseChange, invalidated_by_classroom_removal, invalidated_by_instructor_change, invalidated_by_capacity_change,
+    repair_placements, stage_repair, describe_repair
+)
+from occupancy import schedule_index, Placement, CLASSROOM, INSTRUCTOR
+from migrations import upgrade, pending_migrations
+from storage import init_storage
+from user_cache import UserCache
+from api import api
+from batch_placement import MAX_BATCH_SIZE, place_batch
+from audit import audit_schedule, clash_report
+from monitoring import init_monitoring, query_budget
+from listing import SortOption, keyset_page, listing_url, page_size, prefix_filter
+from terms import activate_term, archive_term, create_term, schedule_usage
 
 # =====================================================================================
 # Ders Programı Yönetim Sistemi
@@ -26,27 +53,44 @@ from sqlalchemy import inspect, text
 # Göreceli yolları kullanarak dizinleri belirle
 TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ders_programi.db')
+ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ders_programi_arsiv.db')
+
+logger = logging.getLogger(__name__)
 
 # Flask uygulamasını oluştur ve yapılandır
 app = Flask(__name__, template_folder=TEMPLATE_DIR)
 app.config['SECRET_KEY'] = 'gizli-anahtar-buraya'  # Güvenlik için session anahtarı
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + DB_PATH  # SQLite veritabanı bağlantısı
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///' + DB_PATH)  # Veritabanı bağlantısı (varsayılan: SQLite dosyası)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False  # Performans için takip özelliğini kapat
+app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 60))  # Giriş yapmış kullanıcı önbelleğinin süresi (saniye)
+app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')  # Log seviyesi (DEBUG, INFO, WARNING, ERROR)
+app.config['LOG_REQUESTS'] = os.environ.get('LOG_REQUESTS') == '1'  # Her isteği INFO seviyesinde logla
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # /metrics için Bearer token (yoksa /metrics kapalı)
+app.config['ARCHIVE_DATABASE'] = os.environ.get('ARCHIVE_DATABASE', ARCHIVE_PATH)  # Arşivlenen dönemlerin SQLite dosyası
 
-# Veritabanı ve giriş yöneticisini başlat
-db.init_app(app)
+# Veritabanı (bağlantı havuzu ve SQLite ayarlarıyla) ve giriş yöneticisini başlat
+init_storage(app)
+init_monitoring(app)  # JSON loglama, istek süresi / SQL sorgu ölçümü ve /metrics
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'  # Giriş yapılmadığında yönlendirilecek sayfa
+user_cache = UserCache(ttl=app.config['USER_CACHE_TTL'])  # Her istekte kullanıcı sorgusunu önler
+login_manager.blueprint_login_views['api'] = None  # API istekleri giriş sayfasına yönlendirilmez, 401 döner
+
+# Salt okunur JSON API
+app.register_blueprint(api)
+
+# Liste sayfalarında sıralama ve sayfa bağlantıları için
+app.add_template_global(listing_url)
 
 # Flask-Login için kullanıcı yükleme fonksiyonu
 @login_manager.user_loader
 def load_user(user_id):
     """
-    Flask-Login için kullanıcı kimliğinden kullanıcı nesnesini yükler
+    Flask-Login için kullanıcı kimliğinden kullanıcı nesnesini yükler (önbellekten)
     :param user_id: Kullanıcı kimlik numarası
     :return: Kullanıcı nesnesi veya None
     """
-    return User.query.get(int(user_id))
+    return user_cache.load(int(user_id))
 
 # Admin yetkisi gerektiren sayfalar için dekoratör
 def admin_required(f):
@@ -64,6 +108,41 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Ders ve kullanıcı listelerinin sıralama seçenekleri (eşit değerler id sırasıyla ayrılır)
+COURSE_SORTS = {
+    'code': SortOption(Course.code, attrgetter('code')),
+    'name': SortOption(Course.name, attrgetter('name')),
+    'semester': SortOption(func.coalesce(Course.semester, 0), lambda course: course.semester or 0),
+}
+USER_SORTS = {
+    'username': SortOption(User.username, attrgetter('username')),
+    'name': SortOption(func.coalesce(User.name, ''), lambda user: user.name or ''),
+    'role': SortOption(User.role, attrgetter('role')),
+}
+
+# Kullanıcı rolleri ve görünen adları
+USER_ROLES = {'admin': 'Yönetici', 'instructor': 'Öğretim Üyesi', 'student': 'Öğrenci', 'user': 'Standart Kullanıcı'}
+
+# Çakışma mesajları için yardımcı fonksiyonlar
+def conflict_labels(conflicts, classroom_ids=()):
+    """
+    Çakışan program öğelerinin ders ve derslik kodlarını toplu olarak getirir
+    :param conflicts: Çakışan Placement listesi
+    :param classroom_ids: Kodu ayrıca gereken derslik ID'leri
+    :return: (ders id -> kod, derslik id -> kod) sözlükleri
+    """
+    course_ids = {conflict.course_id for conflict in conflicts}
+    classroom_ids = {conflict.classroom_id for conflict in conflicts} | set(classroom_ids)
+    course_codes = dict(db.session.query(Course.id, Course.code).filter(Course.id.in_(course_ids)).all())
+    classroom_codes = dict(db.session.query(Classroom.id, Classroom.code).filter(Classroom.id.in_(classroom_ids)).all())
+    return course_codes, classroom_codes
+
+def conflict_time(conflict):
+    """
+    Çakışan program öğesinin saat aralığını "HH:MM-HH:MM" biçiminde döndürür
+    """
+    return f"{minutes_to_time(conflict.start)}-{minutes_to_time(conflict.end)}"
+
 # Ana sayfa - Ders programına yönlendirir
 @app.route('/')
 def index():
@@ -108,6 +187,7 @@ def logout():
 
 # Bölümler sayfası
 @app.route('/departments', methods=['GET', 'POST'])
+@query_budget(3)
 @admin_required  # Sadece adminler bölüm ekleyip silebilir
 def departments():
     """
@@ -139,6 +219,7 @@ def departments():
 
 # Dersler sayfası
 @app.route('/courses', methods=['GET', 'POST'])
+@query_budget(6)
 @admin_required  # Sadece adminler ders ekleyip silebilir
 def courses():
     """
@@ -154,9 +235,9 @@ def courses():
         instructor_id = request.form.get('instructor_id') if request.form.get('instructor_id') else None
         semester = request.form.get('semester', 1)
         
-        # Aynı kodla başka ders var mı kontrol et
-        if Course.query.filter_by(code=code).first():
-            flash('Bu ders kodu zaten kullanımda!', 'error')
+        # Aynı bölümde aynı kodla başka ders var mı kontrol et (ortak dersler her bölümde ayrı kayıttır)
+        if Course.query.filter_by(code=code, department_id=request.form.get('department_id', type=int)).first():
+            flash('Bu ders kodu bu bölümde zaten kullanımda!', 'error')
             return redirect(url_for('courses'))
         
         # Yeni ders oluştur ve kaydet
@@ -173,14 +254,36 @@ def courses():
         flash('Ders başarıyla eklendi!', 'success')
         return redirect(url_for('courses'))
     
-    # Gerekli verileri getir ve görüntüle
-    courses = Course.query.all()
-    departments = Department.query.all()
-    instructors = User.query.filter_by(role='instructor').all()
-    return render_template('courses.html', courses=courses, departments=departments, instructors=instructors)
+    # Arama (ders kodu / adı öneki), bölüm filtresi ve sıralama
+    search = request.args.get('q', '').strip()
+    department_id = request.args.get('department', type=int)
+    sort = request.args.get('sort') if request.args.get('sort') in COURSE_SORTS else 'code'
+    descending = request.args.get('order') == 'desc'
+    
+    query = Course.query
+    if search:
+        key = search_key(search)
+        query = query.filter(or_(prefix_filter(Course.code_key, key), prefix_filter(Course.name_key, key)))
+    if department_id:
+        query = query.filter(Course.department_id == department_id)
+    total = query.count()
+    
+    # Sadece gösterilecek sayfa, bölüm ve öğretim üyesiyle birlikte tek sorguda getirilir
+    page = keyset_page(query.options(joinedload(Course.department), joinedload(Course.instructor)),
+                       COURSE_SORTS[sort], Course.id, descending, page_size(),
+                       request.args.get('after'), request.args.get('before'))
+    
+    # Form seçenekleri için sadece gereken sütunlar
+    departments = db.session.query(Department.id, Department.code, Department.name).order_by(Department.code).all()
+    instructors = (db.session.query(User.id, User.name, User.username)
+                   .filter(User.role == 'instructor').order_by(User.name).all())
+    return render_template('courses.html', courses=page.items, page=page, total=total, search=search,
+                           department_id=department_id, sort=sort, descending=descending,
+                           departments=departments, instructors=instructors)
 
 # Derslikler sayfası
 @app.route('/classrooms', methods=['GET', 'POST'])
+@query_budget(3)
 @admin_required  # Sadece adminler derslik ekleyip silebilir
 def classrooms():
     """
@@ -212,6 +315,7 @@ def classrooms():
 
 # Kullanıcılar sayfası
 @app.route('/users', methods=['GET', 'POST'])
+@query_budget(5)
 @admin_required  # Sadece adminler kullanıcı ekleyip silebilir
 def users():
     """
@@ -244,14 +348,37 @@ def users():
         
         db.session.add(user)
         db.session.commit()
+        # Silinmiş bir kullanıcının kimliği yeniden kullanılmış olabilir
+        user_cache.invalidate(user.id)
         
         flash('Kullanıcı başarıyla eklendi!', 'success')
         return redirect(url_for('users'))
     
-    # Gerekli verileri getir ve görüntüle
-    users = User.query.all()
-    departments = Department.query.all()
-    return render_template('users.html', users=users, departments=departments)
+    # Arama (kullanıcı adı / ad soyad öneki), rol ve bölüm filtresi ve sıralama
+    search = request.args.get('q', '').strip()
+    role = request.args.get('role') if request.args.get('role') in USER_ROLES else None
+    department_id = request.args.get('department', type=int)
+    sort = request.args.get('sort') if request.args.get('sort') in USER_SORTS else 'username'
+    descending = request.args.get('order') == 'desc'
+    
+    query = User.query
+    if search:
+        key = search_key(search)
+        query = query.filter(or_(prefix_filter(User.username_key, key), prefix_filter(User.name_key, key)))
+    if role:
+        query = query.filter(User.role == role)
+    if department_id:
+        query = query.filter(User.department_id == department_id)
+    total = query.count()
+    
+    # Sadece gösterilecek sayfa, bölümüyle birlikte tek sorguda getirilir
+    page = keyset_page(query.options(joinedload(User.department)), USER_SORTS[sort], User.id, descending,
+                       page_size(), request.args.get('after'), request.args.get('before'))
+    
+    departments = db.session.query(Department.id, Department.code, Department.name).order_by(Department.code).all()
+    return render_template('users.html', users=page.items, page=page, total=total, search=search, role=role,
+                           roles=USER_ROLES, department_id=department_id, sort=sort, descending=descending,
+                           departments=departments)
 
 # Kullanıcı silme endpoint'i
 @app.route('/users/delete/<int:user_id>', methods=['POST'])
@@ -280,55 +407,150 @@ def delete_user(user_id):
         # Kullanıcıyı sil
         db.session.delete(user)
         db.session.commit()
+        user_cache.invalidate(user_id)
         flash('Kullanıcı başarıyla silindi!', 'success')
-    except Exception as e:
+    except Exception:
         # Hata durumunda logla ve kullanıcıya bildir
-        print(f"\n=== Hata ===")
-        print(f"Hata mesajı: {str(e)}")
-        print("============\n")
+        logger.exception('Kullanıcı silinirken bir hata oluştu')
         flash('Kullanıcı silinirken bir hata oluştu!', 'error')
     
     return redirect(url_for('users'))
 
+# Ders programı içeriğinin veri sürümü ve role göre önbelleği
+schedule_page_cache = VersionedCache(maxsize=64)
+# Filtre ve ders ekleme formlarının seçenek listeleri (veri sürümüne göre)
+schedule_options_cache = VersionedCache(maxsize=4)
+
+# Program görünümü sorgu parametreleri -> ScheduleFilter alanları
+SCHEDULE_FILTER_ARGS = {
+    'department': 'department_id',
+    'grade': 'grade',
+    'semester': 'semester',
+    'instructor': 'instructor_id',
+    'classroom': 'classroom_id',
+    'day': 'day',
+}
+
+def schedule_filters(user):
+    """
+    Program görünümü filtrelerini istek parametrelerinden okur
+    Parametresi verilmeyen alanlar kullanıcının varsayılanını alır: öğretim üyesi kendi derslerini,
+    diğer kullanıcılar (admin hariç) kendi bölümünü görür. Boş değer ("Tümü") filtreyi kaldırır.
+    :param user: Giriş yapmış kullanıcı
+    :return: ScheduleFilter
+    """
+    values = NO_FILTER._asdict()
+    if user.role == 'instructor':
+        values['instructor_id'] = user.id
+    elif user.role != 'admin' and user.department_id:
+        values['department_id'] = user.department_id
+    
+    for arg, field in SCHEDULE_FILTER_ARGS.items():
+        if arg not in request.args:
+            continue
+        value = request.args.get(arg, '').strip()
+        if field == 'day' and not value.isdigit():
+            values[field] = day_to_index(value)  # Gün adı da kabul edilir
+        else:
+            values[field] = int(value) if value.isdigit() else None
+    
+    # Geçersiz gün ve sınıf seviyesi filtrelenmez
+    if values['day'] is not None and not 0 <= values['day'] < len(DAYS):
+        values['day'] = None
+    if values['grade'] not in GRADES:
+        values['grade'] = None
+    return ScheduleFilter(**values)
+
+def schedule_options(is_admin):
+    """
+    Filtre formu (ve adminler için ders ekleme formu) seçeneklerini sadece gereken sütunlarla getirir
+    :param is_admin: Ders ekleme formunun ders listesi de yüklensin mi
+    :return: Seçenek listeleri sözlüğü
+    """
+    options = {
+        'departments': db.session.query(Department.id, Department.code).order_by(Department.code).all(),
+        'instructors': db.session.query(User.id, User.name, User.username)
+                       .filter(User.role == 'instructor').order_by(User.name).all(),
+        'classrooms': db.session.query(Classroom.id, Classroom.code).order_by(Classroom.code).all(),
+        'courses': [],
+        'term': db.session.query(Term.name).filter(Term.is_active == db.true()).scalar(),
+    }
+    if is_admin:
+        options['courses'] = db.session.query(Course.id, Course.code, Course.name).order_by(Course.code).all()
+    return options
+
 # Ders programı görüntüleme sayfası
 @app.route('/view_schedule')
+@query_budget(8)
 @login_required  # Sadece giriş yapmış kullanıcılar görebilir
 def view_schedule():
     """
     Ders programını görüntüleme sayfası
-    Tüm dersleri, derslikleri ve ders programını gösterir
+    Bölüm, sınıf seviyesi, yarıyıl, öğretim üyesi, derslik ve gün filtreleri SQL sorgusunda uygulanır
+    (varsayılan: öğretim üyesinin kendi dersleri, öğrencinin kendi bölümü)
+    Program içeriği veri sürümü, kullanıcı rolü ve filtrelere göre önbelleğe alınır;
+    tarayıcıdaki sayfa güncelse 304 döner
     """
-    # Haftanın günleri
-    days = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma']
+    version = current_version()
+    role = current_user.role
+    filters = schedule_filters(current_user)
+    filter_tag = '.'.join('' if value is None else str(value) for value in filters)
+    etag = f'{version}-{role}-{current_user.get_id()}-{filter_tag}'
     
-    # Veritabanından gerekli verileri çek
-    schedule_items = Schedule.query.all()
-    courses = Course.query.order_by(Course.code).all()  # Dersleri kod sırasına göre sırala
-    classrooms = Classroom.query.order_by(Classroom.code).all()  # Derslikleri kod sırasına göre sırala
+    # Gösterilecek bir bildirim yoksa ve tarayıcıdaki sürüm güncelse sayfayı yeniden gönderme
+    if '_flashes' not in session and request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        schedule_html = schedule_page_cache.get_or_create(
+            (version, role, filters), lambda: render_schedule_content(role, filters, version)
+        )
+        response = make_response(render_template('view_schedule.html', schedule_html=schedule_html))
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def render_schedule_content(role, filters=NO_FILTER, version=None):
+    """
+    Ders programı tablosunu, filtre formunu (ve adminler için ekleme formunu) HTML olarak oluşturur
+    :param role: Kullanıcı rolü
+    :param filters: ScheduleFilter (SQL sorgusunda uygulanır)
+    :param version: Seçenek listeleri önbelleği için veri sürümü
+    :return: HTML metni
+    """
+    # Filtrelenen gün ve sınıf seviyesi varsa tabloda sadece onlar gösterilir
+    days = DAYS if filters.day is None else [DAYS[filters.day]]
+    grades = GRADES if filters.grade is None else [filters.grade]
     
-    # Debug için konsola bilgi yazdır
-    print("\n=== Debug Bilgileri ===")
-    print(f"Toplam ders sayısı: {len(courses)}")
-    print(f"Toplam derslik sayısı: {len(classrooms)}")
+    # Sadece gösterilecek program öğelerini ilişkili verileriyle tek sorguda çek ve gün x sınıf tablosuna yerleştir
+    schedule_items = load_schedule_items(filters=filters)
+    grid = build_grid(schedule_items, days)
     
-    print("\nDersler:")
-    for course in courses:
-        print(f"- {course.code} - {course.name} (ID: {course.id})")
+    is_admin = role == 'admin'
+    if version is None:
+        options = schedule_options(is_admin)
+    else:
+        options = schedule_options_cache.get_or_create((version, is_admin), lambda: schedule_options(is_admin))
     
-    print("\nDerslikler:")
-    for classroom in classrooms:
-        print(f"- {classroom.code} (Kapasite: {classroom.capacity}, ID: {classroom.id})")
-    print("=====================\n")
+    logger.debug('Program sayfası oluşturuldu', extra={'items': len(schedule_items), 'filters': filters._asdict()})
     
     # Şablonu render et
-    return render_template('view_schedule.html',
-                         schedule_items=schedule_items,
-                         courses=courses,
-                         classrooms=classrooms,
-                         days=days)
+    return render_template('view_schedule_content.html',
+                           grid=grid,
+                           grades=grades,
+                           all_grades=GRADES,
+                           courses=options['courses'],
+                           classrooms=options['classrooms'],
+                           departments=options['departments'],
+                           instructors=options['instructors'],
+                           term=options['term'],
+                           filters=filters,
+                           days=days,
+                           all_days=DAYS)
 
 # Program ekle endpoint'i
 @app.route('/schedule/add', methods=['GET', 'POST'])
+@query_budget(8, methods=('POST',))
 @admin_required  # Sadece adminler program ekleyebilir
 def add_schedule():
     """
@@ -347,35 +569,36 @@ def add_schedule():
         start_time = request.form.get('start_time')
         end_time = request.form.get('end_time')
 
-        # Debug için form verilerini yazdır
-        print(f"\n=== Form Verileri ===")
-        print(f"Ders ID: {course_id}")
-        print(f"Derslik ID: {classroom_id}")
-        print(f"Gün: {day}")
-        print(f"Başlangıç: {start_time}")
-        print(f"Bitiş: {end_time}")
-        print("==================\n")
-
-        # Seçilen dersin öğretim üyesini bul
-        course = Course.query.get(course_id)
+        logger.debug('Program ekleme isteği', extra={'course_id': course_id, 'classroom_id': classroom_id,
+                                                    'day': day, 'start_time': start_time, 'end_time': end_time})
+
+        # Saatleri dakikaya çevir ve aralığı doğrula
+        start = time_to_minutes(start_time)
+        end = time_to_minutes(end_time)
+        if start >= end:
+            flash('Bitiş saati başlangıç saatinden sonra olmalıdır!', 'error')
+            return redirect(url_for('view_schedule'))
+        course_id = int(course_id)
+        classroom_id = int(classroom_id)
+
+        # Çakışma kontrolleri bellekteki doluluk indeksi üzerinden yapılır
+        index = schedule_index.ensure_built()
+
+        # Seçilen dersi öğretim üyesiyle birlikte getir
+        course = Course.query.options(joinedload(Course.instructor)).get(course_id)
         if course and course.instructor_id:
-            instructor = User.query.get(course.instructor_id)
-            print(f"Ders öğretim üyesi: {instructor.name if instructor else 'Atanmamış'}")
+            instructor = course.instructor
             
             # Bu gün ve saatte öğretim üyesinin başka dersi var mı kontrol et
-            instructor_conflicts = Schedule.query.join(Course).filter(
-                Schedule.day == day,
-                Schedule.start_time < end_time,
-                Schedule.end_time > start_time,
-                Course.instructor_id == course.instructor_id
-            ).all()
+            instructor_conflicts = index.conflicts(INSTRUCTOR, course.instructor_id, day, start, end)
             
             if instructor_conflicts:
-                conflict_details = []
-                for conflict in instructor_conflicts:
-                    conflict_course = Course.query.get(conflict.course_id)
-                    conflict_classroom = Classroom.query.get(conflict.classroom_id)
-                    conflict_details.append(f"{conflict_course.code} ({conflict_classroom.code}, {conflict.start_time}-{conflict.end_time})")
+                course_codes, classroom_codes = conflict_labels(instructor_conflicts)
+                conflict_details = [
+                    f"{course_codes.get(conflict.course_id)} ({classroom_codes.get(conflict.classroom_id)}, "
+                    f"{conflict_time(conflict)})"
+                    for conflict in instructor_conflicts
+                ]
                 
                 # Öğretim üyesi çakışması varsa uyar
                 conflict_message = ", ".join(conflict_details)
@@ -383,23 +606,18 @@ def add_schedule():
                 return redirect(url_for('view_schedule'))
 
         # Seçilen derslik ve zamanda başka ders var mı kontrol et
-        classroom_conflicts = Schedule.query.filter(
-            Schedule.day == day,
-            Schedule.start_time < end_time,
-            Schedule.end_time > start_time,
-            Schedule.classroom_id == classroom_id
-        ).all()
+        classroom_conflicts = index.conflicts(CLASSROOM, classroom_id, day, start, end)
         
         if classroom_conflicts:
             # Derslik çakışması varsa uyar
-            conflict_details = []
-            for conflict in classroom_conflicts:
-                conflict_course = Course.query.get(conflict.course_id)
-                conflict_details.append(f"{conflict_course.code} ({conflict.start_time}-{conflict.end_time})")
+            course_codes, classroom_codes = conflict_labels(classroom_conflicts, [classroom_id])
+            conflict_details = [
+                f"{course_codes.get(conflict.course_id)} ({conflict_time(conflict)})"
+                for conflict in classroom_conflicts
+            ]
             
             conflict_message = ", ".join(conflict_details)
-            conflict_classroom = Classroom.query.get(classroom_id)
-            flash(f'Derslik {conflict_classroom.code} bu saatte dolu: {conflict_message}', 'error')
+            flash(f'Derslik {classroom_codes.get(classroom_id)} bu saatte dolu: {conflict_message}', 'error')
             return redirect(url_for('view_schedule'))
         
         # Yeni program öğesi oluştur ve kaydet
@@ -412,19 +630,155 @@ def add_schedule():
         )
         
         db.session.add(schedule_item)
+        # id ve ders bilgileri commit'ten önce alınır (commit sonrası nesneleri yeniden yükleyen sorgular olmasın)
+        db.session.flush()
+        placement = Placement(
+            schedule_item.id, course_id, classroom_id, day, start, end,
+            course.instructor_id if course else None,
+            course.department_id if course else None,
+            course.semester if course else None
+        )
         db.session.commit()
         
+        # Yeni öğeyi doluluk indeksine işle
+        index.add(placement)
+        
         flash('Ders programı başarıyla güncellendi!', 'success')
         
-    except Exception as e:
+    except Exception:
         # Hata durumunda logla ve kullanıcıya bildir
-        print(f"\n=== Hata ===")
-        print(f"Hata mesajı: {str(e)}")
-        print("============\n")
+        logger.exception('Ders programı eklenirken bir hata oluştu')
         flash('Ders programı eklenirken bir hata oluştu!', 'error')
         
     return redirect(url_for('view_schedule'))
 
+# Toplu program ekleme endpoint'i
+@app.route('/schedule/batch', methods=['POST'])
+@query_budget(9, methods=('POST',))
+@admin_required  # Sadece adminler program ekleyebilir
+def add_schedule_batch():
+    """
+    Birden çok program öğesini tek istekte ekler (hepsi ya da hiçbiri)
+    JSON gövde: {"placements": [{"course_id", "classroom_id", "day", "start_time", "end_time"}, ...]}
+    :return: 201 ve oluşturulan öğe id'leri; sorun varsa 409 ve öğe bazında rapor
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get('placements') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'placements listesi gerekli'}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Tek istekte en fazla {MAX_BATCH_SIZE} yerleştirme gönderilebilir'}), 400
+    
+    try:
+        created, problems = place_batch(items)
+    except Exception:
+        # Hata durumunda işlemi geri al ve logla
+        db.session.rollback()
+        logger.exception('Program eklenirken bir hata oluştu')
+        return jsonify({'error': 'Program eklenirken bir hata oluştu'}), 500
+    
+    if problems:
+        return jsonify({'created': [], 'problems': problems}), 409
+    return jsonify({'created': created}), 201
+
+# Program çakışma denetimi endpoint'i
+@app.route('/schedule/audit')
+@query_budget(7)
+@admin_required  # Sadece adminler denetim raporunu görebilir
+def audit_schedule_view():
+    """
+    Tüm program öğeleri arasındaki derslik, öğretim üyesi ve sınıf grubu çakışmalarını listeler
+    :return: Türe göre gruplanmış çakışmalar (JSON)
+    """
+    clashes, total, elapsed = audit_schedule()
+    return jsonify({
+        'schedule_items': total,
+        'elapsed': round(elapsed, 3),
+        'counts': {kind: len(found) for kind, found in clashes.items()},
+        'clashes': clash_report(clashes),
+    })
+
+# Otomatik program oluşturma endpoint'i
+@app.route('/schedule/generate', methods=['POST'])
+@admin_required  # Sadece adminler programı yeniden oluşturabilir
+def generate_schedule():
+    """
+    Ders ve derslik bilgilerinden haftalık programı otomatik oluşturur
+    Sabit saatli dersler dışındaki mevcut program öğelerinin yerine yazılır
+    """
+    try:
+        group_size = request.form.get('group_size', type=int) or DEFAULT_GROUP_SIZE
+        problem = load_problem(group_size)
+        solution = solve(problem)
+        placed = apply_solution(problem, solution)
+        
+        if solution.unplaced:
+            unplaced = ", ".join(item.label for item in solution.unplaced)
+            flash(f'Program oluşturuldu ({placed} oturum), ancak şu oturumlar yerleştirilemedi: {unplaced}', 'warning')
+        else:
+            flash(f'Program başarıyla oluşturuldu! {placed} oturum {solution.elapsed:.2f} saniyede yerleştirildi.', 'success')
+    except Exception:
+        # Hata durumunda logla ve kullanıcıya bildir
+        logger.exception('Program oluşturulurken bir hata oluştu')
+        flash('Program oluşturulurken bir hata oluştu!', 'error')
+    
+    return redirect(url_for('view_schedule'))
+
+# Paralel portföy araması başlatma endpoint'i
+@app.route('/schedule/generate/portfolio', methods=['POST'])
+@admin_required  # Sadece adminler programı yeniden oluşturabilir
+def start_portfolio_search():
+    """
+    Farklı tohumlarla çalışan paralel program aramalarını arka planda başlatır
+    Parametreler: budget (saniye), workers (süreç sayısı), group_size, apply (0/1)
+    :return: İşin durumunu içeren JSON (202); başka bir arama çalışıyorsa 409
+    """
+    budget = request.values.get('budget', type=float) or 30.0
+    workers = request.values.get('workers', type=int)
+    group_size = request.values.get('group_size', type=int) or DEFAULT_GROUP_SIZE
+    apply_result = request.values.get('apply', '1') != '0'
+    
+    # Sürüm problemden önce okunur; arada yapılan bir değişiklik de sonucun uygulanmasını engeller
+    version = current_version()
+    problem = load_problem(group_size)
+    try:
+        job = start_job(problem, workers, budget, on_finish=apply_portfolio_result if apply_result else None,
+                        data_version=version)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify(job.status()), 202
+
+def apply_portfolio_result(job):
+    """
+    Portföy aramasının en iyi sonucunu veritabanına yazar
+    Sonuçta çakışma veya yerleştirilemeyen oturum varsa ya da arama sürerken
+    veriler değiştiyse mevcut program korunur.
+    :param job: Tamamlanan PortfolioJob
+    :return: Uygulama sonucunu içeren sözlük
+    """
+    if job.best_score['classroom_overlaps'] or job.best_score['instructor_overlaps']:
+        return {'applied': False, 'reason': 'En iyi sonuçta çakışma var'}
+    if job.best_score['unplaced']:
+        return {'applied': False, 'reason': f"En iyi sonuçta {job.best_score['unplaced']} oturum yerleştirilemedi"}
+    with app.app_context():
+        if current_version() != job.data_version:
+            return {'applied': False, 'reason': 'Arama sürerken ders, derslik veya program verileri değişti'}
+        placed = apply_solution(job.problem, job.solution)
+    return {'applied': True, 'placed': placed}
+
+# Portföy araması durum endpoint'i
+@app.route('/schedule/generate/portfolio/<job_id>')
+@admin_required
+def portfolio_status(job_id):
+    """
+    Portföy aramasının işçi bazında ilerlemesini ve en iyi puanını döndürür
+    :param job_id: İş numarası
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    return jsonify(job.status())
+
 # Program sil endpoint'i
 @app.route('/schedule/delete/<int:schedule_id>', methods=['POST'])
 @admin_required  # Sadece adminler program silebilir
@@ -438,13 +792,12 @@ def delete_schedule(schedule_id):
         schedule_item = Schedule.query.get_or_404(schedule_id)
         db.session.delete(schedule_item)
         db.session.commit()
+        schedule_index.remove(schedule_id)
         flash('Program öğesi başarıyla silindi!', 'success')
-    except Exception as e:
+    except Exception:
         # Hata durumunda logla ve kullanıcıya bildir
         flash('Program öğesi silinirken bir hata oluştu!', 'error')
-        print(f"\n=== Hata ===")
-        print(f"Hata mesajı: {str(e)}")
-        print("============\n")
+        logger.exception('Program öğesi silinirken bir hata oluştu')
     
     return redirect(url_for('view_schedule'))
 
@@ -471,12 +824,10 @@ def delete_department(department_id):
         db.session.delete(department)
         db.session.commit()
         flash('Bölüm başarıyla silindi!', 'success')
-    except Exception as e:
+    except Exception:
         # Hata durumunda logla ve kullanıcıya bildir
         flash('Bölüm silinirken bir hata oluştu!', 'error')
-        print(f"\n=== Hata ===")
-        print(f"Hata mesajı: {str(e)}")
-        print("============\n")
+        logger.exception('Bölüm silinirken bir hata oluştu')
     
     return redirect(url_for('departments'))
 
@@ -489,30 +840,33 @@ def delete_course(course_id):
     :param course_id: Silinecek dersin ID'si
     """
     try:
-        # Dersin kullanıldığı program öğeleri var mı kontrol et
-        schedule_count = Schedule.query.filter_by(course_id=course_id).count()
+        # Dersin kullanıldığı program öğeleri var mı kontrol et (arşivlenmemiş tüm dönemlerde)
+        schedule_count, other_terms = schedule_usage(Schedule.course_id, course_id)
         
         # İlişkili kayıtlar varsa silme
         if schedule_count > 0:
             flash(f'Bu ders silinemez: {schedule_count} program öğesi bu derse bağlı!', 'error')
             return redirect(url_for('courses'))
+        if other_terms > 0:
+            flash(f'Bu ders silinemez: geçmiş dönemlere ait {other_terms} program öğesi bu derse bağlı '
+                  f'(dönem arşivlendikten sonra silinebilir)!', 'error')
+            return redirect(url_for('courses'))
             
         # Dersi bul ve sil
         course = Course.query.get_or_404(course_id)
         db.session.delete(course)
         db.session.commit()
         flash('Ders başarıyla silindi!', 'success')
-    except Exception as e:
+    except Exception:
         # Hata durumunda logla ve kullanıcıya bildir
         flash('Ders silinirken bir hata oluştu!', 'error')
-        print(f"\n=== Hata ===")
-        print(f"Hata mesajı: {str(e)}")
-        print("============\n")
+        logger.exception('Ders silinirken bir hata oluştu')
     
     return redirect(url_for('courses'))
 
 # Ders düzenleme endpoint'i
 @app.route('/courses/edit/<int:course_id>', methods=['GET', 'POST'])
+@query_budget(5)
 @admin_required  # Sadece adminler ders düzenleyebilir
 def edit_course(course_id):
     """
@@ -532,21 +886,38 @@ def edit_course(course_id):
             instructor_id = request.form.get('instructor_id') if request.form.get('instructor_id') else None
             semester = request.form.get('semester', 1)
             
-            # Dersi güncelle
-            course.name = name
-            course.department_id = department_id
-            course.instructor_id = instructor_id
-            course.semester = semester
+            # Yeni öğretim üyesinin diğer dersleriyle çakışacak öğeler, değişiklik kaydedilmeden yeniden yerleştirilir
+            instructor_changed = str(course.instructor_id or '') != str(instructor_id or '')
+            result = None
+            if instructor_changed and instructor_id:
+                change = CourseChange(course_id, instructor_id, department_id, semester)
+                result = repair_placements(invalidated_by_instructor_change(change), course_change=change)
             
-            db.session.commit()
-            flash('Ders başarıyla güncellendi!', 'success')
-            return redirect(url_for('courses'))
-        except Exception as e:
+            if result is not None and result.unplaced:
+                # Çakışma bırakacak değişiklik kaydedilmez
+                flash(f'Ders güncellenemedi: yeni öğretim üyesinin programında yer bulunamadı; '
+                      f'{describe_repair(result)}.', 'error')
+            else:
+                # Dersi güncelle, taşınan öğelerle birlikte tek işlemde kaydet
+                course.name = name
+                course.department_id = department_id
+                course.instructor_id = instructor_id
+                course.semester = semester
+                moved = stage_repair(result) if result is not None else []
+                
+                db.session.commit()
+                # Öğretim üyesi veya sınıf grubu değişmiş olabilir, indeksi güncelle
+                schedule_index.update_course(course_id, instructor_id, department_id, semester)
+                for placement in moved:
+                    schedule_index.add(placement)
+                if moved:
+                    flash(f'Öğretim üyesi çakışmaları onarıldı: {describe_repair(result)}.', 'info')
+                flash('Ders başarıyla güncellendi!', 'success')
+                return redirect(url_for('courses'))
+        except Exception:
             # Hata durumunda logla ve kullanıcıya bildir
             flash('Ders güncellenirken bir hata oluştu!', 'error')
-            print(f"\n=== Hata ===")
-            print(f"Hata mesajı: {str(e)}")
-            print("============\n")
+            logger.exception('Ders güncellenirken bir hata oluştu')
     
     # Formda kullanılacak verileri getir
     departments = Department.query.all()
@@ -562,30 +933,52 @@ def delete_classroom(classroom_id):
     :param classroom_id: Silinecek dersliğin ID'si
     """
     try:
-        # Dersliğin kullanıldığı program öğeleri var mı kontrol et
-        schedule_count = Schedule.query.filter_by(classroom_id=classroom_id).count()
+        # Dersliğin kullanıldığı program öğeleri var mı kontrol et (arşivlenmemiş tüm dönemlerde)
+        schedule_count, other_terms = schedule_usage(Schedule.classroom_id, classroom_id)
+        moved = []
+        repair_message = None
         
-        # İlişkili kayıtlar varsa silme
-        if schedule_count > 0:
-            flash(f'Bu derslik silinemez: {schedule_count} program öğesi bu dersliğe bağlı!', 'error')
+        # Onarım sadece aktif dönemi taşır; geçmiş dönemlerin öğeleri arşivlenene kadar derslik silinmez
+        if other_terms > 0:
+            flash(f'Bu derslik silinemez: geçmiş dönemlere ait {other_terms} program öğesi bu dersliğe bağlı '
+                  f'(dönem arşivlendikten sonra silinebilir)!', 'error')
             return redirect(url_for('classrooms'))
+        
+        # İlişkili kayıtlar varsa, onarım istenmediyse silme
+        if schedule_count > 0:
+            if not request.form.get('repair'):
+                flash(f'Bu derslik silinemez: {schedule_count} program öğesi bu dersliğe bağlı!', 'error')
+                return redirect(url_for('classrooms'))
+            
+            # Bağlı program öğelerini başka dersliklere/saatlere taşı
+            result = repair_placements(invalidated_by_classroom_removal(classroom_id),
+                                       excluded_classrooms={classroom_id})
+            repair_message = describe_repair(result)
+            if result.unplaced:
+                flash(f'Bu derslik silinemez: {repair_message}', 'error')
+                return redirect(url_for('classrooms'))
+            moved = stage_repair(result)
             
         # Dersliği bul ve sil
         classroom = Classroom.query.get_or_404(classroom_id)
         db.session.delete(classroom)
         db.session.commit()
-        flash('Derslik başarıyla silindi!', 'success')
-    except Exception as e:
+        for placement in moved:
+            schedule_index.add(placement)
+        if repair_message:
+            flash(f'Derslik silindi; {repair_message}.', 'success')
+        else:
+            flash('Derslik başarıyla silindi!', 'success')
+    except Exception:
         # Hata durumunda logla ve kullanıcıya bildir
         flash('Derslik silinirken bir hata oluştu!', 'error')
-        print(f"\n=== Hata ===")
-        print(f"Hata mesajı: {str(e)}")
-        print("============\n")
+        logger.exception('Derslik silinirken bir hata oluştu')
     
     return redirect(url_for('classrooms'))
 
 # Derslik düzenleme endpoint'i
 @app.route('/classrooms/edit/<int:classroom_id>', methods=['GET', 'POST'])
+@query_budget(3)
 @admin_required  # Sadece adminler derslik düzenleyebilir
 def edit_classroom(classroom_id):
     """
@@ -600,43 +993,56 @@ def edit_classroom(classroom_id):
     if request.method == 'POST':
         try:
             # Form verilerini al
-            capacity = request.form.get('capacity')
+            capacity = int(request.form.get('capacity'))
             
-            # Dersliği güncelle
-            classroom.capacity = capacity
-            
-            db.session.commit()
-            flash('Derslik başarıyla güncellendi!', 'success')
-            return redirect(url_for('classrooms'))
-        except Exception as e:
+            # Kapasite düşürüldüyse artık sığmayan öğeler, değişiklik kaydedilmeden başka dersliklere taşınır
+            result = repair_placements(invalidated_by_capacity_change(classroom_id, classroom.capacity, capacity),
+                                       excluded_classrooms={classroom_id})
+            if result.unplaced:
+                flash(f'Derslik güncellenemedi: sığmayan program öğelerine yer bulunamadı; '
+                      f'{describe_repair(result)}.', 'error')
+            else:
+                # Dersliği güncelle, taşınan öğelerle birlikte tek işlemde kaydet
+                classroom.capacity = capacity
+                moved = stage_repair(result)
+                
+                db.session.commit()
+                for placement in moved:
+                    schedule_index.add(placement)
+                if moved:
+                    flash(f'Kapasite değişikliği sonrası program onarıldı: {describe_repair(result)}.', 'info')
+                flash('Derslik başarıyla güncellendi!', 'success')
+                return redirect(url_for('classrooms'))
+        except Exception:
             # Hata durumunda logla ve kullanıcıya bildir
             flash('Derslik güncellenirken bir hata oluştu!', 'error')
-            print(f"\n=== Hata ===")
-            print(f"Hata mesajı: {str(e)}")
-            print("============\n")
+            logger.exception('Derslik güncellenirken bir hata oluştu')
     
     return render_template('edit_classroom.html', classroom=classroom)
 
 # Ders programını Excel'e aktarma endpoint'i
 @app.route('/export_schedule', methods=['GET'])
+@query_budget(3)
 @admin_required  # Sadece adminler programı dışa aktarabilir
 def export_schedule():
     """
     Mevcut ders programını Excel formatında dışa aktarır
+    Parametre: departments (virgülle ayrılmış bölüm kodları, örn. BLM,YZM; verilmezse tüm bölümler)
     """
     try:
-        # Excel çalışma kitabı oluştur
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Ders Programı"
+        # Bölüm filtresini al ve tüm programı tek sorguda gün x sınıf tablosuna yerleştir
+        departments_param = request.args.get('departments', '')
+        department_codes = [code.strip() for code in departments_param.split(',') if code.strip()] or None
+        grid = build_grid(load_schedule_items(department_codes), DAYS)
+        
+        # Bellekte, sadece yazılabilir modda Excel çalışma kitabı oluştur
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Ders Programı")
         
         # Sütun genişliklerini ayarla
         ws.column_dimensions['A'].width = 15  # Günler için
-        for col in range(2, 6):  # 1-4 sınıflar için
-            ws.column_dimensions[chr(64 + col)].width = 30
-            
-        # Haftanın günleri
-        days = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma']
+        for grade in GRADES:  # 1-4 sınıflar için
+            ws.column_dimensions[get_column_letter(grade + 1)].width = 30
         
         # Stil tanımları
         header_font = Font(bold=True, color="FFFFFF")
@@ -657,154 +1063,273 @@ def export_schedule():
             bottom=Side(style='thin')
         )
         
-        # Başlık satırını hazırla - Sınıf seviyelerini ekle
-        ws.cell(row=1, column=1, value="Gün/Sınıf").font = header_font
-        ws.cell(row=1, column=1).fill = header_fill
-        ws.cell(row=1, column=1).alignment = header_alignment
-        ws.cell(row=1, column=1).border = thin_border
-        
-        # Sınıf seviyelerini başlıklara ekle (1. Sınıf, 2. Sınıf, vb.)
-        for grade in range(1, 5):  # 1-4. sınıflar
-            cell = ws.cell(row=1, column=grade+1, value=f"{grade}. Sınıf")
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
+        def styled_cell(value, font=None, fill=None, alignment=None):
+            # Sadece yazılabilir modda stiller hücre yazılmadan önce atanmalıdır
+            cell = WriteOnlyCell(ws, value=value)
             cell.border = thin_border
-            
+            if font:
+                cell.font = font
+            if fill:
+                cell.fill = fill
+            if alignment:
+                cell.alignment = alignment
+            return cell
+        
+        # Başlık satırını hazırla - Sınıf seviyelerini ekle (1. Sınıf, 2. Sınıf, vb.)
+        ws.append(
+            [styled_cell("Gün/Sınıf", header_font, header_fill, header_alignment)] +
+            [styled_cell(f"{grade}. Sınıf", header_font, header_fill, header_alignment) for grade in GRADES]
+        )
+        
         # Gün satırlarını ekle
-        for row, day in enumerate(days, start=2):
-            # Gün adını ekle
-            cell = ws.cell(row=row, column=1, value=day)
-            cell.font = day_font
-            cell.fill = day_fill
-            cell.alignment = day_alignment
-            cell.border = thin_border
+        for row, day in enumerate(DAYS, start=2):
+            # Satır yüksekliğini ayarla
+            ws.row_dimensions[row].height = 150
             
-            # Her sınıf seviyesi için bu günde olan programları bul
-            for grade in range(1, 5):  # 1-4. sınıflar
-                cell = ws.cell(row=row, column=grade+1, value="")
-                cell.border = thin_border
-                cell.alignment = cell_alignment
-                
-                # Bu sınıfın yarıyıllarını belirle (her sınıf 2 yarıyıl içerir)
-                # 1. sınıf: 1-2, 2. sınıf: 3-4, 3. sınıf: 5-6, 4. sınıf: 7-8
-                first_semester = (grade - 1) * 2 + 1
-                second_semester = first_semester + 1
-                semesters = [first_semester, second_semester]
-                
-                # Bu gün ve sınıf seviyesinde olan dersleri bul
-                # BLM ve YZM bölümlerini birlikte göster
-                blm_dept = Department.query.filter_by(code='BLM').first()
-                yzm_dept = Department.query.filter_by(code='YZM').first()
-                
-                if blm_dept and yzm_dept:
-                    # Bu sınıfın yarıyıllarındaki dersleri bul
-                    blm_courses = Course.query.filter(
-                        Course.semester.in_(semesters),
-                        Course.department_id == blm_dept.id
-                    ).all()
+            cells = [styled_cell(day, day_font, day_fill, day_alignment)]
+            for grade in GRADES:
+                cell_text = []
+                for item in grid[day][grade]:
+                    course = item.course
+                    instructor = course.instructor
                     
-                    yzm_courses = Course.query.filter(
-                        Course.semester.in_(semesters),
-                        Course.department_id == yzm_dept.id
-                    ).all()
+                    # Dersin bölümünü ve yarıyılını da ekle
+                    dept_code = course.department.code if course.department else ''
                     
-                    # Tüm kurs ID'lerini birleştir
-                    course_ids = [course.id for course in blm_courses + yzm_courses]
+                    course_info = (
+                        f"{course.code} - {course.name} ({dept_code}, {course.semester}. Yarıyıl)\n"
+                        f"Derslik: {item.classroom.code if item.classroom else 'Belirtilmemiş'}\n"
+                        f"Saat: {item.start_time}-{item.end_time}"
+                    )
                     
-                    if course_ids:
-                        # Bu günde ve bu kurslarda olan programları bul
-                        schedule_items = Schedule.query.filter(
-                            Schedule.day == day,
-                            Schedule.course_id.in_(course_ids)
-                        ).order_by(Schedule.start_time).all()
+                    if instructor:
+                        course_info += f"\nÖğr. Üyesi: {instructor.name}"
                         
-                        # Program varsa hücreye ekle
-                        if schedule_items:
-                            cell_text = []
-                            for item in schedule_items:
-                                course = Course.query.get(item.course_id)
-                                classroom = Classroom.query.get(item.classroom_id)
-                                instructor = User.query.get(course.instructor_id) if course.instructor_id else None
-                                
-                                # Dersin yarıyılını da ekle
-                                dept_code = Department.query.get(course.department_id).code if course.department_id else ''
-                                
-                                course_info = (
-                                    f"{course.code} - {course.name} ({dept_code}, {course.semester}. Yarıyıl)\n"
-                                    f"Derslik: {classroom.code if classroom else 'Belirtilmemiş'}\n"
-                                    f"Saat: {item.start_time}-{item.end_time}"
-                                )
-                                
-                                if instructor:
-                                    course_info += f"\nÖğr. Üyesi: {instructor.name}"
-                                    
-                                cell_text.append(course_info)
-                            
-                            cell.value = "\n\n".join(cell_text)
-            
-            # Satır yüksekliğini ayarla
-            ws.row_dimensions[row].height = 150
-            
-        # Geçici dosya oluştur ve Excel'i kaydet
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            wb.save(tmp.name)
-            tmp_path = tmp.name
-            
-        # Excel dosyasını kullanıcıya gönder
+                    cell_text.append(course_info)
+                
+                cells.append(styled_cell("\n\n".join(cell_text), alignment=cell_alignment))
+            ws.append(cells)
+        
+        # Excel'i bellekte oluştur ve kullanıcıya gönder (geçici dosya kullanılmaz)
+        output = io.BytesIO()
+        wb.save(output)
+        output.seek(0)
+        
         return send_file(
-            tmp_path,
+            output,
             as_attachment=True,
             download_name='ders_programi.xlsx',
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
         
-    except Exception as e:
+    except Exception:
         # Hata durumunda logla ve kullanıcıya bildir
         flash('Ders programı dışa aktarılırken bir hata oluştu!', 'error')
-        print(f"\n=== Hata ===")
-        print(f"Hata mesajı: {str(e)}")
-        print("============\n")
+        logger.exception('Ders programı dışa aktarılırken bir hata oluştu')
         return redirect(url_for('view_schedule'))
 
-# Uygulama başlangıç kontrollerini yap ve sunucuyu başlat
+# Öğretim üyesi / derslik / sınıf programlarını toplu dışa aktarma endpoint'i
+@app.route('/export_schedule/bulk', methods=['GET'])
+@query_budget(3)
+@admin_required  # Sadece adminler programı dışa aktarabilir
+def export_schedule_bulk():
+    """
+    Her öğretim üyesi, derslik ve bölüm-yarıyıl grubu için ayrı program dosyası
+    oluşturur ve bunları ZIP arşivi olarak akış halinde gönderir
+    Parametreler: format (xlsx veya csv), departments (virgülle ayrılmış bölüm kodları)
+    """
+    file_format = request.args.get('format', 'xlsx').lower()
+    if file_format not in EXPORT_FORMATS:
+        flash('Geçersiz dosya biçimi! (xlsx veya csv olmalı)', 'error')
+        return redirect(url_for('view_schedule'))
+    
+    try:
+        # Tüm dosyalar aynı anlık görüntüden oluşturulur, dosya başına sorgu atılmaz
+        departments_param = request.args.get('departments', '')
+        department_codes = [code.strip() for code in departments_param.split(',') if code.strip()] or None
+        timetables = group_timetables(take_snapshot(department_codes))
+    except Exception:
+        # Hata durumunda logla ve kullanıcıya bildir
+        flash('Ders programı dışa aktarılırken bir hata oluştu!', 'error')
+        logger.exception('Ders programı dışa aktarılırken bir hata oluştu')
+        return redirect(url_for('view_schedule'))
+    
+    response = Response(stream_zip(timetables, file_format), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename=ders_programlari_{file_format}.zip'
+    return response
+
+# Toplu veri aktarma (CSV / Excel) endpoint'i
+@app.route('/import', methods=['GET', 'POST'])
+@admin_required  # Sadece adminler toplu veri aktarabilir
+def import_data():
+    """
+    Ders, derslik veya program öğelerini CSV / Excel dosyasından toplu ekler
+    GET: Aktarım formunu göster
+    POST: Dosyayı doğrula; hata yoksa tüm satırları tek işlemde ekle, varsa satır bazında hata raporu göster
+    """
+    report = None
+    kind = request.form.get('kind', COURSES)
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if kind not in IMPORT_KINDS:
+            flash('Geçersiz veri türü!', 'error')
+            return redirect(url_for('import_data'))
+        if not upload or not upload.filename:
+            flash('Lütfen bir dosya seçin!', 'error')
+            return redirect(url_for('import_data'))
+        
+        try:
+            report = import_table(kind, read_table(upload.stream, upload.filename))
+        except ValueError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('import_data'))
+        except Exception:
+            # Hata durumunda logla ve kullanıcıya bildir
+            logger.exception('Dosya aktarılırken bir hata oluştu')
+            flash('Dosya aktarılırken bir hata oluştu!', 'error')
+            return redirect(url_for('import_data'))
+        
+        if report.ok and report.inserted:
+            flash(f'{report.inserted} kayıt başarıyla eklendi ({report.elapsed:.2f} sn).', 'success')
+        elif report.ok:
+            flash('Dosyada aktarılacak kayıt bulunamadı.', 'warning')
+        else:
+            flash(f'Dosyada {len(report.errors)} hata bulundu, hiçbir kayıt eklenmedi.', 'error')
+    
+    return render_template('import.html', report=report, kind=kind, columns=IMPORT_COLUMNS,
+                           required=IMPORT_REQUIRED)
+
+# Komut satırından program oluşturma: flask --app app generate-schedule
+@app.cli.command('generate-schedule')
+@click.option('--group-size', default=DEFAULT_GROUP_SIZE, show_default=True, help='Beklenen şube mevcudu')
+@click.option('--time-limit', default=10.0, show_default=True, help='Arama süresi sınırı (saniye)')
+@click.option('--seed', default=None, type=int, help='Rastgele eşitlik bozma tohumu')
+@click.option('--dry-run', is_flag=True, help='Sonucu veritabanına yazmadan göster')
+def generate_schedule_command(group_size, time_limit, seed, dry_run):
+    """
+    Ders ve derslik bilgilerinden haftalık programı oluşturur
+    """
+    problem = load_problem(group_size)
+    solution = solve(problem, seed=seed, time_limit=time_limit)
+    summary = solution.summary()
+    click.echo(f"{summary['placed']} oturum yerleştirildi ({summary['elapsed']} sn, {summary['nodes']} adım)")
+    if summary['unplaced']:
+        click.echo(f"Yerleştirilemeyen oturumlar: {', '.join(summary['unplaced'])}")
+    if not dry_run:
+        apply_solution(problem, solution)
+        click.echo("Program veritabanına kaydedildi.")
+
+# Komut satırından toplu veri aktarma: flask --app app import-data courses dersler.xlsx
+@app.cli.command('import-data')
+@click.argument('kind', type=click.Choice(IMPORT_KINDS))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_data_command(kind, path):
+    """
+    Ders, derslik veya program öğelerini CSV / Excel dosyasından toplu ekler
+    """
+    report = import_table(kind, read_table(path, path))
+    for error in report.errors:
+        click.echo(f"Satır {error.row} [{error.column}]: {error.message}")
+    if report.ok:
+        click.echo(f"{report.inserted}/{report.total} kayıt eklendi ({report.elapsed:.2f} sn)")
+    else:
+        raise click.ClickException(f"{len(report.errors)} hata bulundu, hiçbir kayıt eklenmedi")
+
+# Komut satırından program denetimi: flask --app app audit-schedule
+@app.cli.command('audit-schedule')
+def audit_schedule_command():
+    """
+    Tüm programı derslik, öğretim üyesi ve sınıf grubu çakışmaları için denetler
+    """
+    clashes, total, elapsed = audit_schedule()
+    report = clash_report(clashes)
+    titles = {'classroom': 'Derslik', 'instructor': 'Öğretim üyesi', 'cohort': 'Sınıf grubu'}
+    for kind, found in report.items():
+        click.echo(f"{titles[kind]} çakışmaları: {len(found)}")
+        for clash in found:
+            first, second = clash['items']
+            click.echo(f"  {clash['owner']} {clash['day']} {clash['overlap_start']}-{clash['overlap_end']}: "
+                       f"{first['course_code']} ({first['classroom_code']}, {first['start_time']}-{first['end_time']}) / "
+                       f"{second['course_code']} ({second['classroom_code']}, {second['start_time']}-{second['end_time']})")
+    click.echo(f"{total} program öğesi {elapsed:.3f} sn içinde denetlendi")
+    if any(clashes.values()):
+        raise SystemExit(1)
+
+# Veritabanı migrasyonlarını uygulama: flask --app app migrate
+@app.cli.command('migrate')
+def migrate_command():
+    """
+    Bekleyen veritabanı migrasyonlarını uygular (dağıtım sırasında bir kez çalıştırılır)
+    """
+    if not upgrade(db.engine, echo=click.echo):
+        click.echo("Veritabanı güncel, bekleyen migrasyon yok.")
+
+# Dönem ekleme: flask --app app create-term 2025-BAHAR "2025-2026 Bahar Dönemi" --activate
+@app.cli.command('create-term')
+@click.argument('code')
+@click.argument('name')
+@click.option('--activate', is_flag=True, help='Yeni dönemi aktif dönem yap')
+def create_term_command(code, name, activate):
+    """
+    Yeni bir akademik dönem ekler
+    """
+    try:
+        create_term(code, name, activate)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{code} dönemi eklendi{' ve aktif yapıldı' if activate else ''}.")
+
+# Aktif dönemi değiştirme: flask --app app activate-term 2025-BAHAR
+@app.cli.command('activate-term')
+@click.argument('code')
+def activate_term_command(code):
+    """
+    Dönemi aktif dönem yapar (program sayfaları ve yeni program öğeleri bu döneme geçer)
+    """
+    try:
+        activate_term(code)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{code} aktif dönem yapıldı.")
+
+# Biten dönemi arşivleme: flask --app app archive-term 2025-GUZ
+@app.cli.command('archive-term')
+@click.argument('code')
+def archive_term_command(code):
+    """
+    Biten dönemin programını arşiv veritabanına taşır
+    """
+    try:
+        count = archive_term(code)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{code} dönemi arşivlendi: {count} program öğesi {app.config['ARCHIVE_DATABASE']} dosyasına taşındı.")
+
+# Dönemleri listeleme: flask --app app list-terms
+@app.cli.command('list-terms')
+def list_terms_command():
+    """
+    Dönemleri durumları ve program öğesi sayılarıyla listeler
+    """
+    counts = dict(db.session.query(Schedule.term_id, func.count(Schedule.id)).group_by(Schedule.term_id).all())
+    for term in Term.query.order_by(Term.id):
+        if term.archived_at:
+            status = f"arşivlendi ({term.archived_at:%Y-%m-%d})"
+        else:
+            status = f"{'aktif, ' if term.is_active else ''}{counts.get(term.id, 0)} program öğesi"
+        click.echo(f"{term.code:<12} {term.name:<40} {status}")
+
+# Sunucuyu başlat
 if __name__ == '__main__':
     """
     Uygulama başlatıldığında çalışır
-    - Veritabanı tabloları oluşturulur (yoksa)
-    - Admin kullanıcısı oluşturulur (yoksa)
+    - Bekleyen migrasyon varsa uyarı verilir (migrasyonlar burada çalıştırılmaz)
     - Flask geliştirme sunucusu başlatılır
     """
     with app.app_context():
-        # Veritabanı tablolarını oluştur
-        db.create_all()
-        
-        # Eksik sütunları ekle (migrasyon)
-        try:
-            # Course tablosunda instructor_id sütunu var mı kontrol et
-            inspector = inspect(db.engine)
-            
-            # Course tablosuna instructor_id ekle
-            if 'instructor_id' not in [c['name'] for c in inspector.get_columns('courses')]:
-                with db.engine.begin() as conn:
-                    conn.execute(text("ALTER TABLE courses ADD COLUMN instructor_id INTEGER REFERENCES users(id)"))
-                print("courses tablosuna instructor_id sütunu eklendi.")
-            
-            # Diğer eksik sütunları da kontrol et ve ekle
-            if 'semester' not in [c['name'] for c in inspector.get_columns('courses')]:
-                with db.engine.begin() as conn:
-                    conn.execute(text("ALTER TABLE courses ADD COLUMN semester INTEGER DEFAULT 1"))
-                print("courses tablosuna semester sütunu eklendi.")
-        except Exception as e:
-            print(f"Migrasyon hatası: {str(e)}")
-        
-        # Admin kullanıcısı oluştur (yoksa)
-        admin = User.query.filter_by(username='admin').first()
-        if not admin:
-            admin = User(username='admin', password='admin123', role='admin', name='Sistem Yöneticisi')
-            db.session.add(admin)
-            db.session.commit()
-            print("Admin kullanıcısı oluşturuldu. Kullanıcı adı: admin, Şifre: admin123")
+        pending = pending_migrations(db.engine)
+        if pending:
+            logger.warning("%d bekleyen migrasyon var. Önce 'flask --app app migrate' çalıştırın.", len(pending))
     
     # Geliştirme sunucusunu başlat
-    app.run(debug=True) 
\ No newline at end of file
+    app.run(debug=True)
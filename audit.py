@@ -0,0 +1,114 @@
+"""
+Program genelinde çakışma denetimi
+
+Ekleme sayfaları yalnızca yeni öğeyi kontrol eder; öğretim üyesi kontrolü
+eklenmeden önce girilmiş ya da veritabanında doğrudan düzenlenmiş kayıtlar
+fark edilmeden çakışabilir. Denetim tüm program öğelerini tek sorguda yükler,
+başlangıca göre bir kez sıralayıp her (derslik / öğretim üyesi / sınıf grubu,
+gün) için ayırır ve bir tarama çizgisiyle (sweep-line) üst üste binen tüm
+çiftleri O(n log n + çakışma sayısı) sürede bulur.
+
+    flask --app app audit-schedule
+    GET /schedule/audit
+"""
+import time
+from collections import namedtuple
+from heapq import heappop, heappush
+from operator import attrgetter
+
+from models import db, Classroom, Course, Department, User, DAYS, minutes_to_time
+from occupancy import CLASSROOM, INSTRUCTOR, COHORT, load_placements, placement_keys
+
+# Çakışma türleri (rapordaki sırayla)
+KINDS = (CLASSROOM, INSTRUCTOR, COHORT)
+
+# İki program öğesinin çakışması: ortak sahip, gün ve üst üste binen aralık (dakika)
+Clash = namedtuple('Clash', ['kind', 'owner', 'day', 'first', 'second', 'start', 'end'])
+
+
+def find_clashes(placements):
+    """
+    Program öğeleri arasındaki tüm derslik, öğretim üyesi ve sınıf grubu çakışmalarını bulur
+    :param placements: Placement listesi
+    :return: {tür: [Clash]} (gün ve saate göre sıralı)
+    """
+    # Tek bir sıralama: gruplara başlangıç sırasıyla dağıtılan öğeler grup içinde de sıralı kalır
+    groups = {}
+    for placement in sorted(placements, key=attrgetter('start', 'end', 'id')):
+        for kind, owner in placement_keys(placement):
+            groups.setdefault((kind, owner, placement.day), []).append(placement)
+
+    clashes = {kind: [] for kind in KINDS}
+    for (kind, owner, day), items in groups.items():
+        if len(items) < 2:
+            continue
+        found = clashes[kind]
+        active = []  # (bitiş, id, Placement) - henüz bitmemiş öğeler
+        for placement in items:
+            while active and active[0][0] <= placement.start:
+                heappop(active)
+            for end, _, other in active:
+                # Aynı dersin paralel şubeleri sınıf grubu için çakışma sayılmaz
+                if kind == COHORT and other.course_id == placement.course_id:
+                    continue
+                found.append(Clash(kind, owner, day, other, placement, placement.start, min(end, placement.end)))
+            heappush(active, (placement.end, placement.id, placement))
+
+    order = {day: index for index, day in enumerate(DAYS)}
+    for found in clashes.values():
+        found.sort(key=lambda clash: (order.get(clash.day, len(DAYS)), clash.start, clash.first.id, clash.second.id))
+    return clashes
+
+
+def audit_schedule():
+    """
+    Veritabanındaki programı denetler
+    :return: (çakışmalar, program öğesi sayısı, geçen süre (sn))
+    """
+    started = time.perf_counter()
+    placements = load_placements()
+    clashes = find_clashes(placements)
+    return clashes, len(placements), time.perf_counter() - started
+
+
+def clash_report(clashes):
+    """
+    Çakışmaları etiketleriyle (ders / derslik kodu, öğretim üyesi adı, bölüm kodu) JSON'a uygun rapora çevirir
+    :param clashes: find_clashes sonucu
+    :return: {tür: [sözlük]}
+    """
+    all_clashes = [clash for found in clashes.values() for clash in found]
+    items = [item for clash in all_clashes for item in (clash.first, clash.second)]
+    course_codes = dict(db.session.query(Course.id, Course.code)
+                        .filter(Course.id.in_({item.course_id for item in items})))
+    classroom_codes = dict(db.session.query(Classroom.id, Classroom.code)
+                           .filter(Classroom.id.in_({item.classroom_id for item in items})))
+    instructor_names = dict(db.session.query(User.id, User.name)
+                            .filter(User.id.in_({clash.owner for clash in clashes[INSTRUCTOR]})))
+    department_codes = dict(db.session.query(Department.id, Department.code)
+                            .filter(Department.id.in_({clash.owner[0] for clash in clashes[COHORT]})))
+
+    def owner_label(clash):
+        if clash.kind == CLASSROOM:
+            return classroom_codes.get(clash.owner)
+        if clash.kind == INSTRUCTOR:
+            return instructor_names.get(clash.owner)
+        department_id, semester = clash.owner
+        return f'{department_codes.get(department_id)} {semester}. Yarıyıl'
+
+    def item_report(item):
+        return {
+            'schedule_id': item.id,
+            'course_code': course_codes.get(item.course_id),
+            'classroom_code': classroom_codes.get(item.classroom_id),
+            'start_time': minutes_to_time(item.start),
+            'end_time': minutes_to_time(item.end),
+        }
+
+    return {kind: [{
+        'owner': owner_label(clash),
+        'day': clash.day,
+        'overlap_start': minutes_to_time(clash.start),
+        'overlap_end': minutes_to_time(clash.end),
+        'items': [item_report(clash.first), item_report(clash.second)],
+    } for clash in found] for kind, found in clashes.items()}
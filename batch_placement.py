@@ -0,0 +1,174 @@
+"""
+Toplu program yerleştirme
+
+Bir sınıf grubunun haftası gibi çok sayıda (ders, derslik, gün, başlangıç,
+bitiş) yerleştirmesi tek seferde kontrol edilir ve ya hepsi ya hiçbiri
+kaydedilir. Her öğe hem mevcut programla (doluluk indeksi) hem de aynı
+istekteki önceki öğelerle (geçici bir indeks) derslik ve öğretim üyesi
+çakışmaları için karşılaştırılır; sorunlu öğeler için öğe bazında bir rapor
+döndürülür.
+
+Kontrol ile kayıt arasında başka bir sürecin programı değiştirmesine karşı
+yazma kilidi (sürüm artırımı) alındıktan sonra indeksin sürümü doğrulanır;
+arada yazma olduysa indeks aynı işlem içinde yeniden yüklenip kontrol
+tekrarlanır.
+"""
+from sqlalchemy import func
+
+from models import db, Classroom, Course, Schedule, DAYS, day_to_index, minutes_to_time, time_to_minutes
+from occupancy import CLASSROOM, INSTRUCTOR, OccupancyIndex, Placement, load_placements, schedule_index
+from versioning import bump_version
+
+# Tek istekte kabul edilen en fazla yerleştirme sayısı
+MAX_BATCH_SIZE = 500
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_items(items):
+    """
+    İstekteki yerleştirmeleri doğrular ve Placement adaylarına çevirir
+    :param items: course_id, classroom_id, day, start_time, end_time anahtarlı sözlükler
+    :return: (Placement listesi, {öğe sırası: [hata mesajı]}); Placement id'si -(sıra + 1)
+    """
+    course_ids = {_parse_id(item.get('course_id')) for item in items if isinstance(item, dict)}
+    classroom_ids = {_parse_id(item.get('classroom_id')) for item in items if isinstance(item, dict)}
+    courses = {course.id: course for course in Course.query.filter(Course.id.in_(course_ids - {None}))}
+    classrooms = set(row[0] for row in db.session.query(Classroom.id).filter(Classroom.id.in_(classroom_ids - {None})))
+
+    placements, errors = [], {}
+    for position, item in enumerate(items):
+        problems = []
+        if not isinstance(item, dict):
+            errors[position] = ['Yerleştirme bir nesne olmalıdır']
+            continue
+
+        course = courses.get(_parse_id(item.get('course_id')))
+        if course is None:
+            problems.append(f"Ders bulunamadı: {item.get('course_id')}")
+        classroom_id = _parse_id(item.get('classroom_id'))
+        if classroom_id not in classrooms:
+            problems.append(f"Derslik bulunamadı: {item.get('classroom_id')}")
+
+        day = item.get('day')
+        day_index = day if isinstance(day, int) else day_to_index(day)
+        if day_index is None or not 0 <= day_index < len(DAYS):
+            problems.append(f'Geçersiz gün: {day}')
+        try:
+            start = time_to_minutes(item.get('start_time'))
+            end = time_to_minutes(item.get('end_time'))
+            if start >= end:
+                problems.append('Bitiş saati başlangıç saatinden sonra olmalıdır')
+        except (AttributeError, ValueError):
+            problems.append(f"Geçersiz saat: {item.get('start_time')}-{item.get('end_time')}")
+
+        if problems:
+            errors[position] = problems
+            continue
+        placements.append(Placement(
+            -(position + 1), course.id, classroom_id, DAYS[day_index], start, end,
+            course.instructor_id, course.department_id, course.semester
+        ))
+    return placements, errors
+
+
+def find_conflicts(placements, index):
+    """
+    Yerleştirmeleri mevcut programla ve birbirleriyle karşılaştırır
+    :param placements: parse_items'in döndürdüğü Placement listesi
+    :param index: Mevcut programın doluluk indeksi
+    :return: {öğe sırası: [çakışan Placement]}
+    """
+    batch = OccupancyIndex()
+    batch.build([])
+    conflicts = {}
+    for placement in placements:
+        # Tekli ekleme sayfasıyla aynı kontroller: derslik ve öğretim üyesi
+        keys = [(CLASSROOM, placement.classroom_id)]
+        if placement.instructor_id:
+            keys.append((INSTRUCTOR, placement.instructor_id))
+        found = []
+        for kind, owner in keys:
+            for source in (index, batch):
+                found.extend((kind, other) for other in
+                             source.conflicts(kind, owner, placement.day, placement.start, placement.end))
+        if found:
+            conflicts[-placement.id - 1] = found
+        # Sorunlu öğeler de sonraki öğelerle çakışma olarak raporlanır
+        batch.insert(placement)
+    return conflicts
+
+
+def build_report(errors, conflicts):
+    """
+    Hata ve çakışmaları öğe sırasına göre JSON'a uygun rapora çevirir
+    """
+    others = [other for found in conflicts.values() for _, other in found]
+    course_codes = dict(db.session.query(Course.id, Course.code)
+                        .filter(Course.id.in_({other.course_id for other in others})))
+    classroom_codes = dict(db.session.query(Classroom.id, Classroom.code)
+                           .filter(Classroom.id.in_({other.classroom_id for other in others})))
+
+    report = []
+    for position in sorted(set(errors) | set(conflicts)):
+        report.append({
+            'index': position,
+            'errors': errors.get(position, []),
+            'conflicts': [{
+                'kind': kind,
+                # Mevcut programdaki öğe için schedule_id, aynı istekteki öğe için batch_index
+                'schedule_id': other.id if other.id > 0 else None,
+                'batch_index': -other.id - 1 if other.id < 0 else None,
+                'course_code': course_codes.get(other.course_id),
+                'classroom_code': classroom_codes.get(other.classroom_id),
+                'day': other.day,
+                'start_time': minutes_to_time(other.start),
+                'end_time': minutes_to_time(other.end),
+            } for kind, other in conflicts.get(position, [])],
+        })
+    return report
+
+
+def place_batch(items, index=schedule_index):
+    """
+    Yerleştirmeleri kontrol eder; sorun yoksa hepsini tek işlemde kaydeder
+    :param items: Yerleştirme sözlükleri
+    :param index: Mevcut programın doluluk indeksi
+    :return: (oluşturulan program öğesi id'leri, sorun raporu); rapor boş değilse hiçbir şey kaydedilmez
+    """
+    placements, errors = parse_items(items)
+    index.ensure_built()
+    conflicts = find_conflicts(placements, index)
+    if errors or conflicts:
+        return [], build_report(errors, conflicts)
+
+    # Yazma kilidini al; kontrol edilen sürümden sonra başka bir yazma olduysa aynı işlem içinde tekrar kontrol et
+    version = bump_version()
+    if index.version != version - 1:
+        index.build(load_placements(), version - 1)
+        conflicts = find_conflicts(placements, index)
+        if conflicts:
+            db.session.rollback()
+            return [], build_report({}, conflicts)
+
+    # id'ler yazma kilidi altında önceden verilir: öğeler tek INSERT (executemany) ile eklenir ve
+    # commit sonrası id okumak için nesneleri yeniden yükleyen sorgular çalışmaz
+    last_id = db.session.query(func.max(Schedule.id)).scalar() or 0
+    placements = [placement._replace(id=last_id + number) for number, placement in enumerate(placements, 1)]
+    db.session.add_all([
+        Schedule(id=placement.id, course_id=placement.course_id, classroom_id=placement.classroom_id,
+                 day=placement.day, start_time=minutes_to_time(placement.start),
+                 end_time=minutes_to_time(placement.end))
+        for placement in placements
+    ])
+    db.session.flush()
+    db.session.commit()
+
+    for placement in placements:
+        index.add(placement)
+    return [placement.id for placement in placements], []
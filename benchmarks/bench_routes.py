@@ -0,0 +1,273 @@
+"""
+Sık kullanılan sayfalar için performans ölçümü
+
+Geçici bir SQLite veritabanına sentetik bir üniversite yüklenir ve Flask test
+istemcisiyle view_schedule, add_schedule, export_schedule, courses ve users
+sayfalarına tekrarlı istek atılır. Her sayfa için gecikme yüzdelikleri, SQL
+sorgu sayısı ve en yüksek bellek kullanımı (tracemalloc) ölçülür; sonuçlar
+commit'ler arasında karşılaştırılabilmesi için JSON olarak yazılır.
+
+Kullanım:
+    python benchmarks/bench_routes.py --profile realistic --output sonuc.json
+    python benchmarks/compare.py onceki.json sonraki.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Veri kümesi profilleri (generate_university parametreleri)
+PROFILES = {
+    # Mevcut fakülte büyüklüğü
+    'small': {'departments': 2, 'courses_per_department': 40, 'instructors_per_department': 14,
+              'classrooms': 22, 'sections': 1},
+    # Gerçekçi büyük üniversite: 50 bölüm, 5000 ders, ~8,6 bin program öğesi (her sınıf grubu haftada
+    # en fazla 40 ders saati alabildiğinden çakışmasız programa sığan öğe sayısı bununla sınırlıdır)
+    'realistic': {'departments': 50, 'courses_per_department': 100, 'instructors_per_department': 60,
+                  'classrooms': 2000, 'sections': 4},
+    # Uç durum: gerçekçi profilin dört katı
+    'extreme': {'departments': 200, 'courses_per_department': 100, 'instructors_per_department': 60,
+                'classrooms': 8000, 'sections': 4},
+}
+
+# add_schedule ölçümünde kullanılan, mevcut programla çakışmayan akşam saatleri
+BENCH_CLASSROOM = 'BENCH-ROOM'
+BENCH_SLOT_MINUTES = 10
+
+
+def percentile(values, fraction):
+    """
+    Sıralı olmayan değerlerden doğrusal aradeğerlemeyle yüzdelik hesaplar
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values):
+    return {
+        'min': round(min(values), 3),
+        'p50': round(percentile(values, 0.50), 3),
+        'p90': round(percentile(values, 0.90), 3),
+        'p95': round(percentile(values, 0.95), 3),
+        'p99': round(percentile(values, 0.99), 3),
+        'max': round(max(values), 3),
+        'mean': round(statistics.mean(values), 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+class QueryCounter:
+    """
+    Motor üzerinde çalıştırılan SQL ifadelerini sayar
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def evening_slots(days):
+    """
+    add_schedule için gün içi ders bloklarının dışında kalan, tekrarlanmayan zaman aralıkları
+    """
+    from models import minutes_to_time
+    for day in days:
+        start = 17 * 60
+        while start + BENCH_SLOT_MINUTES <= 24 * 60:
+            yield day, minutes_to_time(start), minutes_to_time(start + BENCH_SLOT_MINUTES)
+            start += BENCH_SLOT_MINUTES
+
+
+class RouteBenchmark:
+    """
+    Tek bir sayfanın ölçüm tanımı
+    :param name: Sonuçlardaki adı
+    :param request: client -> response döndüren fonksiyon
+    :param before: Her istekten önce çağrılacak (ölçülmeyen) hazırlık fonksiyonu
+    """
+
+    def __init__(self, name, request, before=None):
+        self.name = name
+        self.request = request
+        self.before = before
+
+    def run(self, client, counter, iterations, warmup):
+        for _ in range(warmup):
+            if self.before:
+                self.before()
+            self.request(client)
+
+        latencies, queries, sizes, statuses = [], [], [], set()
+        for _ in range(iterations):
+            if self.before:
+                self.before()
+            counter.count = 0
+            started = time.perf_counter()
+            response = self.request(client)
+            body = response.get_data()
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+            sizes.append(len(body))
+            statuses.add(response.status_code)
+
+        # Bellek ölçümü tracemalloc gecikmeyi bozmasın diye ayrı bir istekle yapılır
+        if self.before:
+            self.before()
+        tracemalloc.start()
+        self.request(client).get_data()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'iterations': iterations,
+            'status_codes': sorted(statuses),
+            'latency_ms': summarize(latencies),
+            'queries': {'min': min(queries), 'max': max(queries), 'mean': round(statistics.mean(queries), 2)},
+            'peak_memory_kb': round(peak / 1024, 1),
+            'response_bytes': int(statistics.median(sizes)),
+        }
+
+
+def build_benchmarks(app, db, iterations, warmup):
+    """
+    Ölçülecek sayfaları ve gerekli hazırlık verisini oluşturur
+    """
+    import app as app_module
+    from models import Classroom, Course
+    from timetable import DAYS
+
+    with app.app_context():
+        classroom = Classroom.query.filter_by(code=BENCH_CLASSROOM).first()
+        if classroom is None:
+            classroom = Classroom(code=BENCH_CLASSROOM, capacity=60, type='NORMAL')
+            db.session.add(classroom)
+            db.session.commit()
+        classroom_id = classroom.id
+        # Öğretim üyesi olmayan bir ders: öğretim üyesi çakışması ölçümü etkilemesin
+        course = Course.query.filter_by(instructor_id=None).first() or Course.query.first()
+        course_id = course.id
+
+    slots = evening_slots(DAYS)
+    needed = (warmup + iterations + 1)
+    slots = [next(slots) for _ in range(needed)]
+    slot_iter = iter(slots)
+
+    def add_schedule(client):
+        day, start_time, end_time = next(slot_iter)
+        return client.post('/schedule/add', data={
+            'course_id': course_id, 'classroom_id': classroom_id,
+            'day': day, 'start_time': start_time, 'end_time': end_time,
+        })
+
+    def clear_page_cache():
+        app_module.schedule_page_cache.clear()
+
+    return [
+        RouteBenchmark('view_schedule', lambda client: client.get('/view_schedule')),
+        RouteBenchmark('view_schedule_cold', lambda client: client.get('/view_schedule'), before=clear_page_cache),
+        RouteBenchmark('add_schedule', add_schedule),
+        RouteBenchmark('export_schedule', lambda client: client.get('/export_schedule')),
+        RouteBenchmark('courses', lambda client: client.get('/courses')),
+        RouteBenchmark('users', lambda client: client.get('/users')),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sık kullanılan sayfaların performansını ölçer')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='realistic', help='Veri kümesi büyüklüğü')
+    parser.add_argument('--iterations', type=int, default=20, help='Sayfa başına ölçülen istek sayısı')
+    parser.add_argument('--warmup', type=int, default=2, help='Ölçülmeyen ısınma isteği sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Sentetik veri tohumu')
+    parser.add_argument('--database', help='Kullanılacak SQLite dosyası (varsayılan: geçici dosya; '
+                                           'var olan dosya yeniden kullanılır)')
+    parser.add_argument('--routes', help='Sadece bu sayfaları ölç (virgülle ayrılmış)')
+    parser.add_argument('--output', help='JSON sonuç dosyası (varsayılan: standart çıktı)')
+    parser.add_argument('--storage-mode', default='production',
+                        help='Veritabanı bağlantı kipi (storage.py: development, production, test)')
+    args = parser.parse_args()
+
+    if args.iterations + args.warmup + 1 > 5 * (7 * 60 // BENCH_SLOT_MINUTES):
+        parser.error('Çok fazla tekrar: add_schedule için yeterli boş zaman aralığı yok')
+
+    workdir = tempfile.mkdtemp(prefix='ders_programi_bench_')
+    database = os.path.abspath(args.database or os.path.join(workdir, 'bench.db'))
+    # Uygulama modülleri içe aktarılmadan önce veritabanı adresi ayarlanmalı
+    os.environ['DATABASE_URL'] = 'sqlite:///' + database
+    os.environ['STORAGE_MODE'] = args.storage_mode
+
+    import db_setup
+    from app import app, db
+    from models import Schedule
+
+    started = time.monotonic()
+    db_setup.setup_database()
+    dataset = db_setup.seed_synthetic(1, args.seed, True, **PROFILES[args.profile])
+    with app.app_context():
+        dataset['schedule_items'] = Schedule.query.count()
+    seed_seconds = time.monotonic() - started
+
+    app.config['TESTING'] = True
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+
+    selected = set(args.routes.split(',')) if args.routes else None
+    results = {}
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    for benchmark in build_benchmarks(app, db, args.iterations, args.warmup):
+        if selected and benchmark.name not in selected:
+            continue
+        print(f'{benchmark.name} ölçülüyor...', file=sys.stderr)
+        results[benchmark.name] = benchmark.run(client, counter, args.iterations, args.warmup)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'profile': args.profile,
+            'seed': args.seed,
+            'storage_mode': args.storage_mode,
+            'dataset': dataset,
+            'seed_seconds': round(seed_seconds, 2),
+        },
+        'routes': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f'Sonuçlar {args.output} dosyasına yazıldı', file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
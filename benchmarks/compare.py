@@ -0,0 +1,76 @@
+"""
+İki performans ölçümü sonucunu (bench_routes.py JSON çıktısı) karşılaştırır
+
+Kullanım:
+    python benchmarks/compare.py onceki.json sonraki.json [--threshold 10]
+
+Gecikme (p50, p95), sorgu sayısı veya bellek kullanımı eşik yüzdesinden fazla
+artan sayfalar gerileme olarak işaretlenir; gerileme varsa çıkış kodu 1 olur.
+"""
+import argparse
+import json
+import sys
+
+# Karşılaştırılan ölçümler: (başlık, değeri okuyan fonksiyon)
+METRICS = [
+    ('p50 ms', lambda route: route['latency_ms']['p50']),
+    ('p95 ms', lambda route: route['latency_ms']['p95']),
+    ('sorgu', lambda route: route['queries']['mean']),
+    ('bellek KB', lambda route: route['peak_memory_kb']),
+]
+
+
+def change(before, after):
+    """
+    Yüzde değişimi döndürür (önceki değer 0 ise None)
+    """
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(before, after, threshold):
+    """
+    :return: (tablo satırları, gerileyen sayfa adları)
+    """
+    rows, regressions = [], []
+    for name in sorted(set(before['routes']) & set(after['routes'])):
+        old, new = before['routes'][name], after['routes'][name]
+        cells, regressed = [], False
+        for _, metric in METRICS:
+            old_value, new_value = metric(old), metric(new)
+            percent = change(old_value, new_value)
+            if percent is not None and percent > threshold:
+                regressed = True
+            cells.append(f'{old_value:g} -> {new_value:g}' + (f' ({percent:+.0f}%)' if percent is not None else ''))
+        rows.append((name, cells, regressed))
+        if regressed:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='İki performans ölçümünü karşılaştırır')
+    parser.add_argument('before', help='Önceki sonuç dosyası')
+    parser.add_argument('after', help='Sonraki sonuç dosyası')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Gerileme sayılacak artış yüzdesi')
+    args = parser.parse_args()
+
+    with open(args.before, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, encoding='utf-8') as f:
+        after = json.load(f)
+
+    print(f"{before['meta'].get('revision')} ({before['meta']['profile']}) -> "
+          f"{after['meta'].get('revision')} ({after['meta']['profile']})")
+    rows, regressions = compare(before, after, args.threshold)
+    for name, cells, regressed in rows:
+        print(f"{'!' if regressed else ' '} {name:20s} " +
+              '  '.join(f'{title}: {cell}' for (title, _), cell in zip(METRICS, cells)))
+    if regressions:
+        print(f"Gerileme (>{args.threshold:g}%): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Öğretim üyesi, derslik ve sınıf grubu bazında toplu program dışa aktarımı
+
+Dönem başında her öğretim üyesinin, her dersliğin ve her bölüm-yarıyıl
+grubunun haftalık programı ayrı birer dosya olarak hazırlanır. Program
+öğeleri tek sorguyla bellekte bir anlık görüntüye alınır; dosyalar bu görüntü
+üzerinden bir süreç havuzunda paralel oluşturulur ve hazır oldukça ZIP
+arşivine eklenerek istemciye akış halinde gönderilir. Arşivin tamamı hiçbir
+zaman bellekte veya diskte tutulmaz.
+"""
+import csv
+import io
+import os
+import re
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
+from schedule_data import load_schedule_items
+from models import DAYS
+
+# Desteklenen dosya biçimleri
+FORMATS = ('xlsx', 'csv')
+
+# Anlık görüntüdeki program öğesi (ORM nesnelerinden bağımsız, süreçler arası taşınabilir)
+ExportRow = namedtuple('ExportRow', [
+    'day', 'start_time', 'end_time', 'course_code', 'course_name',
+    'department_code', 'semester', 'classroom_id', 'classroom_code',
+    'instructor_id', 'instructor_name', 'day_index', 'start_minute', 'end_minute'
+])
+
+# Tek bir dosyaya yazılacak program: arşivdeki yol, başlık ve öğeler
+Timetable = namedtuple('Timetable', ['path', 'title', 'rows'])
+
+CSV_HEADER = ['Gün', 'Başlangıç', 'Bitiş', 'Ders Kodu', 'Ders Adı', 'Bölüm',
+              'Yarıyıl', 'Derslik', 'Öğretim Üyesi']
+
+
+def take_snapshot(department_codes=None):
+    """
+    Tüm program öğelerini tek sorguda yükleyip düz kayıtlara çevirir
+    :param department_codes: Sadece bu bölüm kodlarına ait dersler (None ise tümü)
+    :return: ExportRow listesi
+    """
+    rows = []
+    for item in load_schedule_items(department_codes):
+        course = item.course
+        rows.append(ExportRow(
+            item.day, item.start_time, item.end_time, course.code, course.name,
+            course.department.code if course.department else '', course.semester,
+            item.classroom_id, item.classroom.code if item.classroom else '',
+            course.instructor_id, course.instructor.name if course.instructor else '',
+            item.day_index, item.start_minute, item.end_minute
+        ))
+    return rows
+
+
+def safe_name(value):
+    """
+    Metni arşivde dosya adı olarak kullanılabilir hale getirir
+    """
+    return re.sub(r'[^\w.-]+', '_', str(value), flags=re.UNICODE).strip('_') or 'adsiz'
+
+
+def group_timetables(rows):
+    """
+    Anlık görüntüyü öğretim üyesi, derslik ve sınıf grubu programlarına ayırır
+    :param rows: ExportRow listesi
+    :return: Yola göre sıralı Timetable listesi
+    """
+    groups = {}
+    for row in rows:
+        if row.instructor_id:
+            key = (f'ogretim_uyeleri/{safe_name(row.instructor_name)}_{row.instructor_id}',
+                   f'Öğretim Üyesi: {row.instructor_name}')
+            groups.setdefault(key, []).append(row)
+        if row.classroom_id:
+            key = (f'derslikler/{safe_name(row.classroom_code)}_{row.classroom_id}',
+                   f'Derslik: {row.classroom_code}')
+            groups.setdefault(key, []).append(row)
+        if row.department_code and row.semester is not None:
+            key = (f'siniflar/{safe_name(row.department_code)}_{row.semester}_yariyil',
+                   f'{row.department_code} {row.semester}. Yarıyıl')
+            groups.setdefault(key, []).append(row)
+    return [Timetable(path, title, rows) for (path, title), rows in sorted(groups.items())]
+
+
+def _cell_text(row, timetable_path):
+    # Dosyanın sahibini tekrar etmeden ders bilgilerini yaz
+    lines = [f'{row.course_code} - {row.course_name}']
+    if not timetable_path.startswith('siniflar/'):
+        lines.append(f'{row.department_code}, {row.semester}. Yarıyıl')
+    if not timetable_path.startswith('derslikler/'):
+        lines.append(f'Derslik: {row.classroom_code or "Belirtilmemiş"}')
+    if row.instructor_name and not timetable_path.startswith('ogretim_uyeleri/'):
+        lines.append(f'Öğr. Üyesi: {row.instructor_name}')
+    return '\n'.join(lines)
+
+
+def render_xlsx(timetable):
+    """
+    Programı saat x gün tablosu olarak Excel dosyasına yazar
+    :param timetable: Timetable
+    :return: Dosya içeriği (bytes)
+    """
+    slots = sorted({(row.start_minute, row.end_minute, row.start_time, row.end_time) for row in timetable.rows})
+    cells = {}
+    for row in timetable.rows:
+        cells.setdefault((row.start_minute, row.end_minute, row.day_index), []).append(_cell_text(row, timetable.path))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Ders Programı')
+    ws.column_dimensions['A'].width = 15
+    for column in 'BCDEF':
+        ws.column_dimensions[column].width = 30
+
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    slot_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+    center = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+    def styled_cell(value, font=None, fill=None):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.border = border
+        cell.alignment = center
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        return cell
+
+    title = WriteOnlyCell(ws, value=timetable.title)
+    title.font = Font(bold=True, size=12)
+    ws.append([title])
+    ws.append([styled_cell('Saat', header_font, header_fill)] +
+              [styled_cell(day, header_font, header_fill) for day in DAYS])
+    for start, end, start_time, end_time in slots:
+        ws.append([styled_cell(f'{start_time}-{end_time}', Font(bold=True), slot_fill)] +
+                  [styled_cell('\n\n'.join(cells.get((start, end, day_index), []))) for day_index in range(len(DAYS))])
+
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def render_csv(timetable):
+    """
+    Programı gün ve saate göre sıralı düz liste olarak CSV dosyasına yazar
+    :param timetable: Timetable
+    :return: Dosya içeriği (bytes, Excel'in tanıması için BOM'lu UTF-8)
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADER)
+    for row in sorted(timetable.rows, key=lambda r: (r.day_index, r.start_minute, r.course_code)):
+        writer.writerow([row.day, row.start_time, row.end_time, row.course_code, row.course_name,
+                         row.department_code, row.semester, row.classroom_code, row.instructor_name])
+    return output.getvalue().encode('utf-8-sig')
+
+
+def render_timetable(timetable, file_format):
+    """
+    Tek bir programı istenen biçimde oluşturur (süreç havuzunda çalışır)
+    :return: (arşivdeki dosya adı, içerik)
+    """
+    if file_format == 'csv':
+        return f'{timetable.path}.csv', render_csv(timetable)
+    return f'{timetable.path}.xlsx', render_xlsx(timetable)
+
+
+class _ZipStream:
+    """
+    ZipFile'ın yazdığı baytları biriktiren, konumlanamayan (seek desteklemeyen) çıktı
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """
+        Son çağrıdan bu yana yazılan baytları döndürür ve tamponu boşaltır
+        """
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(timetables, file_format='xlsx', workers=None):
+    """
+    Programları paralel oluşturup ZIP arşivi parçaları olarak üretir
+    :param timetables: Timetable listesi
+    :param file_format: 'xlsx' veya 'csv'
+    :param workers: Süreç sayısı (varsayılan: çekirdek sayısı)
+    :return: bytes parçaları üreten generator
+    """
+    workers = workers or os.cpu_count() or 1
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        if timetables:
+            with ProcessPoolExecutor(max_workers=min(workers, len(timetables))) as pool:
+                chunksize = max(1, len(timetables) // (workers * 4))
+                results = pool.map(render_timetable, timetables, [file_format] * len(timetables),
+                                   chunksize=chunksize)
+                for name, content in results:
+                    archive.writestr(name, content)
+                    yield stream.drain()
+    # Arşiv kapatılınca yazılan merkezi dizin
+    yield stream.drain()
@@ -1,5 +1,6 @@
 from flask import Flask
-from models import db, Department, Course, Classroom, User, Schedule
+from models import db, Department, Course, Classroom, User, Schedule, Term, in_active_term
+from storage import init_storage, storage_status
 import os
 
 # Göreceli yol kullanarak veritabanı dosyasını belirle
@@ -9,10 +10,15 @@ app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + DB_PATH
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db.init_app(app)
+init_storage(app)
 
 with app.app_context():
-    print("Bölümler:")
+    print("Dönemler:")
+    for term in Term.query.order_by(Term.id):
+        status = ' (aktif)' if term.is_active else ' (arşivlendi)' if term.archived_at else ''
+        print(f"- {term.code}: {term.name}{status}")
+    
+    print("\nBölümler:")
     departments = Department.query.all()
     for dept in departments:
         print(f"- {dept.code}: {dept.name}")
@@ -47,10 +53,17 @@ with app.app_context():
         print(f"- {user.username} ({user.name}, {user.role})")
     
     print("\nDers Programı:")
-    schedules = Schedule.query.all()
-    print(f"Toplam {len(schedules)} ders programı kaydı var")
-    for schedule in schedules:
-        course = Course.query.get(schedule.course_id)
-        classroom = Classroom.query.get(schedule.classroom_id)
-        if course and classroom:
-            print(f"- {course.code} ({classroom.code}): {schedule.day} {schedule.start_time}-{schedule.end_time}") 
\ No newline at end of file
+    # Ders ve derslik kodları her kayıt için ayrı sorgu yerine tek birleştirilmiş sorguda alınır
+    schedules = (db.session.query(Schedule.day, Schedule.start_time, Schedule.end_time, Course.code, Classroom.code)
+                 .join(Course, Schedule.course_id == Course.id)
+                 .join(Classroom, Schedule.classroom_id == Classroom.id)
+                 .filter(in_active_term())
+                 .order_by(Schedule.day_index, Schedule.start_minute)
+                 .all())
+    print(f"Aktif dönemde toplam {Schedule.query.filter(in_active_term()).count()} ders programı kaydı var")
+    for day, start_time, end_time, course_code, classroom_code in schedules:
+        print(f"- {course_code} ({classroom_code}): {day} {start_time}-{end_time}")
+
+    print("\nVeritabanı ayarları:")
+    for name, value in storage_status().items():
+        print(f"- {name}: {value}")
\ No newline at end of file
@@ -1,21 +1,75 @@
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from models import db, Department, Course, Classroom, User
+from models import db, Department, Course, Classroom, User, Schedule, in_active_term, schedule_columns, search_columns
+from versioning import bump_version
+from migrations import upgrade
+from storage import init_storage
+from synthetic import generate_university, MIN_SCALE, MAX_SCALE
+import argparse
 import os
+import time
 
 # Göreceli yol kullanarak veritabanı dosyasını mevcut dizinde oluştur
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ders_programi.db')
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + DB_PATH
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///' + DB_PATH)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db.init_app(app)
+init_storage(app)
+
+def seed_rows(model, rows, key_columns):
+    """
+    Kayıtlardan veritabanında henüz olmayanları toplu olarak ekler (tekrar çalıştırılabilir)
+    Mevcut anahtarlar tablo başına tek sorguyla okunur.
+    :param model: Eklenecek model sınıfı
+    :param rows: Sütun adı -> değer sözlükleri
+    :param key_columns: Bir kaydı benzersiz tanımlayan sütunlar
+    :return: Eklenen kayıt sayısı
+    """
+    columns = [getattr(model, column) for column in key_columns]
+    existing = set(db.session.query(*columns).all())
+    missing = []
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        if key not in existing:
+            existing.add(key)
+            missing.append(dict(row, **search_columns(model, row)))
+    if missing:
+        # Toplu ekleme oturum olaylarını tetiklemez, veri sürümü elle artırılır
+        bump_version()
+        db.session.bulk_insert_mappings(model, missing)
+    return len(missing)
+
+def code_map(model):
+    """
+    Tablodaki kod -> id eşlemesini tek sorguyla döndürür
+    """
+    return dict(db.session.query(model.code, model.id).all())
+
+def resolve_courses(courses):
+    """
+    department_code ve instructor_username alanlarını id'lere çevirir
+    :param courses: Ders sözlükleri
+    :return: Course sütunlarıyla eşleşen yeni sözlük listesi
+    """
+    departments = code_map(Department)
+    usernames = {course['instructor_username'] for course in courses if course.get('instructor_username')}
+    instructors = dict(db.session.query(User.username, User.id).filter(User.username.in_(usernames)).all()) if usernames else {}
+    resolved = []
+    for course in courses:
+        course = dict(course)
+        department_id = departments.get(course.pop('department_code'))
+        if department_id is None:
+            continue
+        course['department_id'] = department_id
+        course['instructor_id'] = instructors.get(course.pop('instructor_username', None))
+        resolved.append(course)
+    return resolved
 
 def setup_database():
     with app.app_context():
-        # Veritabanı tablolarını oluştur
-        db.create_all()
+        # Veritabanı şemasını oluştur / güncelle
+        upgrade(db.engine, echo=None)
         
         # Bölümleri ekle
         departments = [
@@ -23,11 +77,7 @@ def setup_database():
             {'code': 'YZM', 'name': 'Yazılım Mühendisliği'}
         ]
         
-        for dept_data in departments:
-            existing_dept = Department.query.filter_by(code=dept_data['code']).first()
-            if not existing_dept:
-                dept = Department(**dept_data)
-                db.session.add(dept)
+        seed_rows(Department, departments, ('code',))
         
         # Derslikleri ekle
         classrooms = [
@@ -56,11 +106,7 @@ def setup_database():
             {'code': 'Online', 'capacity': 999, 'type': 'LAB'}
         ]
         
-        for classroom_data in classrooms:
-            existing_classroom = Classroom.query.filter_by(code=classroom_data['code']).first()
-            if not existing_classroom:
-                classroom = Classroom(**classroom_data)
-                db.session.add(classroom)
+        seed_rows(Classroom, classrooms, ('code',))
         
         # Dersleri ekle
         courses = [
@@ -164,29 +210,73 @@ def setup_database():
             {'code': 'YZM426', 'name': 'İş Sağlığı ve Güvenliği-II', 'theory': 2, 'practice': 0, 'credits': 2, 'semester': 8, 'department_code': 'YZM'}
         ]
         
-        for course_data in courses:
-            existing_course = Course.query.filter_by(code=course_data['code']).first()
-            if not existing_course:
-                dept = Department.query.filter_by(code=course_data['department_code']).first()
-                if dept:
-                    course_data['department_id'] = dept.id
-                    del course_data['department_code']
-                    course = Course(**course_data)
-                    db.session.add(course)
+        # Aynı kodlu ders farklı bölümlerde ayrı kayıttır (örn. BLM ve YZM için MAT110)
+        seed_rows(Course, resolve_courses(courses), ('code', 'department_id'))
         
         # Admin kullanıcısını ekle
-        admin = User.query.filter_by(username='admin').first()
-        if not admin:
-            admin = User(
-                username='admin',
-                password='admin123',
-                name='Admin',
-                role='admin'
-            )
-            db.session.add(admin)
+        seed_rows(User, [{
+            'username': 'admin',
+            'password': 'admin123',
+            'name': 'Admin',
+            'role': 'admin'
+        }], ('username',))
         
         db.session.commit()
         print("Veritabanı başarıyla oluşturuldu!")
 
+def seed_synthetic(scale, seed=0, with_schedule=True, **sizes):
+    """
+    Sentetik bir üniversiteyi veritabanına toplu olarak ekler (tekrar çalıştırılabilir)
+    :param scale: Mevcut fakülteye göre ölçek katsayısı
+    :param seed: Rastgele sayı tohumu
+    :param with_schedule: Haftalık program da eklensin mi
+    :param sizes: generate_university'ye aktarılan büyüklükler (departments, sections vb.)
+    :return: Üretilen verinin özeti
+    """
+    started = time.monotonic()
+    university = generate_university(scale, seed, with_schedule, **sizes)
+    with app.app_context():
+        upgrade(db.engine, echo=None)
+        seed_rows(Department, university.departments, ('code',))
+        seed_rows(Classroom, university.classrooms, ('code',))
+        
+        departments = code_map(Department)
+        instructors = [dict(user, department_id=departments.get(user['department_code'])) for user in university.instructors]
+        for user in instructors:
+            del user['department_code']
+        seed_rows(User, instructors, ('username',))
+        seed_rows(Course, resolve_courses(university.courses), ('code', 'department_id'))
+        
+        # Program öğelerini (ders kodu, bölüm) ve derslik kodu üzerinden eşle
+        course_ids = {
+            (code, department_code): course_id
+            for course_id, code, department_code in db.session.query(Course.id, Course.code, Department.code)
+            .join(Department, Course.department_id == Department.id)
+        }
+        classroom_ids = code_map(Classroom)
+        schedule = [dict(
+            schedule_columns(item['day'], item['start_time'], item['end_time']),
+            course_id=course_ids[(item['course_code'], item['department_code'])],
+            classroom_id=classroom_ids[item['classroom_code']]
+        ) for item in university.schedule]
+        # Programı olan derslere dokunma; farklı tohumla tekrar çalıştırmak çakışma üretmesin
+        scheduled = {course_id for course_id, in db.session.query(Schedule.course_id).filter(in_active_term()).distinct()}
+        seed_rows(Schedule, [item for item in schedule if item['course_id'] not in scheduled],
+                  ('course_id', 'classroom_id', 'day_index', 'start_minute'))
+        
+        db.session.commit()
+    summary = university.summary()
+    print(f"Sentetik veri eklendi ({time.monotonic() - started:.1f} sn): {summary}")
+    return summary
+
 if __name__ == '__main__':
-    setup_database() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Veritabanını oluşturur ve örnek verileri ekler')
+    parser.add_argument('--scale', type=int, default=0,
+                        help=f'Ayrıca mevcut fakültenin bu kadar katı büyüklükte sentetik veri ekle ({MIN_SCALE}-{MAX_SCALE})')
+    parser.add_argument('--seed', type=int, default=0, help='Sentetik veri için rastgele sayı tohumu')
+    parser.add_argument('--no-schedule', action='store_true', help='Sentetik veri için haftalık program üretme')
+    args = parser.parse_args()
+    
+    setup_database()
+    if args.scale:
+        seed_synthetic(args.scale, args.seed, not args.no_schedule)
@@ -0,0 +1,143 @@
+"""
+Bir ders için boş (gün, saat, derslik) seçeneklerini bulma
+
+Her veri sürümü için bir kez, her gün ve ders saati için boş dersliklerin bit
+kümesi (derslik sırası -> bit) hesaplanır. Bir oturumun uzunluğu boyunca boş
+kalan derslikler bu kümelerin AND'i ile, öğretim üyesi ve sınıf grubunun
+uygunluğu ise doluluk indeksindeki dakika maskeleriyle bulunur; böylece
+sorgu binlerce derslikte bile veritabanına gitmeden milisaniyeler içinde
+cevaplanır. Sonuçlar program oluşturma motorunun derslik uygunluk cezasına
+(tip ve kapasite) göre sıralanır.
+"""
+from models import db, Classroom, DAYS, minutes_to_time
+from occupancy import COHORT, INSTRUCTOR, schedule_index
+from timetable import (DEFAULT_GROUP_SIZE, MAX_SESSION_PERIODS, PERIODS, PRACTICE, THEORY, Room,
+                       is_lab, room_penalty, session_starts, split_hours)
+from versioning import VersionedCache
+
+# Boş derslik indeksinin veri sürümüne göre önbelleği
+_index_cache = VersionedCache(maxsize=2)
+
+
+class FreeRoomIndex:
+    """
+    Gün ve ders saati bazında boş derslik bit kümeleri
+    :param rooms: Room listesi (bit sırası bu listedeki sıradır)
+    :param placements: Mevcut program öğeleri (Placement listesi)
+    """
+
+    def __init__(self, rooms, placements):
+        self.rooms = list(rooms)
+        self.lab_rooms = 0
+        for i, room in enumerate(self.rooms):
+            if is_lab(room.type):
+                self.lab_rooms |= 1 << i
+        self.normal_rooms = ((1 << len(self.rooms)) - 1) & ~self.lab_rooms
+
+        position = {room.id: i for i, room in enumerate(self.rooms)}
+        day_index = {day: i for i, day in enumerate(DAYS)}
+        busy = [[0] * len(PERIODS) for _ in DAYS]  # gün no, ders saati -> dolu derslikler
+        for placement in placements:
+            i, day = position.get(placement.classroom_id), day_index.get(placement.day)
+            if i is None or day is None:
+                continue
+            row = busy[day]
+            for period, (period_start, period_end, _) in enumerate(PERIODS):
+                if period_start < placement.end and period_end > placement.start:
+                    row[period] |= 1 << i
+
+        everyone = (1 << len(self.rooms)) - 1
+        self.free = [[everyone & ~rooms for rooms in row] for row in busy]
+
+    def free_rooms(self, day, first, length):
+        """
+        Gün içinde first numaralı ders saatinden başlayarak length ders saati boyunca boş dersliklerin bit kümesi
+        """
+        rooms = -1
+        for period in range(first, first + length):
+            rooms &= self.free[day][period]
+        return rooms
+
+
+def free_room_index():
+    """
+    Güncel veri sürümünün boş derslik indeksini döndürür (gerekirse oluşturur)
+    :return: (doluluk indeksi, FreeRoomIndex)
+    """
+    occupancy = schedule_index.ensure_built()
+    version = occupancy.version
+
+    def build():
+        rows = (db.session.query(Classroom.id, Classroom.code, Classroom.capacity, Classroom.type)
+                .order_by(Classroom.code))
+        rooms = [Room(room_id, code, capacity or 0, room_type) for room_id, code, capacity, room_type in rows]
+        return FreeRoomIndex(rooms, occupancy.placements())
+
+    return occupancy, _index_cache.get_or_create((version,), build)
+
+
+def default_length(course, kind):
+    """
+    Dersin ilgili türdeki ilk oturumunun uzunluğu (ders saati yoksa 1)
+    """
+    parts = split_hours(course.practice if kind == PRACTICE else course.theory)
+    return parts[0] if parts else 1
+
+
+def find_free_slots(course, length=None, kind=THEORY, group_size=DEFAULT_GROUP_SIZE, limit=50):
+    """
+    Ders için öğretim üyesi, sınıf grubu ve derslik açısından uygun tüm (gün, başlangıç, derslik) seçeneklerini bulur
+    :param course: Course
+    :param length: Oturum uzunluğu (ders saati; varsayılan: dersin ilk oturumu)
+    :param kind: THEORY (normal derslik) veya PRACTICE (laboratuvar)
+    :param group_size: Kapasite uygunluğu için beklenen şube mevcudu
+    :param limit: Döndürülecek en fazla seçenek
+    :return: (toplam seçenek sayısı, [(ceza, gün no, başlangıç dk, bitiş dk, Room)] uygunluk sırasıyla)
+    """
+    length = length or default_length(course, kind)
+    if not 1 <= length <= MAX_SESSION_PERIODS:
+        raise ValueError(f'Oturum uzunluğu 1 ile {MAX_SESSION_PERIODS} ders saati arasında olmalıdır')
+    occupancy, index = free_room_index()
+    wants_lab = kind == PRACTICE
+    allowed = index.lab_rooms if wants_lab else index.normal_rooms
+    cohort = (course.department_id, course.semester) if course.department_id else None
+
+    candidates = []  # (gün no, başlangıç, bitiş, boş derslik kümesi)
+    for day, first, _ in session_starts(length):
+        start, end = PERIODS[first][0], PERIODS[first + length - 1][1]
+        if course.instructor_id and not occupancy.is_free(INSTRUCTOR, course.instructor_id, DAYS[day], start, end):
+            continue
+        if cohort and not occupancy.is_free(COHORT, cohort, DAYS[day], start, end):
+            continue
+        rooms = index.free_rooms(day, first, length) & allowed
+        if rooms:
+            candidates.append((day, start, end, rooms))
+    total = sum(bin(rooms).count('1') for _, _, _, rooms in candidates)
+
+    # Derslikleri uygunluk sırasıyla dolaşıp her birinin boş olduğu zamanları ekle
+    ranked = sorted((room_penalty(room, wants_lab, group_size), room.code, i)
+                    for i, room in enumerate(index.rooms) if allowed >> i & 1)
+    results = []
+    for penalty, _, i in ranked:
+        bit = 1 << i
+        for day, start, end, rooms in candidates:
+            if rooms & bit:
+                results.append((round(penalty, 3), day, start, end, index.rooms[i]))
+                if len(results) >= limit:
+                    return total, results
+    return total, results
+
+
+def slot_report(slot):
+    """
+    Bir seçeneği JSON'a uygun sözlüğe çevirir
+    """
+    penalty, day, start, end, room = slot
+    return {
+        'day': DAYS[day],
+        'day_index': day,
+        'start_time': minutes_to_time(start),
+        'end_time': minutes_to_time(end),
+        'classroom': {'id': room.id, 'code': room.code, 'capacity': room.capacity, 'type': room.type},
+        'penalty': penalty,
+    }
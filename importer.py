@@ -0,0 +1,402 @@
+"""
+CSV / Excel dosyalarından toplu veri aktarımı
+
+Dersler, derslikler ve program öğeleri pandas ile okunur. Her sütun tek bir
+vektörel geçişte doğrulanır (zorunlu alanlar, sayısal değerler, tekrar eden
+kodlar, bilinmeyen bölüm / derslik / öğretim üyesi, saat çakışmaları).
+Dosyada tek bir hata bile varsa hiçbir kayıt eklenmez ve satır bazında hata
+raporu döndürülür; hata yoksa tüm kayıtlar tek bir işlemde toplu eklenir.
+"""
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from models import db, Classroom, Course, Department, Schedule, User, DAYS, minutes_to_time, search_columns
+from occupancy import load_placements, schedule_index
+from versioning import bump_version
+
+# Aktarılabilen veri türleri
+COURSES = 'courses'
+CLASSROOMS = 'classrooms'
+SCHEDULE = 'schedule'
+IMPORT_KINDS = (COURSES, CLASSROOMS, SCHEDULE)
+
+# Veri türüne göre sütunlar ve kabul edilen başlık adları
+COLUMNS = {
+    COURSES: {
+        'code': ('kod', 'ders kodu'),
+        'name': ('ad', 'ders adı', 'ders adi'),
+        'department': ('bölüm', 'bolum', 'department_code'),
+        'semester': ('yarıyıl', 'yariyil'),
+        'theory': ('teori',),
+        'practice': ('uygulama',),
+        'credits': ('kredi',),
+        'instructor': ('öğretim üyesi', 'ogretim uyesi'),
+        'is_elective': ('seçmeli', 'secmeli'),
+        'has_fixed_time': ('sabit saat',),
+    },
+    CLASSROOMS: {
+        'code': ('kod', 'derslik', 'derslik kodu'),
+        'capacity': ('kapasite',),
+        'type': ('tip', 'tür', 'tur'),
+    },
+    SCHEDULE: {
+        'course': ('ders', 'ders kodu', 'course_code'),
+        'department': ('bölüm', 'bolum', 'department_code'),
+        'classroom': ('derslik', 'derslik kodu', 'classroom_code'),
+        'day': ('gün', 'gun'),
+        'start_time': ('başlangıç', 'baslangic'),
+        'end_time': ('bitiş', 'bitis'),
+    },
+}
+
+# Boş bırakılamayan sütunlar
+REQUIRED = {
+    COURSES: ('code', 'name', 'department'),
+    CLASSROOMS: ('code', 'capacity'),
+    SCHEDULE: ('course', 'classroom', 'day', 'start_time', 'end_time'),
+}
+
+# Evet / hayır sütunlarında kabul edilen değerler
+BOOLEAN_VALUES = {
+    '': False, '0': False, 'false': False, 'hayır': False, 'hayir': False, 'h': False, 'no': False,
+    '1': True, 'true': True, 'evet': True, 'e': True, 'yes': True, 'x': True,
+}
+
+# Satırlar arası zaman karşılaştırmasında grupları ayırmak için kullanılan kaydırma (dakika)
+GROUP_OFFSET = 2 * 24 * 60
+
+# Hata raporundaki bir satır (row: dosyadaki satır numarası, başlık satırı 1)
+RowError = namedtuple('RowError', ['row', 'column', 'message'])
+
+
+class ImportReport:
+    """
+    Aktarım sonucu: eklenen kayıt sayısı ve satır bazında hatalar
+    """
+
+    def __init__(self, kind, total, inserted=0, errors=None, elapsed=0.0):
+        self.kind = kind
+        self.total = total
+        self.inserted = inserted
+        self.errors = errors or []
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'total': self.total,
+            'inserted': self.inserted,
+            'elapsed': round(self.elapsed, 3),
+            'errors': [error._asdict() for error in self.errors],
+        }
+
+
+def _normalize_header(value):
+    # Türkçe büyük İ harfi küçültülünce oluşan birleşik noktayı da temizle
+    return str(value).strip().casefold().replace('̇', '').replace('_', ' ')
+
+
+def read_table(stream, filename):
+    """
+    CSV veya Excel dosyasını tüm hücreleri metin olan bir DataFrame'e okur
+    :param stream: Dosya yolu veya dosya benzeri nesne
+    :param filename: Dosya adı (uzantıdan biçim belirlenir)
+    :return: pandas.DataFrame
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        # Ayırıcı (virgül / noktalı virgül) otomatik belirlenir
+        frame = pd.read_csv(stream, dtype=str, keep_default_na=False, sep=None,
+                            engine='python', encoding='utf-8-sig')
+    elif extension in ('.xlsx', '.xlsm'):
+        frame = pd.read_excel(stream, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError('Desteklenmeyen dosya türü! (CSV veya Excel olmalı)')
+    return frame.fillna('').astype(str).apply(lambda column: column.str.strip())
+
+
+def _rename_columns(frame, kind):
+    """
+    Başlıkları iç sütun adlarına çevirir, eksik isteğe bağlı sütunları boş ekler
+    """
+    aliases = {}
+    for column, names in COLUMNS[kind].items():
+        aliases[_normalize_header(column)] = column
+        for name in names:
+            aliases[_normalize_header(name)] = column
+    frame = frame.rename(columns=lambda header: aliases.get(_normalize_header(header), header))
+    missing = [column for column in REQUIRED[kind] if column not in frame.columns]
+    for column in COLUMNS[kind]:
+        if column not in frame.columns:
+            frame[column] = ''
+    return frame[list(COLUMNS[kind])], missing
+
+
+def _flag(errors, mask, column, message):
+    """
+    Maskenin True olduğu satırlar için hata kaydı ekler
+    """
+    for index in mask[mask].index:
+        errors.append(RowError(int(index) + 2, column, message))
+
+
+def _check_required(frame, kind, errors):
+    for column in REQUIRED[kind]:
+        _flag(errors, frame[column] == '', column, 'Bu alan boş bırakılamaz')
+
+
+def _parse_integer(frame, column, errors, default, minimum=None, maximum=None):
+    """
+    Sütunu tamsayıya çevirir; boş hücreler varsayılan değeri alır
+    :return: Geçersiz satırlarda NaN olan float Series
+    """
+    values = pd.to_numeric(frame[column].replace('', default), errors='coerce')
+    invalid = values.isna() | (values % 1 != 0)
+    if minimum is not None:
+        invalid |= values < minimum
+    if maximum is not None:
+        invalid |= values > maximum
+    _flag(errors, invalid & (frame[column] != ''), column, 'Geçersiz sayı')
+    return values.where(~invalid)
+
+
+def _parse_boolean(frame, column, errors):
+    values = frame[column].str.casefold().map(BOOLEAN_VALUES)
+    _flag(errors, values.isna(), column, 'Evet/hayır (1/0) olmalı')
+    return values.fillna(False).astype(bool)
+
+
+def _parse_minutes(series):
+    """
+    "HH:MM" (veya "HH:MM:SS") biçimindeki saatleri dakikaya çevirir
+    :return: Geçersiz saatlerde NaN olan Series
+    """
+    parts = series.str.extract(r'^(\d{1,2})[:.](\d{2})(?::\d{2})?$').astype(float)
+    minutes = parts[0] * 60 + parts[1]
+    return minutes.where((parts[1] < 60) & (minutes <= 24 * 60))
+
+
+def _records(columns):
+    """
+    Sütun sözlüğünü NaN değerleri None olan kayıt listesine çevirir
+    (sayısal sütunların hepsi tamsayıdır; değerler Python int olarak döner)
+    """
+    frame = pd.DataFrame(columns)
+    for column in frame.columns:
+        if frame[column].dtype.kind == 'f':
+            frame[column] = frame[column].astype('Int64')
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict('records')
+
+
+def _department_ids(frame):
+    departments = {code.upper(): department_id
+                   for department_id, code in db.session.query(Department.id, Department.code)}
+    return frame['department'].str.upper().map(departments)
+
+
+def validate_courses(frame, errors):
+    """
+    Ders satırlarını doğrular
+    :return: bulk_insert_mappings için kayıt listesi
+    """
+    department_ids = _department_ids(frame)
+    _flag(errors, (frame['department'] != '') & department_ids.isna(), 'department', 'Bilinmeyen bölüm')
+
+    # Aynı bölümde aynı ders kodu hem dosyada hem veritabanında tek olmalı
+    codes = frame['code'].str.upper()
+    keys = codes + '|' + department_ids.fillna(-1).astype(int).astype(str)
+    _flag(errors, (frame['code'] != '') & keys.duplicated(keep=False), 'code', 'Dosyada tekrar eden ders kodu')
+    existing = {f'{code.upper()}|{department_id}'
+                for code, department_id in db.session.query(Course.code, Course.department_id)}
+    _flag(errors, keys.isin(existing), 'code', 'Bu ders kodu bölümde zaten kayıtlı')
+
+    # Öğretim üyesi kullanıcı adı veya ad soyadı ile belirtilebilir
+    instructors = db.session.query(User.id, User.username, User.name).filter(User.role == 'instructor').all()
+    by_username = {username.casefold(): user_id for user_id, username, _ in instructors}
+    by_name = {name.casefold(): user_id for user_id, _, name in instructors if name}
+    instructor_keys = frame['instructor'].str.casefold()
+    instructor_ids = instructor_keys.map(by_username).fillna(instructor_keys.map(by_name))
+    _flag(errors, (frame['instructor'] != '') & instructor_ids.isna(), 'instructor', 'Bilinmeyen öğretim üyesi')
+
+    return _records({
+        'code': frame['code'],
+        'name': frame['name'],
+        'department_id': department_ids,
+        'instructor_id': instructor_ids,
+        'semester': _parse_integer(frame, 'semester', errors, 1, 1, 8),
+        'theory': _parse_integer(frame, 'theory', errors, 0, 0),
+        'practice': _parse_integer(frame, 'practice', errors, 0, 0),
+        'credits': _parse_integer(frame, 'credits', errors, 0, 0),
+        'is_elective': _parse_boolean(frame, 'is_elective', errors),
+        'has_fixed_time': _parse_boolean(frame, 'has_fixed_time', errors),
+    })
+
+
+def validate_classrooms(frame, errors):
+    """
+    Derslik satırlarını doğrular
+    :return: bulk_insert_mappings için kayıt listesi
+    """
+    codes = frame['code'].str.upper()
+    _flag(errors, (frame['code'] != '') & codes.duplicated(keep=False), 'code', 'Dosyada tekrar eden derslik kodu')
+    existing = {code.upper() for code, in db.session.query(Classroom.code)}
+    _flag(errors, codes.isin(existing), 'code', 'Bu derslik kodu zaten kayıtlı')
+
+    return _records({
+        'code': frame['code'],
+        'capacity': _parse_integer(frame, 'capacity', errors, 0, 1),
+        'type': frame['type'].str.upper().replace('', Classroom.type.default.arg),
+    })
+
+
+def _overlaps(entries):
+    """
+    Aynı sahibin (derslik / öğretim üyesi) aynı gündeki kayıtları arasında
+    zaman çakışması olanları bulur
+    :param entries: owner, day, start, end sütunlu DataFrame
+    :return: Çakışan kayıtlar için True olan Series
+    """
+    entries = entries.sort_values(['owner', 'day', 'start', 'end'])
+    group = entries.groupby(['owner', 'day'], sort=False).ngroup()
+    # Her grubu ayrı bir zaman aralığına kaydırarak tek geçişte karşılaştır
+    start = entries['start'] + group * GROUP_OFFSET
+    end = entries['end'] + group * GROUP_OFFSET
+    previous_end = end.cummax().shift(fill_value=-1)
+    next_start = start.shift(-1, fill_value=np.inf)
+    return (start < previous_end) | (end > next_start)
+
+
+def validate_schedule(frame, errors):
+    """
+    Program satırlarını doğrular; derslik ve öğretim üyesi çakışmaları hem
+    dosyanın kendi içinde hem de mevcut programla karşılaştırılır
+    :return: bulk_insert_mappings için kayıt listesi
+    """
+    # Ders, bölüm belirtilmişse (kod, bölüm) ile, belirtilmemişse sadece kod ile bulunur
+    course_rows = pd.DataFrame(
+        db.session.query(Course.id, Course.code, Department.code, Course.instructor_id)
+        .outerjoin(Department, Course.department_id == Department.id).all(),
+        columns=['id', 'code', 'department', 'instructor_id']
+    )
+    course_rows['code'] = course_rows['code'].str.upper()
+    course_rows['department'] = course_rows['department'].fillna('').str.upper()
+    by_pair = course_rows.set_index(course_rows['code'] + '|' + course_rows['department'])['id']
+    by_pair = by_pair[~by_pair.index.duplicated()]
+    code_counts = course_rows['code'].value_counts()
+    by_code = course_rows[course_rows['code'].map(code_counts) == 1].set_index('code')['id']
+    instructors = course_rows.set_index('id')['instructor_id']
+
+    codes = frame['course'].str.upper()
+    departments = frame['department'].str.upper()
+    course_ids = (codes + '|' + departments).map(by_pair).where(departments != '', codes.map(by_code))
+    ambiguous = (departments == '') & (codes.map(code_counts).fillna(0) > 1)
+    _flag(errors, ambiguous, 'department', 'Ders kodu birden fazla bölümde var, bölüm belirtilmeli')
+    _flag(errors, (frame['course'] != '') & course_ids.isna() & ~ambiguous, 'course', 'Bilinmeyen ders')
+
+    classrooms = {code.upper(): classroom_id for classroom_id, code in db.session.query(Classroom.id, Classroom.code)}
+    classroom_ids = frame['classroom'].str.upper().map(classrooms)
+    _flag(errors, (frame['classroom'] != '') & classroom_ids.isna(), 'classroom', 'Bilinmeyen derslik')
+
+    day_indexes = frame['day'].str.casefold().map({day.casefold(): index for index, day in enumerate(DAYS)})
+    _flag(errors, (frame['day'] != '') & day_indexes.isna(), 'day', 'Geçersiz gün')
+
+    starts = _parse_minutes(frame['start_time'])
+    ends = _parse_minutes(frame['end_time'])
+    _flag(errors, (frame['start_time'] != '') & starts.isna(), 'start_time', 'Geçersiz saat (SS:DD olmalı)')
+    _flag(errors, (frame['end_time'] != '') & ends.isna(), 'end_time', 'Geçersiz saat (SS:DD olmalı)')
+    _flag(errors, starts >= ends, 'end_time', 'Bitiş saati başlangıç saatinden sonra olmalı')
+
+    # Çakışma kontrolü: tüm alanları geçerli satırlar + mevcut program öğeleri
+    valid = course_ids.notna() & classroom_ids.notna() & day_indexes.notna() & (starts < ends)
+    instructor_ids = course_ids.map(instructors)
+    existing = pd.DataFrame(load_placements(), columns=[
+        'id', 'course_id', 'classroom_id', 'day', 'start', 'end', 'instructor_id', 'department_id', 'semester'
+    ])
+    checks = (
+        ('classroom', classroom_ids, 'classroom_id', 'Derslik bu gün ve saatte başka bir dersle çakışıyor'),
+        ('course', instructor_ids, 'instructor_id', 'Öğretim üyesi bu gün ve saatte başka bir derste'),
+    )
+    for column, owners, existing_column, message in checks:
+        rows = valid & owners.notna()
+        current = existing[existing[existing_column].notna()]
+        entries = pd.concat([
+            pd.DataFrame({'row': frame.index[rows], 'owner': owners[rows].astype(int),
+                          'day': day_indexes[rows], 'start': starts[rows], 'end': ends[rows]}),
+            pd.DataFrame({'row': -1, 'owner': current[existing_column].astype(int),
+                          'day': current['day'].map({day: index for index, day in enumerate(DAYS)}), 'start': current['start'], 'end': current['end']}),
+        ], ignore_index=True)
+        overlapping = _overlaps(entries)
+        conflicts = entries.loc[overlapping.index[overlapping], 'row']
+        _flag(errors, frame.index.to_series().isin(conflicts[conflicts >= 0]), column, message)
+
+    return _records({
+        'course_id': course_ids,
+        'classroom_id': classroom_ids,
+        'day': day_indexes.map(lambda index: DAYS[int(index)], na_action='ignore'),
+        'day_index': day_indexes,
+        'start_time': starts.map(lambda value: minutes_to_time(int(value)), na_action='ignore'),
+        'start_minute': starts,
+        'end_time': ends.map(lambda value: minutes_to_time(int(value)), na_action='ignore'),
+        'end_minute': ends,
+    })
+
+
+# Veri türüne göre doğrulama fonksiyonu ve eklenecek model
+VALIDATORS = {
+    COURSES: (validate_courses, Course),
+    CLASSROOMS: (validate_classrooms, Classroom),
+    SCHEDULE: (validate_schedule, Schedule),
+}
+
+
+def import_table(kind, frame):
+    """
+    Okunan tabloyu doğrular ve hata yoksa tek işlemde toplu ekler
+    :param kind: COURSES, CLASSROOMS veya SCHEDULE
+    :param frame: read_table ile okunan DataFrame
+    :return: ImportReport
+    """
+    started = time.monotonic()
+    if kind not in VALIDATORS:
+        raise ValueError(f'Geçersiz veri türü: {kind}')
+    frame = frame.reset_index(drop=True)
+    # Tamamen boş satırları atla (satır numaraları korunur)
+    frame = frame[(frame != '').any(axis=1)]
+    frame, missing = _rename_columns(frame, kind)
+    report = ImportReport(kind, len(frame))
+    if missing:
+        report.errors = [RowError(1, column, 'Zorunlu sütun eksik') for column in missing]
+        report.elapsed = time.monotonic() - started
+        return report
+
+    errors = []
+    _check_required(frame, kind, errors)
+    validator, model = VALIDATORS[kind]
+    records = validator(frame, errors)
+    report.errors = sorted(set(errors))
+    if report.errors or not records:
+        report.elapsed = time.monotonic() - started
+        return report
+
+    try:
+        bump_version()
+        # Toplu ekleme model olaylarını tetiklemez, arama anahtarları burada hesaplanır
+        db.session.bulk_insert_mappings(model, [dict(record, **search_columns(model, record)) for record in records])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if kind == SCHEDULE:
+        schedule_index.invalidate()
+    report.inserted = len(records)
+    report.elapsed = time.monotonic() - started
+    return report
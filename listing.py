@@ -0,0 +1,131 @@
+"""
+Yönetim sayfaları için sıralanabilir, aranabilir ve anahtar tabanlı (keyset) sayfalanan listeler
+
+Sayfalar OFFSET yerine son gösterilen satırın (sıralama değeri, id) çiftinden
+devam eder: her sayfa sıralama sütununun indeksi üzerinden okunur ve sayfa
+derinliği arttıkça yavaşlamaz. İmleç (cursor) bu çiftin URL'de taşınabilen
+biçimidir; ?after= sonraki, ?before= önceki sayfayı getirir.
+
+Önek aramaları LIKE yerine aralık koşuluna (sütun >= önek AND sütun < önek + en
+büyük karakter) çevrilir; böylece sütun indeksi kullanılabilir. Büyük / küçük
+harf ve Türkçe i / ı farkı gözetmeyen arama için hem aranan metin hem de sütun
+models.search_key() ile normalleştirilir (indeksli *_key sütunları).
+"""
+import base64
+import json
+from collections import namedtuple
+
+from flask import request, url_for
+from sqlalchemy import and_, or_
+
+# Varsayılan ve en fazla sayfa boyutu
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Önek aramasında aralığın üst sınırı için eklenen karakter
+_PREFIX_END = '\U0010ffff'
+
+# Bir liste sayfası: satırlar ve varsa sonraki / önceki sayfa imleçleri
+Page = namedtuple('Page', ['items', 'next_cursor', 'prev_cursor'])
+
+# Sıralama seçeneği: SQL ifadesi ve satırdan aynı değeri okuyan fonksiyon
+SortOption = namedtuple('SortOption', ['expression', 'value'])
+
+# İmleçte kabul edilen tamsayı aralığı (SQLite INTEGER, 64 bit)
+_INTEGER_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+def prefix_filter(column, prefix):
+    """
+    Sütunun verilen önekle başlaması koşulu (indeks kullanılabilen aralık sorgusu)
+    """
+    return and_(column >= prefix, column < prefix + _PREFIX_END)
+
+
+def encode_cursor(value, row_id):
+    """
+    (sıralama değeri, id) çiftini URL'de kullanılabilen imlece çevirir
+    """
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    İmleci (sıralama değeri, id) çiftine çevirir; geçersiz imleç için None
+    Sıralama değeri metin veya sayı olmalıdır (sıralama ifadeleri NULL döndürmez); elle
+    değiştirilmiş imleçlerdeki liste, nesne, null veya true / false değerleri geçersiz sayılır.
+    """
+    if not cursor:
+        return None
+    try:
+        pair = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(pair, list):
+            return None
+        value, row_id = pair
+        row_id = int(row_id)
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            return None
+        if row_id not in _INTEGER_RANGE or (isinstance(value, int) and value not in _INTEGER_RANGE):
+            return None
+        return value, row_id
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def page_size():
+    """
+    ?limit= parametresinden sayfa boyutunu okur (1 ile MAX_PAGE_SIZE arasında)
+    """
+    limit = request.args.get('limit', type=int) or DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, sort, id_column, descending=False, limit=DEFAULT_PAGE_SIZE, after=None, before=None):
+    """
+    Sorgunun bir sayfasını (sıralama değeri, id) sırasıyla getirir
+    :param query: Filtreleri uygulanmış sorgu
+    :param sort: SortOption
+    :param id_column: Eşit sıralama değerlerini ayıran benzersiz sütun
+    :param descending: Azalan sıralama
+    :param limit: Sayfa boyutu
+    :param after: Bu imleçten sonraki sayfa
+    :param before: Bu imleçten önceki sayfa (after verilmemişse)
+    :return: Page
+    """
+    backwards = before is not None and after is None
+    cursor = decode_cursor(before if backwards else after)
+    # Geri giderken sıralama ters çevrilir, satırlar sonra tekrar düzeltilir
+    ascending = descending == backwards
+    key = sort.expression
+    if cursor is not None:
+        value, row_id = cursor
+        if ascending:
+            query = query.filter(or_(key > value, and_(key == value, id_column > row_id)))
+        else:
+            query = query.filter(or_(key < value, and_(key == value, id_column < row_id)))
+    order = (key.asc(), id_column.asc()) if ascending else (key.desc(), id_column.desc())
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+    has_next = True if backwards else more
+    has_prev = more if backwards else cursor is not None
+
+    def cursor_of(row):
+        return encode_cursor(sort.value(row), row.id)
+
+    return Page(rows,
+                cursor_of(rows[-1]) if rows and has_next else None,
+                cursor_of(rows[0]) if rows and has_prev else None)
+
+
+def listing_url(endpoint, **changes):
+    """
+    Mevcut liste parametrelerini koruyarak (değiştirilenler hariç) sayfa adresini oluşturur
+    Boş veya None değerli parametreler adrese eklenmez.
+    """
+    params = request.args.to_dict()
+    params.update(changes)
+    return url_for(endpoint, **{name: value for name, value in params.items() if value not in (None, '')})
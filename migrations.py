@@ -0,0 +1,238 @@
+"""
+Sürümlü veritabanı migrasyonları
+
+Her migrasyon bir sürüm numarası, kısa bir ad ve bağlantı üzerinde çalışan bir
+fonksiyondan oluşur. Uygulanan sürümler schema_migrations tablosunda tutulur;
+upgrade() sadece henüz uygulanmamış migrasyonları sırayla ve her birini ayrı
+bir veritabanı işleminde çalıştırır. Migrasyonlar sunucu her başladığında
+değil, dağıtım sırasında bir kez çalıştırılır:
+
+    flask --app app migrate
+    python migrations.py
+
+Yeni migrasyon eklerken MIGRATIONS listesinin sonuna ekleyin. Migrasyonlar
+kendi içinde tekrar çalıştırılabilir olmalıdır (sütun / indeks zaten varsa
+atlanır); böylece tabloları create_all ile oluşturulmuş eski veritabanları da
+sorunsuz yükseltilir.
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from models import db, Course, Term, User, schedule_columns, search_columns
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+
+def has_column(connection, table, column):
+    return column in [c['name'] for c in inspect(connection).get_columns(table)]
+
+
+def add_column(connection, table, column, definition):
+    """
+    Sütun yoksa ekler
+    :param definition: Sütun tanımı (örn. "INTEGER DEFAULT 1")
+    """
+    if not has_column(connection, table, column):
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {definition}'))
+
+
+def create_index(connection, name, table, columns):
+    """
+    İndeks yoksa oluşturur
+    """
+    connection.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})'))
+
+
+def initial_schema(connection):
+    # Eksik tabloları (ve modellerde tanımlı indekslerini) oluştur
+    db.metadata.create_all(bind=connection, checkfirst=True)
+
+
+def courses_instructor_and_semester(connection):
+    # Eski veritabanlarında eksik olan sütunlar (önceden app.py başlangıcında ekleniyordu)
+    add_column(connection, 'courses', 'instructor_id', 'INTEGER REFERENCES users(id)')
+    add_column(connection, 'courses', 'semester', 'INTEGER DEFAULT 1')
+
+
+def access_pattern_indexes(connection):
+    # Çakışma / program sorguları: gün + derslik + başlangıç saati
+    create_index(connection, 'ix_schedule_items_day_classroom_start', 'schedule_items',
+                 ['day', 'classroom_id', 'start_time'])
+    # Öğretim üyesinin dersleri ve bölüm + yarıyıl (sınıf grubu) sorguları
+    create_index(connection, 'ix_courses_instructor_id', 'courses', ['instructor_id'])
+    create_index(connection, 'ix_courses_department_semester', 'courses', ['department_id', 'semester'])
+    # Rol bazlı kullanıcı listeleri (örn. öğretim üyesi seçimi)
+    create_index(connection, 'ix_users_role', 'users', ['role'])
+
+
+def default_admin(connection):
+    # Admin kullanıcısı yoksa oluştur (önceden her sunucu başlangıcında kontrol ediliyordu)
+    exists = connection.execute(text("SELECT 1 FROM users WHERE username = 'admin'")).first()
+    if not exists:
+        connection.execute(text(
+            "INSERT INTO users (username, password, role, name) "
+            "VALUES ('admin', 'admin123', 'admin', 'Sistem Yöneticisi')"
+        ))
+
+
+def schedule_integer_time(connection):
+    # Gün ve saatlerin tamsayı karşılıkları (gün numarası, gece yarısından itibaren dakika)
+    add_column(connection, 'schedule_items', 'day_index', 'INTEGER')
+    add_column(connection, 'schedule_items', 'start_minute', 'INTEGER')
+    add_column(connection, 'schedule_items', 'end_minute', 'INTEGER')
+
+    # Mevcut kayıtları metin alanlarından dönüştür; çözümlenemeyen kayıtlar boş kalır
+    rows = connection.execute(text(
+        'SELECT id, day, start_time, end_time FROM schedule_items '
+        'WHERE day_index IS NULL OR start_minute IS NULL OR end_minute IS NULL'
+    )).fetchall()
+    updates = []
+    for item_id, day, start_time, end_time in rows:
+        try:
+            columns = schedule_columns(day, start_time, end_time)
+        except (ValueError, AttributeError):
+            continue
+        updates.append({'id': item_id, 'day_index': columns['day_index'],
+                        'start_minute': columns['start_minute'], 'end_minute': columns['end_minute']})
+    if updates:
+        connection.execute(text(
+            'UPDATE schedule_items SET day_index = :day_index, start_minute = :start_minute, '
+            'end_minute = :end_minute WHERE id = :id'
+        ), updates)
+
+    # Metin sütunlarındaki indeksin yerini tamsayı sütunlardaki indeks alır
+    connection.execute(text('DROP INDEX IF EXISTS ix_schedule_items_day_classroom_start'))
+    create_index(connection, 'ix_schedule_items_day_classroom_start_minute', 'schedule_items',
+                 ['day_index', 'classroom_id', 'start_minute'])
+
+
+def listing_indexes(connection):
+    # Ders ve kullanıcı listelerinin sıralama, önek araması ve bölüm filtresi
+    create_index(connection, 'ix_courses_code', 'courses', ['code'])
+    create_index(connection, 'ix_courses_name', 'courses', ['name'])
+    create_index(connection, 'ix_users_name', 'users', ['name'])
+    create_index(connection, 'ix_users_department_id', 'users', ['department_id'])
+
+
+def academic_terms(connection):
+    # Dönemler tablosu ve program öğelerinin dönemi
+    Term.__table__.create(bind=connection, checkfirst=True)
+    add_column(connection, 'schedule_items', 'term_id', 'INTEGER REFERENCES terms(id)')
+    create_index(connection, 'ix_schedule_items_term_id', 'schedule_items', ['term_id'])
+
+    # Aktif dönem yoksa varsayılan bir dönem oluşturup dönemsiz mevcut programı ona bağla
+    active = connection.execute(text('SELECT id FROM terms WHERE is_active = 1')).scalar()
+    if active is None:
+        connection.execute(text(
+            "INSERT INTO terms (code, name, is_active) VALUES ('VARSAYILAN', 'Varsayılan Dönem', 1)"
+        ))
+        active = connection.execute(text('SELECT id FROM terms WHERE is_active = 1')).scalar()
+    connection.execute(text('UPDATE schedule_items SET term_id = :term_id WHERE term_id IS NULL'),
+                       {'term_id': active})
+
+
+def schedule_term_required(connection):
+    # Aktif dönem yokken eklenen öğeler dönemsiz (her sorguda görünmez) kalmasın.
+    # ADD COLUMN ile eklenen sütun NOT NULL yapılamadığından SQLite'ta tetikleyiciyle zorlanır.
+    nullable = next(column['nullable'] for column in inspect(connection).get_columns('schedule_items')
+                    if column['name'] == 'term_id')
+    if not nullable:
+        return
+    if connection.dialect.name != 'sqlite':
+        connection.execute(text('ALTER TABLE schedule_items ALTER COLUMN term_id SET NOT NULL'))
+        return
+    for event in ('INSERT', 'UPDATE OF term_id'):
+        name = 'trg_schedule_items_term_' + event.split()[0].lower()
+        connection.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS {name} BEFORE {event} ON schedule_items '
+            "WHEN NEW.term_id IS NULL BEGIN SELECT RAISE(ABORT, 'NOT NULL constraint failed: "
+            "schedule_items.term_id (aktif dönem yok)'); END"
+        ))
+
+
+def search_keys(connection):
+    # Ders ve kullanıcı aramaları için büyük / küçük harf ve Türkçe i farkı gözetmeyen anahtar sütunları
+    for model in (Course, User):
+        table = model.__tablename__
+        for key, source in model.search_keys.items():
+            length = model.__table__.c[key].type.length
+            add_column(connection, table, key, f'VARCHAR({length})')
+            create_index(connection, f'ix_{table}_{key}', table, [key])
+
+        # Mevcut kayıtların anahtarlarını doldur (sütun eklenmeden önce eklenen kayıtlar dahil)
+        sources = list(model.search_keys.values())
+        rows = connection.execute(text(f'SELECT id, {", ".join(sources)} FROM {table}')).mappings().all()
+        updates = [dict(search_columns(model, row), id=row['id']) for row in rows]
+        if updates:
+            assignments = ', '.join(f'{key} = :{key}' for key in model.search_keys)
+            connection.execute(text(f'UPDATE {table} SET {assignments} WHERE id = :id'), updates)
+
+
+# (sürüm, ad, fonksiyon) - sırası değiştirilmemeli, sadece sona eklenmeli
+MIGRATIONS = [
+    (1, 'initial_schema', initial_schema),
+    (2, 'courses_instructor_and_semester', courses_instructor_and_semester),
+    (3, 'access_pattern_indexes', access_pattern_indexes),
+    (4, 'default_admin', default_admin),
+    (5, 'schedule_integer_time', schedule_integer_time),
+    (6, 'listing_indexes', listing_indexes),
+    (7, 'academic_terms', academic_terms),
+    (8, 'schedule_term_required', schedule_term_required),
+    (9, 'search_keys', search_keys),
+]
+
+
+def _ensure_migrations_table(engine):
+    with engine.begin() as connection:
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ('
+            'version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at VARCHAR(32) NOT NULL)'
+        ))
+
+
+def applied_versions(engine):
+    """
+    Uygulanmış migrasyon sürümlerini döndürür
+    """
+    _ensure_migrations_table(engine)
+    with engine.connect() as connection:
+        return {row[0] for row in connection.execute(text(f'SELECT version FROM {MIGRATIONS_TABLE}'))}
+
+
+def pending_migrations(engine):
+    """
+    Henüz uygulanmamış migrasyonları sırayla döndürür
+    """
+    applied = applied_versions(engine)
+    return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+
+def upgrade(engine, echo=print):
+    """
+    Bekleyen migrasyonları sırayla uygular
+    :param engine: SQLAlchemy motoru
+    :param echo: İlerleme mesajlarını yazan fonksiyon (None ise sessiz)
+    :return: Uygulanan migrasyonların (sürüm, ad) listesi
+    """
+    applied = []
+    for version, name, migration in pending_migrations(engine):
+        # Her migrasyon ve kaydı aynı işlemde; hata olursa sadece o migrasyon geri alınır
+        with engine.begin() as connection:
+            migration(connection)
+            connection.execute(
+                text(f'INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (:version, :name, :applied_at)'),
+                {'version': version, 'name': name, 'applied_at': datetime.now().isoformat(timespec='seconds')}
+            )
+        applied.append((version, name))
+        if echo:
+            echo(f'Migrasyon uygulandı: {version:04d} {name}')
+    return applied
+
+
+if __name__ == '__main__':
+    from app import app
+
+    with app.app_context():
+        if not upgrade(db.engine):
+            print('Veritabanı güncel, bekleyen migrasyon yok.')
@@ -1,10 +1,103 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
 
 db = SQLAlchemy()
 
+# Haftanın günleri (schedule_items.day_index bu listedeki sırayı tutar)
+DAYS = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma']
+
+
+def time_to_minutes(value):
+    """
+    "HH:MM" biçimindeki saati gece yarısından itibaren dakikaya çevirir
+    :param value: Saat metni (örn. "09:30")
+    :return: Dakika sayısı (örn. 570)
+    """
+    hours, minutes = value.strip().split(':')[:2]
+    total = int(hours) * 60 + int(minutes)
+    if not 0 <= total <= 24 * 60:
+        raise ValueError(f'Geçersiz saat: {value}')
+    return total
+
+
+def minutes_to_time(value):
+    """
+    Dakika cinsinden saati "HH:MM" biçimine çevirir
+    :param value: Gece yarısından itibaren dakika
+    :return: Saat metni
+    """
+    return f'{value // 60:02d}:{value % 60:02d}'
+
+
+def day_to_index(day):
+    """
+    Gün adını 0'dan başlayan gün numarasına çevirir (bilinmeyen gün için None)
+    """
+    try:
+        return DAYS.index(day)
+    except ValueError:
+        return None
+
+
+def schedule_columns(day, start, end):
+    """
+    Program öğesinin gün ve saatlerini hem tamsayı hem metin sütun değerleri olarak döndürür
+    (toplu ekleme / güncelleme işlemleri model olaylarını tetiklemediği için kullanılır)
+    :param day: Gün adı veya gün numarası
+    :param start: Başlangıç ("HH:MM" veya dakika)
+    :param end: Bitiş ("HH:MM" veya dakika)
+    :return: day, day_index, start_time, start_minute, end_time, end_minute anahtarlı sözlük
+    """
+    day_index = day if isinstance(day, int) else day_to_index(day)
+    start = start if isinstance(start, int) else time_to_minutes(start)
+    end = end if isinstance(end, int) else time_to_minutes(end)
+    return {
+        'day': DAYS[day_index] if isinstance(day, int) else day,
+        'day_index': day_index,
+        'start_time': minutes_to_time(start),
+        'start_minute': start,
+        'end_time': minutes_to_time(end),
+        'end_minute': end,
+    }
+
+# Arama anahtarında noktalı / noktasız i farkı gözetilmez (Python'un lower() fonksiyonu Türkçe I/İ için yanlıştır)
+_SEARCH_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+
+
+def search_key(value):
+    """
+    Metni büyük / küçük harf ve i / ı / İ / I farkı gözetmeyen arama anahtarına çevirir
+    :param value: Metin (örn. "DİL101", "Işık")
+    :return: Anahtar (örn. "dil101", "işik") veya None
+    """
+    if value is None:
+        return None
+    return value.translate(_SEARCH_FOLD).lower()
+
+
+def search_columns(model, values):
+    """
+    Modelin arama anahtarı sütunlarını kaynak sütun değerlerinden hesaplar
+    (toplu ekleme işlemleri model olaylarını tetiklemediği için kullanılır)
+    :param model: Model sınıfı (arama anahtarı olmayan modeller için boş sözlük döner)
+    :param values: Sütun adı -> değer sözlüğü
+    :return: Anahtar sütunu -> değer sözlüğü
+    """
+    return {key: search_key(values.get(source)) for key, source in getattr(model, 'search_keys', {}).items()}
+
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role', 'role'),
+        db.Index('ix_users_name', 'name'),
+        db.Index('ix_users_department_id', 'department_id'),
+        db.Index('ix_users_username_key', 'username_key'),
+        db.Index('ix_users_name_key', 'name_key'),
+    )
+    # Arama anahtarı sütunu -> kaynak sütun
+    search_keys = {'username_key': 'username', 'name_key': 'name'}
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -12,6 +105,9 @@ class User(UserMixin, db.Model):
     name = db.Column(db.String(120), nullable=True)
     role = db.Column(db.String(20), nullable=False)
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'))
+    # Arama için search_key() ile üretilen, kaynak sütunlarla senkron tutulan anahtarlar
+    username_key = db.Column(db.String(80), nullable=True)
+    name_key = db.Column(db.String(120), nullable=True)
 
 
 class Department(db.Model):
@@ -27,6 +123,16 @@ class Department(db.Model):
 
 class Course(db.Model):
     __tablename__ = 'courses'
+    __table_args__ = (
+        db.Index('ix_courses_instructor_id', 'instructor_id'),
+        db.Index('ix_courses_department_semester', 'department_id', 'semester'),
+        db.Index('ix_courses_code', 'code'),
+        db.Index('ix_courses_name', 'name'),
+        db.Index('ix_courses_code_key', 'code_key'),
+        db.Index('ix_courses_name_key', 'name_key'),
+    )
+    # Arama anahtarı sütunu -> kaynak sütun
+    search_keys = {'code_key': 'code', 'name_key': 'name'}
 
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(10), nullable=False)
@@ -39,10 +145,23 @@ class Course(db.Model):
     has_fixed_time = db.Column(db.Boolean, default=False)
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'))
     instructor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    # Arama için search_key() ile üretilen, kaynak sütunlarla senkron tutulan anahtarlar
+    code_key = db.Column(db.String(10), nullable=True)
+    name_key = db.Column(db.String(100), nullable=True)
 
     instructor = db.relationship('User', backref='courses')
 
 
+@event.listens_for(User, 'before_insert')
+@event.listens_for(User, 'before_update')
+@event.listens_for(Course, 'before_insert')
+@event.listens_for(Course, 'before_update')
+def _sync_search_keys(mapper, connection, target):
+    values = {source: getattr(target, source) for source in target.search_keys.values()}
+    for name, value in search_columns(type(target), values).items():
+        setattr(target, name, value)
+
+
 class Classroom(db.Model):
     __tablename__ = 'classrooms'
 
@@ -52,15 +171,80 @@ class Classroom(db.Model):
     type = db.Column(db.String(10), nullable=True, default='SINIF')
 
 
+class Term(db.Model):
+    __tablename__ = 'terms'
+    __table_args__ = (
+        # Aynı anda en fazla bir aktif dönem olabilir
+        db.Index('ux_terms_active', 'is_active', unique=True,
+                 sqlite_where=db.text('is_active = 1'), postgresql_where=db.text('is_active')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(20), unique=True, nullable=False)  # Örn. 2025-GUZ
+    name = db.Column(db.String(100), nullable=False)  # Örn. 2025-2026 Güz Dönemi
+    is_active = db.Column(db.Boolean, nullable=False, default=False)
+    # Arşivlenen dönemin program öğeleri arşiv veritabanına taşınır
+    archived_at = db.Column(db.DateTime, nullable=True)
+
+
+def active_term_clause():
+    """
+    Aktif dönemin id'sini veren skaler alt sorgu
+    Sorgulara ve INSERT'lere gömülür; aktif dönem için ayrı bir sorgu veya önbellek gerekmez.
+    """
+    return select(Term.id).where(Term.is_active == db.true()).scalar_subquery()
+
+
 class Schedule(db.Model):
     __tablename__ = 'schedule_items'
+    __table_args__ = (
+        db.Index('ix_schedule_items_day_classroom_start_minute', 'day_index', 'classroom_id', 'start_minute'),
+        db.Index('ix_schedule_items_term_id', 'term_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    # Program öğesinin dönemi; belirtilmezse (tüm ekleme yollarında) aktif dönem
+    # Aktif dönem yoksa alt sorgu NULL döner ve ekleme NOT NULL kısıtıyla reddedilir
+    term_id = db.Column(db.Integer, db.ForeignKey('terms.id'), nullable=False, default=active_term_clause())
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'))
     classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'))
+    # Görüntüleme için metin alanları; tamsayı alanlardan türetilebilir ve onlarla senkron tutulur
     day = db.Column(db.String(20), nullable=False)
     start_time = db.Column(db.String(5), nullable=False)
     end_time = db.Column(db.String(5), nullable=False)
+    # Sorgu ve çakışma kontrolleri için: gün numarası (0 = Pazartesi) ve gece yarısından itibaren dakika
+    day_index = db.Column(db.Integer, nullable=True)
+    start_minute = db.Column(db.Integer, nullable=True)
+    end_minute = db.Column(db.Integer, nullable=True)
 
     course = db.relationship('Course', backref='schedule_items')
-    classroom = db.relationship('Classroom', backref='schedule_items')
\ No newline at end of file
+    classroom = db.relationship('Classroom', backref='schedule_items')
+
+
+def in_active_term():
+    """
+    Program öğesinin aktif döneme ait olma koşulu (program sorgularının tamamı bu koşulla sınırlanır)
+    """
+    return Schedule.term_id == active_term_clause()
+
+
+@event.listens_for(Schedule, 'before_insert')
+@event.listens_for(Schedule, 'before_update')
+def _sync_schedule_columns(mapper, connection, target):
+    # Sadece tamsayı alanlar değiştiyse metinleri, aksi halde tamsayıları metinlerden türet
+    attrs = inspect(target).attrs
+    integers_changed = any(attrs[name].history.has_changes() for name in ('day_index', 'start_minute', 'end_minute'))
+    strings_changed = any(attrs[name].history.has_changes() for name in ('day', 'start_time', 'end_time'))
+    if integers_changed and not strings_changed:
+        columns = schedule_columns(target.day_index, target.start_minute, target.end_minute)
+    else:
+        columns = schedule_columns(target.day, target.start_time, target.end_time)
+    for name, value in columns.items():
+        setattr(target, name, value)
+
+
+class AppState(db.Model):
+    __tablename__ = 'app_state'
+
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
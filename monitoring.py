@@ -0,0 +1,331 @@
+"""
+Yapılandırılmış loglama, istek süresi ölçümü ve /metrics
+
+- Log kayıtları JSON satırları olarak yazılır. İstek işleyen iş parçacığı
+  kayıtları yalnızca bir kuyruğa bırakır (QueueHandler); çıktıya yazma ayrı
+  bir iş parçacığında yapılır (QueueListener), böylece yavaş stdout / dosya
+  yazımı istek süresine eklenmez.
+- Her istek için süre, SQL sorgu sayısı ve veritabanında geçen süre ölçülür
+  ve sayfa (endpoint) bazında gecikme histogramlarına eklenir. Ayrıca tek bir
+  "istek" log kaydı yazılır; bu kayıt DEBUG seviyesindedir, LOG_REQUESTS=1 ile
+  INFO seviyesinde yazılır (statik dosyalar hariç).
+- /metrics bu sayaçları Prometheus metin biçiminde sunar. Sadece METRICS_TOKEN
+  tanımlıysa ve istek "Authorization: Bearer <token>" başlığını taşıyorsa
+  erişilebilir (ters vekil sunucu arkasında istemci adresi güvenilir değildir).
+  Sayaçlar süreç başınadır.
+- Sorgu bütçesi: bir istekte aynı SQL cümlesi tekrar tekrar çalışıyorsa (N+1
+  şüphesi) uyarı yazılır. query_budget ile işaretlenen sayfalar bütçeyi
+  aştığında "warn" kipinde uyarı yazılır, "strict" kipinde (test) istek hata
+  verir. Kip QUERY_BUDGET_MODE ile seçilir (off, warn, strict; varsayılan:
+  test kipinde strict, diğerlerinde warn).
+
+    flask --app app check-query-budgets
+
+Log seviyesi LOG_LEVEL ortam değişkeni veya app.config['LOG_LEVEL'] ile seçilir.
+"""
+import atexit
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+import click
+from flask import Response, abort, g, has_request_context, request
+from sqlalchemy import event
+
+from models import db, User
+from storage import storage_mode
+
+# Gecikme histogramı üst sınırları (saniye)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bir istekte aynı SQL cümlesi bu kadar kez çalışırsa N+1 şüphesi olarak raporlanır
+REPEATED_QUERY_THRESHOLD = 5
+
+# Sorgu bütçesi kipleri
+BUDGET_MODES = ('off', 'warn', 'strict')
+
+# LogRecord'un standart alanları; bunların dışındaki extra alanları JSON'a eklenir
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Log kaydını tek satırlık JSON nesnesine çevirir (extra ile verilen alanlar dahil)
+    """
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Sayfa, strict kipte tanımlı sorgu bütçesinden fazla SQL sorgusu çalıştırdığında
+    """
+
+
+def query_budget(limit, methods=('GET',)):
+    """
+    Bir sayfanın bir istekte çalıştırabileceği en fazla SQL sorgu sayısını tanımlayan dekoratör
+    (kullanıcı yükleme sorgusu dahil). @app.route'un hemen altında kullanılır.
+    :param limit: En fazla sorgu sayısı
+    :param methods: Bütçenin geçerli olduğu HTTP metotları
+    """
+    def decorator(view):
+        view.query_budget = dict(getattr(view, 'query_budget', {}), **{method: limit for method in methods})
+        return view
+    return decorator
+
+
+def budget_mode(app):
+    """
+    Uygulamanın sorgu bütçesi kipini döndürür
+    """
+    mode = app.config.get('QUERY_BUDGET_MODE') or os.environ.get('QUERY_BUDGET_MODE')
+    if not mode:
+        mode = 'strict' if app.testing or storage_mode(app) == 'test' else 'warn'
+    if mode not in BUDGET_MODES:
+        raise ValueError(f'Geçersiz QUERY_BUDGET_MODE: {mode} (seçenekler: {", ".join(BUDGET_MODES)})')
+    return mode
+
+
+class RouteMetrics:
+    """
+    Sayfa bazında istek sayısı, gecikme histogramı, SQL sorgu sayısı ve veritabanı süresi
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, status, seconds, queries, db_seconds):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'count': 0, 'sum': 0.0, 'buckets': [0] * (len(self.buckets) + 1),
+                    'queries': 0, 'db_seconds': 0.0, 'errors': 0,
+                }
+            stats['count'] += 1
+            stats['sum'] += seconds
+            stats['buckets'][bisect_left(self.buckets, seconds)] += 1
+            stats['queries'] += queries
+            stats['db_seconds'] += db_seconds
+            if status >= 500:
+                stats['errors'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {route: dict(stats, buckets=list(stats['buckets'])) for route, stats in self._routes.items()}
+
+    def render(self):
+        """
+        Sayaçları Prometheus metin biçiminde döndürür
+        """
+        routes = sorted(self.snapshot().items())
+        lines = ['# HELP http_request_duration_seconds İstek süresi',
+                 '# TYPE http_request_duration_seconds histogram']
+        for route, stats in routes:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), stats['buckets']):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{route="{route}"}} {stats["sum"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{route="{route}"}} {stats["count"]}')
+        for name, key, help_text, metric_type in (
+                ('db_queries_total', 'queries', 'Çalıştırılan SQL sorgusu sayısı', 'counter'),
+                ('db_time_seconds_total', 'db_seconds', 'Veritabanında geçen süre', 'counter'),
+                ('http_request_errors_total', 'errors', '5xx ile sonuçlanan istek sayısı', 'counter')):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for route, stats in routes:
+                value = stats[key]
+                lines.append(f'{name}{{route="{route}"}} {value:.6f}' if isinstance(value, float)
+                             else f'{name}{{route="{route}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+# Uygulama genelinde paylaşılan sayaçlar
+metrics = RouteMetrics()
+
+
+def configure_logging(level=None, stream=None):
+    """
+    Kök logger'ı kuyruklu JSON çıktısına yönlendirir
+    :param level: Log seviyesi (varsayılan: LOG_LEVEL ortam değişkeni veya INFO)
+    :param stream: Çıktı (varsayılan: stderr)
+    :return: Arka planda yazan QueueListener
+    """
+    log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel((level or os.environ.get('LOG_LEVEL') or 'INFO').upper())
+
+    listener.start()
+    # Süreç kapanırken kuyrukta kalan kayıtları yaz
+    atexit.register(listener.stop)
+    return listener
+
+
+def _request_stats():
+    # SQL olayları istek dışında da (CLI, arka plan işleri) tetiklenebilir
+    if not has_request_context():
+        return None
+    return g.get('_request_stats')
+
+
+def init_monitoring(app):
+    """
+    Loglamayı, istek ölçümünü ve /metrics sayfasını uygulamaya bağlar (init_storage'dan sonra çağrılır)
+    """
+    configure_logging(app.config.get('LOG_LEVEL'))
+    logger = logging.getLogger('requests')
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        stats = _request_stats()
+        if stats is not None:
+            stats['queries'] += 1
+            stats['db_seconds'] += time.perf_counter() - started
+            stats['statements'][statement] += 1
+
+    @app.before_request
+    def _start_timer():
+        g._request_stats = {'started': time.perf_counter(), 'queries': 0, 'db_seconds': 0.0,
+                            'statements': Counter()}
+
+    @app.after_request
+    def _record_request(response):
+        stats = g.pop('_request_stats', None)
+        if stats is None or request.endpoint == 'metrics':
+            return response
+        seconds = time.perf_counter() - stats['started']
+        route = request.endpoint or 'not_found'
+        metrics.observe(route, response.status_code, seconds, stats['queries'], stats['db_seconds'])
+        level = logging.INFO if app.config.get('LOG_REQUESTS') and route != 'static' else logging.DEBUG
+        logger.log(level, 'istek', extra={
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'duration_ms': round(seconds * 1000, 2),
+            'queries': stats['queries'],
+            'db_ms': round(stats['db_seconds'] * 1000, 2),
+        })
+        check_query_budget(app, route, stats)
+        return response
+
+    @app.cli.command('check-query-budgets')
+    def check_query_budgets_command():
+        """
+        Bütçe tanımlı, parametresiz GET sayfalarını admin olarak çağırıp sorgu sayılarını bütçeleriyle karşılaştırır
+        """
+        results = measure_query_budgets(app)
+        for route, queries, limit in results:
+            status = 'AŞILDI' if queries > limit else 'ok'
+            click.echo(f'{route}: {queries}/{limit} sorgu {status}')
+        if any(queries > limit for _, queries, limit in results):
+            raise SystemExit(1)
+
+    # Ölçüm sayfası (METRICS_TOKEN ile)
+    @app.route('/metrics', endpoint='metrics')
+    def metrics_view():
+        """
+        Sayfa bazında gecikme histogramları, SQL sorgu sayıları ve veritabanı süresi
+        """
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+            abort(401)
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def route_budget(app, endpoint, method):
+    """
+    Sayfanın ilgili HTTP metodu için tanımlı sorgu bütçesi (yoksa None)
+    """
+    return getattr(app.view_functions.get(endpoint), 'query_budget', {}).get(method)
+
+
+def check_query_budget(app, route, stats):
+    """
+    İstekte tekrarlanan SQL cümlelerini ve sayfanın sorgu bütçesini denetler
+    :param route: Sayfa (endpoint) adı
+    :param stats: İstek boyunca toplanan sorgu sayaçları
+    """
+    mode = budget_mode(app)
+    if mode == 'off':
+        return
+    logger = logging.getLogger('query_budget')
+    for statement, count in stats['statements'].items():
+        if count >= REPEATED_QUERY_THRESHOLD:
+            logger.warning('Tekrarlanan SQL sorgusu (N+1 şüphesi)', extra={
+                'route': route, 'count': count, 'statement': ' '.join(statement.split())[:300],
+            })
+
+    limit = route_budget(app, route, request.method)
+    if limit is None or stats['queries'] <= limit:
+        return
+    message = f'{route} sorgu bütçesini aştı: {stats["queries"]} sorgu (bütçe {limit})'
+    if mode == 'strict':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message, extra={'route': route, 'queries': stats['queries'], 'budget': limit})
+
+
+def measure_query_budgets(app):
+    """
+    Bütçe tanımlı, URL parametresi olmayan GET sayfalarını ilk admin kullanıcısıyla çağırır
+    :return: [(sayfa, sorgu sayısı, bütçe)]
+    """
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').order_by(User.id).first()
+    client = app.test_client()
+    if admin is not None:
+        with client.session_transaction() as session:
+            session['_user_id'] = str(admin.id)
+            session['_fresh'] = True
+
+    results = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        limit = route_budget(app, rule.endpoint, 'GET')
+        if limit is None or rule.arguments:
+            continue
+        before = metrics.snapshot().get(rule.endpoint, {}).get('queries', 0)
+        client.get(rule.rule)
+        queries = metrics.snapshot().get(rule.endpoint, {}).get('queries', 0) - before
+        results.append((rule.endpoint, queries, limit))
+    return results
@@ -0,0 +1,255 @@
+"""
+Ders programı doluluk indeksi
+
+Derslik, öğretim üyesi ve sınıf grubu (bölüm + yarıyıl) bazında her gün için
+dolu zaman aralıklarını bellekte tutar. Çakışma kontrolleri veritabanına sorgu
+atmadan, dakika çözünürlüklü bit maskeleri üzerinden yapılır.
+"""
+import threading
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from models import db, Course, Schedule, in_active_term
+from versioning import current_version, committed_version
+
+# İndeks anahtar türleri
+CLASSROOM = 'classroom'
+INSTRUCTOR = 'instructor'
+COHORT = 'cohort'
+
+# İndekste tutulan program öğesi (saatler gece yarısından itibaren dakika cinsinden)
+Placement = namedtuple('Placement', [
+    'id', 'course_id', 'classroom_id', 'day', 'start', 'end',
+    'instructor_id', 'department_id', 'semester'
+])
+
+
+def interval_mask(start, end):
+    """
+    [start, end) dakika aralığını kapsayan bit maskesini döndürür
+    """
+    return ((1 << (end - start)) - 1) << start
+
+
+def placement_keys(placement):
+    """
+    Bir program öğesinin indekste bulunduğu (tür, sahip) anahtarlarını döndürür
+    """
+    keys = [(CLASSROOM, placement.classroom_id)]
+    if placement.instructor_id:
+        keys.append((INSTRUCTOR, placement.instructor_id))
+    if placement.department_id:
+        keys.append((COHORT, (placement.department_id, placement.semester)))
+    return keys
+
+
+def load_placements():
+    """
+    Aktif dönemin tüm program öğelerini ders bilgileriyle birlikte tek sorguda yükler
+    :return: Placement listesi
+    """
+    rows = db.session.query(
+        Schedule.id, Schedule.course_id, Schedule.classroom_id,
+        Schedule.day, Schedule.start_minute, Schedule.end_minute,
+        Course.instructor_id, Course.department_id, Course.semester
+    ).outerjoin(Course, Schedule.course_id == Course.id).filter(
+        in_active_term(),
+        # Saati çözümlenemeyen (migrasyonda boş kalan) kayıtlar indekse alınmaz
+        Schedule.start_minute.isnot(None), Schedule.end_minute.isnot(None)
+    ).all()
+
+    return [Placement(*row) for row in rows]
+
+
+class OccupancyIndex:
+    """
+    Gün bazında derslik / öğretim üyesi / sınıf grubu doluluk indeksi
+
+    Her (tür, sahip, gün) anahtarı için bir bit maskesi ve başlangıca göre
+    sıralı aralık listesi tutulur. Boş olup olmadığı sorusu tek bir AND
+    işlemiyle, çakışan kayıtların listesi ise sıralı liste üzerinde ikili
+    arama ile cevaplanır.
+
+    İndeks oluşturulduğu veri sürümünü saklar; başka bir süreç programı
+    değiştirdiyse bir sonraki kullanımda yeniden yüklenir.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.built = False
+        self.version = None
+        self._reset()
+
+    def _reset(self):
+        self._bitmaps = {}     # (tür, sahip, gün) -> dolu dakikaların bit maskesi
+        self._intervals = {}   # (tür, sahip, gün) -> [(başlangıç, bitiş, öğe id)]
+        self._items = {}       # öğe id -> Placement
+        self._by_course = {}   # ders id -> {öğe id}
+
+    def build(self, placements, version=None):
+        """
+        İndeksi verilen program öğelerinden sıfırdan oluşturur
+        :param placements: Placement listesi
+        :param version: Öğelerin ait olduğu veri sürümü
+        """
+        with self._lock:
+            self._reset()
+            for placement in placements:
+                self._insert(placement)
+            self.built = True
+            self.version = version
+
+    def ensure_built(self):
+        """
+        İndeks henüz oluşturulmadıysa veya veri sürümü değiştiyse veritabanından yükler
+        :return: İndeksin kendisi
+        """
+        version = current_version()
+        with self._lock:
+            if not self.built or self.version != version:
+                self.build(load_placements(), version)
+        return self
+
+    def invalidate(self):
+        """
+        İndeksi geçersiz kılar, bir sonraki kullanımda yeniden yüklenir
+        """
+        with self._lock:
+            self.built = False
+            self.version = None
+            self._reset()
+
+    def _follow_commit(self):
+        """
+        Bu süreçte yapılan son commit'in indeksi bir sürüm ileri taşıyıp
+        taşımadığını kontrol eder; arada başka bir yazma olduysa indeksi
+        geçersiz kılar
+        :return: Artımlı güncelleme yapılabilirse True
+        """
+        committed = committed_version()
+        if self.built and committed is not None and self.version is not None \
+                and self.version <= committed <= self.version + 1:
+            self.version = committed
+            return True
+        self.invalidate()
+        return False
+
+    def _insert(self, placement):
+        self._items[placement.id] = placement
+        self._by_course.setdefault(placement.course_id, set()).add(placement.id)
+        mask = interval_mask(placement.start, placement.end)
+        for kind, owner in placement_keys(placement):
+            key = (kind, owner, placement.day)
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | mask
+            insort(self._intervals.setdefault(key, []), (placement.start, placement.end, placement.id))
+
+    def _delete(self, item_id):
+        placement = self._items.pop(item_id, None)
+        if placement is None:
+            return None
+        course_items = self._by_course.get(placement.course_id)
+        if course_items is not None:
+            course_items.discard(item_id)
+            if not course_items:
+                del self._by_course[placement.course_id]
+        for kind, owner in placement_keys(placement):
+            key = (kind, owner, placement.day)
+            intervals = self._intervals.get(key, [])
+            entry = (placement.start, placement.end, item_id)
+            position = bisect_left(intervals, entry)
+            if position < len(intervals) and intervals[position] == entry:
+                del intervals[position]
+            if intervals:
+                # Eski kayıtlar üst üste binebileceği için maskeyi kalan aralıklardan yeniden hesapla
+                mask = 0
+                for start, end, _ in intervals:
+                    mask |= interval_mask(start, end)
+                self._bitmaps[key] = mask
+            else:
+                self._intervals.pop(key, None)
+                self._bitmaps.pop(key, None)
+        return placement
+
+    def add(self, placement):
+        """
+        Yeni eklenen bir program öğesini indekse işler
+        :param placement: Placement nesnesi
+        """
+        with self._lock:
+            if self._follow_commit():
+                self._delete(placement.id)
+                self._insert(placement)
+
+    def insert(self, placement):
+        """
+        Program öğesini sürüm takibi yapmadan indekse ekler (veritabanına
+        bağlı olmayan geçici indeksler için; paylaşılan indekste add kullanılır)
+        """
+        with self._lock:
+            self._insert(placement)
+
+    def remove(self, item_id):
+        """
+        Silinen bir program öğesini indeksten çıkarır
+        :param item_id: Program öğesinin ID'si
+        :return: Çıkarılan Placement veya None
+        """
+        with self._lock:
+            if self._follow_commit():
+                return self._delete(item_id)
+            return None
+
+    def update_course(self, course_id, instructor_id, department_id, semester):
+        """
+        Bir dersin öğretim üyesi, bölüm veya yarıyılı değiştiğinde o derse ait
+        program öğelerini yeni bilgilerle yeniden indeksler
+        """
+        with self._lock:
+            if not self._follow_commit():
+                return
+            for item_id in list(self._by_course.get(course_id, ())):
+                placement = self._delete(item_id)
+                self._insert(placement._replace(
+                    instructor_id=int(instructor_id) if instructor_id else None,
+                    department_id=int(department_id) if department_id else None,
+                    semester=int(semester) if semester is not None else None
+                ))
+
+    def is_free(self, kind, owner, day, start, end):
+        """
+        Verilen sahibin gün ve saat aralığında boş olup olmadığını döndürür
+        """
+        with self._lock:
+            return not self._bitmaps.get((kind, owner, day), 0) & interval_mask(start, end)
+
+    def conflicts(self, kind, owner, day, start, end):
+        """
+        Verilen sahip için gün ve saat aralığıyla çakışan program öğelerini döndürür
+        :param kind: CLASSROOM, INSTRUCTOR veya COHORT
+        :param owner: Derslik ID'si, öğretim üyesi ID'si veya (bölüm ID, yarıyıl)
+        :param day: Gün adı
+        :param start: Başlangıç (dakika)
+        :param end: Bitiş (dakika)
+        :return: Başlangıç saatine göre sıralı Placement listesi
+        """
+        key = (kind, owner, day)
+        with self._lock:
+            if not self._bitmaps.get(key, 0) & interval_mask(start, end):
+                return []
+            intervals = self._intervals[key]
+            # Başlangıcı aralığın bitişinden önce olan kayıtlar aday olabilir
+            upper = bisect_left(intervals, (end,))
+            return [self._items[item_id]
+                    for item_start, item_end, item_id in intervals[:upper]
+                    if item_end > start]
+
+    def placements(self):
+        """
+        İndeksteki tüm program öğelerini döndürür
+        """
+        with self._lock:
+            return list(self._items.values())
+
+
+# Uygulama genelinde paylaşılan indeks
+schedule_index = OccupancyIndex()
@@ -0,0 +1,363 @@
+"""
+Paralel çok başlangıçlı (portföy) program araması
+
+Büyük fakültelerde tek bir arama yerel bir çıkmaza takılabilir. Bu modül farklı
+tohumlarla başlatılan oluşturma + iyileştirme çalışmalarını bir süreç havuzunda
+tüm çekirdeklere dağıtır, belirlenen süre dolduğunda en iyi puanlı programı
+seçer. Çalışma süresince her işçinin ilerlemesi ve o ana kadarki en iyi puan
+sorgulanabilir. İlerleme bilgisi tüm işlerin paylaştığı tek bir Manager süreci
+üzerinden taşınır; biten işler JOB_TTL süresi sonunda bellekten atılır.
+Bir süreçte aynı anda tek arama çalışır; işçi sayısı çekirdek sayısıyla sınırlıdır.
+
+Puanlama (düşük olan daha iyi):
+- Sert kısıtlar: derslik çakışması ve öğretim üyesi çakışması (add_schedule ile aynı)
+- Yerleştirilemeyen oturumlar
+- Yumuşak cezalar: sınıf grubunun gün içindeki boş saatleri ve LAB/normal derslik uyumsuzluğu
+"""
+import multiprocessing
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from timetable import PRACTICE, Solver, TimetableSolution, is_lab, period_mask
+
+# Puan ağırlıkları
+OVERLAP_WEIGHT = 1000
+UNPLACED_WEIGHT = 100
+GAP_WEIGHT = 1
+MISMATCH_WEIGHT = 5
+
+# İlerleme bilgisinin güncellenme aralığı (saniye)
+PROGRESS_INTERVAL = 0.5
+
+
+def count_gaps(mask):
+    """
+    Bir günün dolu saat maskesinde ilk ve son ders arasındaki boş saat sayısı
+    """
+    if not mask:
+        return 0
+    span = mask.bit_length() - ((mask & -mask).bit_length() - 1)
+    return span - bin(mask).count('1')
+
+
+def _count_overlaps(intervals):
+    overlaps = 0
+    intervals.sort()
+    for i, (start, end) in enumerate(intervals):
+        for other_start, _ in intervals[i + 1:]:
+            if other_start >= end:
+                break
+            overlaps += 1
+    return overlaps
+
+
+def score_solution(problem, solution):
+    """
+    Bir çözümün puanını ve puanı oluşturan bileşenleri hesaplar
+    :param problem: TimetableProblem
+    :param solution: TimetableSolution
+    :return: Puan bileşenlerini içeren sözlük ('score' anahtarı toplam puandır)
+    """
+    rooms = {room.id: room for room in problem.rooms}
+    by_room, by_instructor, by_cohort = {}, {}, {}
+    mismatches = 0
+
+    entries = [(placement.classroom_id, placement.instructor_id,
+                (placement.department_id, placement.semester) if placement.department_id else None,
+                placement.day, placement.start, placement.end)
+               for placement in problem.pinned]
+    for assignment in solution.assignments:
+        session = assignment.session
+        entries.append((assignment.classroom_id, session.instructor_id, session.cohort,
+                        assignment.day, assignment.start, assignment.end))
+        room = rooms.get(assignment.classroom_id)
+        if room is not None and is_lab(room.type) != (session.kind == PRACTICE):
+            mismatches += 1
+
+    for classroom_id, instructor_id, cohort, day, start, end in entries:
+        by_room.setdefault((classroom_id, day), []).append((start, end))
+        if instructor_id:
+            by_instructor.setdefault((instructor_id, day), []).append((start, end))
+        if cohort:
+            key = (cohort, day)
+            by_cohort[key] = by_cohort.get(key, 0) | period_mask(start, end)
+
+    classroom_overlaps = sum(_count_overlaps(intervals) for intervals in by_room.values())
+    instructor_overlaps = sum(_count_overlaps(intervals) for intervals in by_instructor.values())
+    cohort_gaps = sum(count_gaps(mask) for mask in by_cohort.values())
+    unplaced = len(solution.unplaced)
+
+    return {
+        'score': (OVERLAP_WEIGHT * (classroom_overlaps + instructor_overlaps)
+                  + UNPLACED_WEIGHT * unplaced
+                  + GAP_WEIGHT * cohort_gaps
+                  + MISMATCH_WEIGHT * mismatches),
+        'classroom_overlaps': classroom_overlaps,
+        'instructor_overlaps': instructor_overlaps,
+        'unplaced': unplaced,
+        'cohort_gaps': cohort_gaps,
+        'room_mismatches': mismatches,
+    }
+
+
+def _placement_cost(solver, index, day, mask, room):
+    """
+    Oturum yerinden çıkarılmışken verilen yerleşimin yumuşak ceza katkısı
+    """
+    session = solver.sessions[index]
+    cost = 0
+    if is_lab(solver.rooms[room].type) != (session.kind == PRACTICE):
+        cost += MISMATCH_WEIGHT
+    if session.cohort:
+        busy = solver.cohort_busy[session.cohort][day]
+        cost += GAP_WEIGHT * (count_gaps(busy | mask) - count_gaps(busy))
+    return cost
+
+
+def _best_move(solver, index, rng):
+    """
+    Oturum için en düşük maliyetli yerleşimi seçer (oturum atanmamış olmalı)
+    :return: (maliyet, gün, ilk saat, maske, derslik) veya None
+    """
+    best = None
+    for _, day, first, mask, room in solver.candidates(index):
+        cost = _placement_cost(solver, index, day, mask, room) + rng.random() * 0.01
+        if best is None or cost < best[0]:
+            best = (cost, day, first, mask, room)
+    return best
+
+
+def improve(solver, unplaced_indexes, rng, deadline, max_moves=2000):
+    """
+    Tek oturum taşıma hamleleriyle yerel arama yapar; önce yerleştirilemeyen
+    oturumlara yer arar, ardından yumuşak cezayı azaltan taşımaları uygular
+    :param solver: Oluşturma aşamasını (construct) bitirmiş Solver
+    :param unplaced_indexes: Yerleştirilemeyen oturumların indeksleri
+    :param rng: random.Random
+    :param deadline: time.monotonic() cinsinden bitiş anı
+    :param max_moves: En fazla hamle sayısı
+    :return: Hâlâ yerleştirilemeyen oturum indeksleri
+    """
+    unplaced_indexes = list(unplaced_indexes)
+    for _ in range(max_moves):
+        if time.monotonic() > deadline:
+            break
+        if unplaced_indexes and rng.random() < 0.5:
+            index = rng.choice(unplaced_indexes)
+            move = _best_move(solver, index, rng)
+            if move is not None:
+                _, day, first, mask, room = move
+                solver.place(index, day, first, mask, room)
+                unplaced_indexes.remove(index)
+            continue
+        if not solver.assignment:
+            break
+        index = rng.choice(list(solver.assignment))
+        day, first, mask, room = solver.remove(index)
+        current = _placement_cost(solver, index, day, mask, room)
+        move = _best_move(solver, index, rng)
+        if move is not None and move[0] < current:
+            _, day, first, mask, room = move
+        solver.place(index, day, first, mask, room)
+    return unplaced_indexes
+
+
+def run_worker(worker_id, problem, seed, budget, progress):
+    """
+    Süre dolana kadar farklı tohumlarla oluşturma + iyileştirme turları çalıştırır
+    :param worker_id: İşçi numarası
+    :param problem: TimetableProblem
+    :param seed: Başlangıç tohumu
+    :param budget: Çalışma süresi (saniye)
+    :param progress: İşçiler arası paylaşılan ilerleme sözlüğü
+    :return: (en iyi puan bileşenleri, en iyi TimetableSolution)
+    """
+    started = time.monotonic()
+    deadline = started + budget
+    rng = random.Random(seed)
+    best_score, best_solution = None, None
+    rounds = 0
+    last_report = 0.0
+
+    def report(state):
+        progress[worker_id] = {
+            'state': state,
+            'rounds': rounds,
+            'best_score': best_score['score'] if best_score else None,
+            'elapsed': round(time.monotonic() - started, 2),
+        }
+
+    report('running')
+    while time.monotonic() < deadline:
+        rounds += 1
+        remaining = max(deadline - time.monotonic(), 0.1)
+        solver = Solver(problem, rng, node_limit=5000, time_limit=min(remaining, 5.0),
+                        strict_room_types=False)
+        unplaced = improve(solver, solver.construct(), rng, deadline)
+
+        solution = TimetableSolution(solver.assignments(), [problem.sessions[i] for i in unplaced],
+                                     solver.nodes, time.monotonic() - started, not unplaced)
+        score = score_solution(problem, solution)
+        if best_score is None or score['score'] < best_score['score']:
+            best_score, best_solution = score, solution
+        if best_score['score'] == 0:
+            # Daha iyisi olamaz
+            break
+        if time.monotonic() - last_report > PROGRESS_INTERVAL:
+            last_report = time.monotonic()
+            report('running')
+
+    report('finished')
+    return best_score, best_solution
+
+
+class PortfolioJob:
+    """
+    Arka planda çalışan bir portföy araması ve durumu
+    """
+
+    def __init__(self, problem, workers, budget, on_finish=None, data_version=None):
+        self.id = uuid.uuid4().hex
+        self.problem = problem
+        self.workers = workers
+        self.budget = budget
+        self.on_finish = on_finish
+        # Arama başlarken okunan veri sürümü; sonuç uygulanmadan önce karşılaştırılır
+        self.data_version = data_version
+        self.state = 'pending'
+        self.started = None
+        self.finished = None
+        self.best_score = None
+        self.best_worker = None
+        self.solution = None
+        self.result = None
+        self.error = None
+        self._progress = _shared_manager().dict()
+        self._progress_snapshot = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = time.monotonic()
+        self.state = 'running'
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            base_seed = random.randrange(1 << 30)
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(run_worker, worker_id, self.problem, base_seed + worker_id * 7919,
+                                self.budget, self._progress)
+                    for worker_id in range(self.workers)
+                ]
+                for worker_id, future in enumerate(futures):
+                    score, solution = future.result()
+                    if score is not None and (self.best_score is None or score['score'] < self.best_score['score']):
+                        self.best_score, self.solution, self.best_worker = score, solution, worker_id
+            if self.on_finish is not None and self.solution is not None:
+                self.result = self.on_finish(self)
+            self.state = 'finished'
+        except Exception as e:
+            self.error = str(e)
+            self.state = 'failed'
+        finally:
+            self._progress_snapshot = dict(self._progress)
+            # Paylaşılan Manager'daki sözlük ve artık gerekmeyen arama verisi serbest bırakılır
+            self._progress = None
+            self.problem = self.solution = None
+            self.finished = time.monotonic()
+
+    def status(self):
+        """
+        İşçi bazında ilerlemeyi ve o ana kadarki en iyi puanı döndürür
+        """
+        if self.state in ('finished', 'failed'):
+            progress = self._progress_snapshot
+        else:
+            try:
+                progress = dict(self._progress)
+            except Exception:
+                progress = {}
+        scores = [worker['best_score'] for worker in progress.values() if worker.get('best_score') is not None]
+        return {
+            'id': self.id,
+            'state': self.state,
+            'budget': self.budget,
+            'elapsed': round(time.monotonic() - self.started, 2) if self.started else 0,
+            'best_score_so_far': min(scores) if scores else None,
+            'best_score': self.best_score,
+            'best_worker': self.best_worker,
+            'workers': {str(worker_id): worker for worker_id, worker in sorted(progress.items())},
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+# En uzun arama süresi (saniye)
+MAX_BUDGET = 600.0
+
+# En fazla işçi süreç sayısı
+MAX_WORKERS = os.cpu_count() or 1
+
+# Biten işlerin durumunun sorgulanabileceği süre (saniye)
+JOB_TTL = 3600.0
+
+# Süreç içindeki işler
+_jobs = {}
+_jobs_lock = threading.Lock()
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def _shared_manager():
+    """
+    İşçilerin ilerleme bildirdiği, tüm işlerin paylaştığı Manager süreci (ilk kullanımda başlatılır)
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = multiprocessing.Manager()
+        return _manager
+
+
+def _evict_finished():
+    # JOB_TTL süresinden önce bitmiş işleri sil (_jobs_lock tutulurken çağrılır)
+    now = time.monotonic()
+    for job_id in [job_id for job_id, job in _jobs.items() if job.finished and now - job.finished > JOB_TTL]:
+        del _jobs[job_id]
+
+
+def start_job(problem, workers=None, budget=30.0, on_finish=None, data_version=None):
+    """
+    Yeni bir portföy araması başlatır; aynı anda tek arama çalışabilir
+    :param problem: TimetableProblem
+    :param workers: İşçi süreç sayısı (1 - MAX_WORKERS, varsayılan: çekirdek sayısı)
+    :param budget: Saniye cinsinden süre bütçesi
+    :param on_finish: Arama bitince en iyi çözümle çağrılacak fonksiyon
+    :param data_version: Problemin okunduğu veri sürümü
+    :return: PortfolioJob
+    :raises ValueError: Çalışmakta olan bir arama varsa
+    """
+    budget = min(max(budget, 1.0), MAX_BUDGET)
+    workers = min(max(workers or MAX_WORKERS, 1), MAX_WORKERS)
+    with _jobs_lock:
+        _evict_finished()
+        if any(job.state in ('pending', 'running') for job in _jobs.values()):
+            raise ValueError('Çalışmakta olan bir portföy araması var')
+        job = PortfolioJob(problem, workers, budget, on_finish, data_version)
+        _jobs[job.id] = job
+    return job.start()
+
+
+def get_job(job_id):
+    """
+    İş numarasına göre portföy aramasını döndürür
+    """
+    with _jobs_lock:
+        _evict_finished()
+        return _jobs.get(job_id)
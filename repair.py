@@ -0,0 +1,186 @@
+"""
+Mevcut programın değişiklik sonrası artımlı onarımı
+
+Bir derslik silindiğinde, bir dersin öğretim üyesi değiştiğinde veya bir
+dersliğin kapasitesi düşürüldüğünde programın tamamını yeniden oluşturmak
+yerine sadece bu değişiklikle geçersiz hale gelen program öğeleri bulunur ve
+yeniden yerleştirilir. Diğer tüm öğeler sabit kabul edildiğinden
+schedule_items tablosunun geri kalanı değişmez.
+"""
+import time
+from collections import namedtuple
+
+from models import db, Classroom, Course, Schedule, minutes_to_time, schedule_columns
+from occupancy import schedule_index, INSTRUCTOR
+from versioning import bump_version
+from timetable import (
+    DAYS, PERIODS, PERIOD_MINUTES, PRACTICE, THEORY, DEFAULT_GROUP_SIZE,
+    Room, Session, TimetableProblem, is_lab, solve
+)
+
+
+def invalidated_by_classroom_removal(classroom_id):
+    """
+    Silinecek dersliğe yerleştirilmiş program öğelerini döndürür
+    :param classroom_id: Derslik ID'si
+    :return: Placement listesi
+    """
+    index = schedule_index.ensure_built()
+    return [placement for placement in index.placements() if placement.classroom_id == classroom_id]
+
+
+# Henüz kaydedilmemiş ders değişikliği: (ders ID, öğretim üyesi ID, bölüm ID, yarıyıl)
+CourseChange = namedtuple('CourseChange', ['course_id', 'instructor_id', 'department_id', 'semester'])
+
+
+def apply_course_change(placement, change):
+    """
+    Program öğesini, dersine ait kaydedilmemiş değişiklikle birlikte döndürür
+    :param placement: Placement
+    :param change: CourseChange veya None
+    """
+    if change is None or placement.course_id != change.course_id:
+        return placement
+    return placement._replace(
+        instructor_id=int(change.instructor_id) if change.instructor_id else None,
+        department_id=int(change.department_id) if change.department_id else None,
+        semester=int(change.semester) if change.semester is not None else None
+    )
+
+
+def invalidated_by_instructor_change(change):
+    """
+    Öğretim üyesi değişecek dersin, yeni öğretim üyesinin diğer dersleriyle
+    çakışan program öğelerini yeni ders bilgileriyle döndürür
+    (değişiklik kaydedilmeden önce, indeks eski haldeyken çağrılır)
+    :param change: CourseChange
+    :return: Placement listesi
+    """
+    index = schedule_index.ensure_built()
+    invalid = []
+    for placement in index.placements():
+        if placement.course_id != change.course_id:
+            continue
+        placement = apply_course_change(placement, change)
+        if not placement.instructor_id:
+            continue
+        conflicts = index.conflicts(INSTRUCTOR, placement.instructor_id, placement.day,
+                                    placement.start, placement.end)
+        if any(conflict.course_id != change.course_id for conflict in conflicts):
+            invalid.append(placement)
+    return invalid
+
+
+def invalidated_by_capacity_change(classroom_id, old_capacity, new_capacity, group_size=DEFAULT_GROUP_SIZE):
+    """
+    Kapasitesi düşürülen derslikte, beklenen şube mevcudu yeni kapasiteye
+    sığmayan program öğelerini döndürür (tüm derslerin şube mevcudu aynı
+    kabul edildiğinden bu, dersliğin tüm öğeleridir)
+    :param classroom_id: Derslik ID'si
+    :param old_capacity: Önceki kapasite
+    :param new_capacity: Yeni kapasite
+    :param group_size: Beklenen şube mevcudu
+    :return: Placement listesi
+    """
+    if old_capacity is not None and new_capacity >= old_capacity:
+        return []
+    if new_capacity >= group_size:
+        return []
+    return invalidated_by_classroom_removal(classroom_id)
+
+
+class RepairResult:
+    """
+    Onarım sonucu: taşınan ve yeri bulunamayan program öğeleri
+    """
+
+    def __init__(self, moved, unplaced, elapsed):
+        self.moved = moved          # [(eski Placement, yeni Placement)]
+        self.unplaced = unplaced    # [Placement]
+        self.elapsed = elapsed
+
+
+def repair_placements(placements, excluded_classrooms=(), group_size=DEFAULT_GROUP_SIZE, time_limit=2.0,
+                      course_change=None):
+    """
+    Geçersiz program öğelerini, diğer öğelere dokunmadan yeniden yerleştirir
+
+    Her öğe özgün gün ve saatine mümkün olduğunca yakın bir yere taşınır;
+    mümkünse sadece dersliği değiştirilir.
+    :param placements: Yeniden yerleştirilecek Placement listesi
+    :param excluded_classrooms: Kullanılmayacak derslik ID'leri (örn. silinecek derslik)
+    :param group_size: Beklenen şube mevcudu
+    :param time_limit: Arama süresi sınırı (saniye)
+    :param course_change: Sabit öğelere de uygulanacak kaydedilmemiş CourseChange
+    :return: RepairResult
+    """
+    started = time.monotonic()
+    if not placements:
+        return RepairResult([], [], 0.0)
+
+    index = schedule_index.ensure_built()
+    moving = {placement.id for placement in placements}
+    pinned = [apply_course_change(placement, course_change)
+              for placement in index.placements() if placement.id not in moving]
+    classrooms = Classroom.query.all()
+    room_types = {room.id: room.type for room in classrooms}
+    rooms = [Room(room.id, room.code, room.capacity or 0, room.type)
+             for room in classrooms if room.id not in excluded_classrooms]
+
+    sessions, preferences, originals = [], {}, {}
+    day_index = {day: i for i, day in enumerate(DAYS)}
+    for i, placement in enumerate(placements):
+        length = max(1, -(-(placement.end - placement.start) // PERIOD_MINUTES))
+        kind = PRACTICE if is_lab(room_types.get(placement.classroom_id)) else THEORY
+        cohort = (placement.department_id, placement.semester) if placement.department_id else None
+        session = Session(placement.course_id, kind, length, placement.instructor_id, cohort, str(placement.id))
+        sessions.append(session)
+        originals[id(session)] = placement
+        # Özgün saate en yakın ders saatini tercih et
+        nearest = min(range(len(PERIODS)), key=lambda p: abs(PERIODS[p][0] - placement.start))
+        preferences[i] = (day_index.get(placement.day, 0), nearest)
+
+    problem = TimetableProblem(sessions, rooms, pinned, group_size)
+    # Derslik tipi uyumu tercih edilir ama zorunlu tutulmaz; onarımda yer bulmak önceliklidir
+    solution = solve(problem, time_limit=time_limit, strict_room_types=False, preferences=preferences)
+
+    moved = []
+    for assignment in solution.assignments:
+        placement = originals[id(assignment.session)]
+        moved.append((placement, placement._replace(
+            classroom_id=assignment.classroom_id, day=assignment.day,
+            start=assignment.start, end=assignment.end
+        )))
+    unplaced = [originals[id(session)] for session in solution.unplaced]
+    return RepairResult(moved, unplaced, time.monotonic() - started)
+
+
+def stage_repair(result):
+    """
+    Onarım sonucundaki taşımaları oturuma ekler (commit çağıran tarafa bırakılır)
+    :param result: RepairResult
+    :return: Commit sonrası indekse işlenecek yeni Placement listesi
+    """
+    if result.moved:
+        bump_version()
+    db.session.bulk_update_mappings(Schedule, [
+        dict(schedule_columns(new.day, new.start, new.end), id=new.id, classroom_id=new.classroom_id)
+        for _, new in result.moved
+    ])
+    return [new for _, new in result.moved]
+
+
+def describe_repair(result):
+    """
+    Onarım sonucunu kullanıcıya gösterilecek kısa metin olarak döndürür
+    """
+    course_ids = {placement.course_id for placement, _ in result.moved}
+    course_ids.update(placement.course_id for placement in result.unplaced)
+    codes = dict(db.session.query(Course.id, Course.code).filter(Course.id.in_(course_ids)).all())
+    parts = [f'{len(result.moved)} program öğesi {result.elapsed * 1000:.0f} ms içinde yeniden yerleştirildi']
+    if result.unplaced:
+        parts.append('yer bulunamayanlar: ' + ", ".join(
+            f'{codes.get(placement.course_id)} ({placement.day} {minutes_to_time(placement.start)})'
+            for placement in result.unplaced
+        ))
+    return '; '.join(parts)
@@ -0,0 +1,100 @@
+"""
+Ders programı görünümleri için ortak veri yükleme ve gruplama fonksiyonları
+
+Program öğeleri ders, derslik ve öğretim üyesi bilgileriyle birlikte tek bir
+birleştirilmiş sorguda yüklenir ve gün x sınıf seviyesi tablosuna tek geçişte
+yerleştirilir. Böylece şablonlar tembel ilişki yüklemesi yapmaz.
+Bölüm, sınıf seviyesi, yarıyıl, öğretim üyesi, derslik ve gün filtreleri
+sorguya eklenir; sadece gösterilecek satırlar okunur.
+"""
+from collections import namedtuple
+
+from sqlalchemy.orm import contains_eager
+
+from models import Course, Department, Schedule, DAYS, in_active_term
+
+# Sınıf seviyeleri (her seviye iki yarıyıl içerir)
+GRADES = [1, 2, 3, 4]
+
+# Program görünümü filtreleri (None olan alan filtrelenmez); gün 0'dan başlayan gün numarasıdır
+ScheduleFilter = namedtuple('ScheduleFilter', ['department_id', 'grade', 'semester', 'instructor_id',
+                                               'classroom_id', 'day'])
+NO_FILTER = ScheduleFilter(None, None, None, None, None, None)
+
+
+def grade_of(semester):
+    """
+    Yarıyıldan sınıf seviyesini hesaplar (1-2 -> 1, 3-4 -> 2, 5-6 -> 3, 7+ -> 4)
+    :param semester: Yarıyıl
+    :return: Sınıf seviyesi veya yarıyıl bilinmiyorsa None
+    """
+    if semester is None:
+        return None
+    return min(max((semester + 1) // 2, GRADES[0]), GRADES[-1])
+
+
+def apply_filters(query, filters):
+    """
+    Program görünümü filtrelerini Schedule / Course sorgusuna WHERE koşulları olarak ekler
+    :param query: Schedule ve Course tablolarını içeren sorgu
+    :param filters: ScheduleFilter
+    :return: Filtrelenmiş sorgu
+    """
+    if filters.department_id is not None:
+        query = query.filter(Course.department_id == filters.department_id)
+    if filters.grade is not None:
+        # grade_of ile aynı eşleme: ilk seviye 2. yarıyıla kadar, son seviye 7. yarıyıldan itibaren
+        if filters.grade > GRADES[0]:
+            query = query.filter(Course.semester >= 2 * filters.grade - 1)
+        if filters.grade < GRADES[-1]:
+            query = query.filter(Course.semester <= 2 * filters.grade)
+    if filters.semester is not None:
+        query = query.filter(Course.semester == filters.semester)
+    if filters.instructor_id is not None:
+        query = query.filter(Course.instructor_id == filters.instructor_id)
+    if filters.classroom_id is not None:
+        query = query.filter(Schedule.classroom_id == filters.classroom_id)
+    if filters.day is not None:
+        query = query.filter(Schedule.day_index == filters.day)
+    return query
+
+
+def load_schedule_items(department_codes=None, filters=NO_FILTER):
+    """
+    Aktif dönemin program öğelerini ders, bölüm, öğretim üyesi ve derslik bilgileriyle tek sorguda yükler
+    :param department_codes: Sadece bu bölüm kodlarına ait dersler (None ise tümü)
+    :param filters: Sorguya eklenecek ScheduleFilter
+    :return: Gün ve başlangıç saatine göre sıralı Schedule listesi
+    """
+    course = contains_eager(Schedule.course)
+    query = (Schedule.query
+             .join(Schedule.course)
+             .outerjoin(Course.department)
+             .outerjoin(Course.instructor)
+             .outerjoin(Schedule.classroom)
+             .options(course.contains_eager(Course.department),
+                      course.contains_eager(Course.instructor),
+                      contains_eager(Schedule.classroom)))
+    if department_codes is not None:
+        query = query.filter(Department.code.in_(department_codes))
+    query = apply_filters(query.filter(in_active_term()), filters)
+    return query.order_by(Schedule.day_index, Schedule.start_minute, Course.code).all()
+
+
+def build_grid(schedule_items, days=DAYS):
+    """
+    Program öğelerini gün x sınıf seviyesi tablosuna yerleştirir
+    :param schedule_items: Başlangıç saatine göre sıralı Schedule listesi
+    :param days: Tabloda yer alacak günler
+    :return: {gün: {sınıf seviyesi: [Schedule]}} sözlüğü
+    """
+    grid = {day: {grade: [] for grade in GRADES} for day in days}
+    # Gün numarasından tablodaki güne doğrudan erişim
+    cells = [grid.get(day) for day in DAYS]
+    for item in schedule_items:
+        grade = grade_of(item.course.semester)
+        if grade is None or item.day_index is None or not 0 <= item.day_index < len(cells):
+            continue
+        if cells[item.day_index] is not None:
+            cells[item.day_index][grade].append(item)
+    return grid
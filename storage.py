@@ -0,0 +1,159 @@
+"""
+Veritabanı bağlantı ayarları (SQLite pragmaları ve bağlantı havuzu)
+
+Uygulama birden çok sunucu sürecinde aynı SQLite dosyası üzerinde
+çalıştığında varsayılan ayarlar (rollback journal, bekleme süresi olmadan
+kilit hatası, her istekte yeni bağlantı) "database is locked" hatalarına ve
+yazma sırasında okuyucuların beklemesine yol açar. Bu modül her bağlantıda:
+
+- WAL kipini açar: okuyucular yazıcıyı, yazıcı okuyucuları beklemez
+- busy_timeout ayarlar: aynı anda iki yazma olduğunda ikincisi hata vermek
+  yerine kilidin açılmasını bekler
+- synchronous, cache_size, mmap_size ve temp_store pragmalarını uygular
+
+ve dağıtım kipine göre bağlantı havuzunu yapılandırır. Kip STORAGE_MODE
+ortam değişkeni veya app.config['STORAGE_MODE'] ile seçilir:
+
+    development  tek süreç (flask run / app.run)
+    production   birden çok sunucu süreci (örn. gunicorn -w 4)
+    test         testler ve performans ölçümleri (dayanıklılık yerine hız)
+
+Tek tek pragmalar app.config['SQLITE_PRAGMAS'] sözlüğüyle değiştirilebilir.
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from models import db
+
+DEFAULT_MODE = 'development'
+
+# Kip başına SQLite pragmaları (uygulama sırası önemli: önce busy_timeout)
+SQLITE_PRAGMAS = {
+    'development': {
+        'busy_timeout': 5000,        # ms
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',     # WAL kipinde güvenli; her commit'te fsync yapılmaz
+        'cache_size': -16000,        # negatif değer KB cinsinden: 16 MB
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'production': {
+        'busy_timeout': 15000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,        # 64 MB
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'test': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+# Kip başına bağlantı havuzu ayarları (süreç başına)
+POOL_OPTIONS = {
+    'development': {'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 30},
+    # Her sunucu süreci kendi havuzunu tutar; toplam bağlantı = süreç sayısı x havuz
+    'production': {'pool_size': 4, 'max_overflow': 4, 'pool_timeout': 30},
+    'test': {'pool_size': 2, 'max_overflow': 8, 'pool_timeout': 10},
+}
+
+
+def storage_mode(app):
+    """
+    Uygulamanın dağıtım kipini döndürür
+    """
+    mode = app.config.get('STORAGE_MODE') or os.environ.get('STORAGE_MODE') or DEFAULT_MODE
+    if mode not in POOL_OPTIONS:
+        raise ValueError(f'Geçersiz STORAGE_MODE: {mode} (seçenekler: {", ".join(POOL_OPTIONS)})')
+    return mode
+
+
+def is_sqlite_file(uri):
+    """
+    Adresin dosya tabanlı (bellek içi olmayan) bir SQLite veritabanı olup olmadığını döndürür
+    """
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def engine_options(uri, mode):
+    """
+    Veritabanı adresi ve kipe göre create_engine seçeneklerini oluşturur
+    :return: SQLALCHEMY_ENGINE_OPTIONS sözlüğü
+    """
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        if not is_sqlite_file(uri):
+            # Bellek içi veritabanı: Flask-SQLAlchemy tek bağlantılı StaticPool kullanır
+            return {}
+        # SQLAlchemy 1.4 dosya tabanlı SQLite için her istekte yeni bağlantı açar (NullPool);
+        # havuz, bağlantıları ve pragmalarla ısınmış sayfa önbelleğini istekler arasında korur.
+        # Bir bağlantı aynı anda tek iş parçacığında kullanıldığından check_same_thread gereksiz.
+        return dict(POOL_OPTIONS[mode], poolclass=QueuePool,
+                    connect_args={'check_same_thread': False})
+    # Sunucu tabanlı veritabanları: kopan bağlantıları kullanmadan önce yakala
+    return dict(POOL_OPTIONS[mode], pool_pre_ping=True, pool_recycle=1800)
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """
+    Yeni açılan SQLite bağlantısına pragmaları uygular
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def init_storage(app):
+    """
+    Bağlantı ayarlarını yapılandırıp veritabanını uygulamaya bağlar (db.init_app yerine)
+    :param app: SQLALCHEMY_DATABASE_URI ayarlanmış Flask uygulaması
+    :return: Kullanılan kip
+    """
+    mode = storage_mode(app)
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    options = engine_options(uri, mode)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    db.init_app(app)
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == 'sqlite':
+        pragmas = dict(SQLITE_PRAGMAS[mode])
+        pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, pragmas)
+
+    # Süreç çatallandığında (gunicorn --preload, ProcessPoolExecutor) havuzdaki
+    # bağlantılar çocuk sürece taşınmamalı; çocuk kendi bağlantılarını açar
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+    return mode
+
+
+def storage_status():
+    """
+    Aktif bağlantının pragma değerlerini döndürür (uygulama bağlamında çağrılmalı)
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return {'dialect': db.engine.dialect.name}
+    status = {'dialect': 'sqlite', 'pool': db.engine.pool.status()}
+    with db.engine.connect() as connection:
+        for name in SQLITE_PRAGMAS[DEFAULT_MODE]:
+            status[name] = connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+    return status
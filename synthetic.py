@@ -0,0 +1,223 @@
+"""
+Ölçek testleri için sentetik üniversite verisi üreteci
+
+Mevcut fakülteyi (2 bölüm, 22 derslik, 81 ders) örnek alarak verilen ölçek
+katsayısı kadar büyük, gerçekçi bir üniversite üretir: bölümler, her bölümde
+8 yarıyıla dağılmış teori / uygulama dersleri, öğretim üyeleri, farklı
+kapasitelerde normal derslikler ve laboratuvarlar. İstenirse derslik,
+öğretim üyesi ve sınıf grubu çakışması olmayan bir haftalık program da
+açgözlü (greedy) yerleştirme ile oluşturulur.
+
+Büyüklükler tek tek de verilebilir (örn. performans ölçümleri için 50 bölüm,
+5000 ders). Çok şubeli derslerde şubeler uygulamadaki gibi aynı sınıf grubuna
+(bölüm, yarıyıl) aittir; bu yüzden bir grubun şubeleri birbirinden farklı
+saatlere yerleştirilir ve program denetimde (audit) çakışma üretmez.
+
+Üretilen kayıtlar modellerden bağımsız sözlüklerdir; ilişkiler kodlar
+üzerinden kurulur (department_code, instructor_username, course_code, classroom_code).
+"""
+import random
+
+from models import DAYS, minutes_to_time
+from timetable import PERIODS, PERIOD_MINUTES, split_hours
+
+# Ölçek 1'deki (mevcut fakülte) büyüklükler
+BASE_DEPARTMENTS = 2
+BASE_CLASSROOMS = 22
+COURSES_PER_DEPARTMENT = 40
+INSTRUCTORS_PER_DEPARTMENT = 14
+
+# Desteklenen ölçek aralığı
+MIN_SCALE = 1
+MAX_SCALE = 100
+
+DEPARTMENT_NAMES = [
+    'Bilgisayar', 'Yazılım', 'Elektrik-Elektronik', 'Makine', 'İnşaat', 'Endüstri',
+    'Kimya', 'Gıda', 'Çevre', 'Harita', 'Metalurji', 'Biyomedikal', 'Enerji Sistemleri',
+    'Mekatronik', 'Orman', 'Jeoloji', 'Maden', 'Tekstil', 'Malzeme', 'Otomotiv',
+]
+
+COURSE_TOPICS = [
+    'Matematik', 'Fizik', 'Kimya', 'Programlama', 'Veri Yapıları', 'Algoritmalar',
+    'Olasılık ve İstatistik', 'Lineer Cebir', 'Diferansiyel Denklemler', 'Sayısal Yöntemler',
+    'Mühendislik Ekonomisi', 'Malzeme Bilimi', 'Termodinamik', 'Devre Analizi',
+    'Sistem Analizi', 'Veritabanı Sistemleri', 'İşletim Sistemleri', 'Bilgisayar Ağları',
+    'Proje Yönetimi', 'Mesleki İngilizce', 'Teknik Resim', 'Mukavemet', 'Akışkanlar Mekaniği',
+    'Kontrol Sistemleri', 'Yapay Zeka', 'Görüntü İşleme', 'Sinyaller ve Sistemler', 'Laboratuvar',
+]
+
+FIRST_NAMES = [
+    'Ahmet', 'Mehmet', 'Ayşe', 'Fatma', 'Mustafa', 'Zeynep', 'Ali', 'Elif', 'Hasan', 'Emine',
+    'Hüseyin', 'Hatice', 'İbrahim', 'Merve', 'Murat', 'Selin', 'Emre', 'Derya', 'Burak', 'Gül',
+]
+
+LAST_NAMES = [
+    'Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Yıldırım', 'Öztürk', 'Aydın', 'Özdemir',
+    'Arslan', 'Doğan', 'Kılıç', 'Aslan', 'Çetin', 'Kara', 'Koç', 'Kurt', 'Özkan', 'Şimşek',
+]
+
+ROMAN = ['I', 'II', 'III', 'IV']
+
+
+class SyntheticUniversity:
+    """
+    Üretilen sentetik veri kümesi (her alan sözlük listesidir)
+    """
+
+    def __init__(self, departments, classrooms, instructors, courses, schedule):
+        self.departments = departments
+        self.classrooms = classrooms
+        self.instructors = instructors
+        self.courses = courses
+        self.schedule = schedule
+
+    def summary(self):
+        return {
+            'departments': len(self.departments),
+            'classrooms': len(self.classrooms),
+            'instructors': len(self.instructors),
+            'courses': len(self.courses),
+            'schedule_items': len(self.schedule),
+        }
+
+
+def _generate_classrooms(rng, count):
+    # Mevcut fakültedeki oran: yaklaşık her 5 derslikten biri laboratuvar
+    classrooms = []
+    for number in range(count):
+        block, room = divmod(number, 20)
+        is_lab = number % 5 == 4
+        capacity = rng.choice([20, 30, 40]) if is_lab else rng.choice([40, 56, 60, 66, 87, 88, 120, 141])
+        classrooms.append({
+            'code': f'{"L" if is_lab else "B"}{block + 1:03d}-{room + 1:02d}',
+            'capacity': capacity,
+            'type': 'LAB' if is_lab else 'NORMAL',
+        })
+    return classrooms
+
+
+def _generate_department(rng, number, instructors, courses, course_count, instructor_count):
+    code = f'D{number + 1:03d}'
+    base_name = DEPARTMENT_NAMES[number % len(DEPARTMENT_NAMES)]
+    suffix = f' {number // len(DEPARTMENT_NAMES) + 1}' if number >= len(DEPARTMENT_NAMES) else ''
+    department = {'code': code, 'name': f'{base_name} Mühendisliği{suffix}'}
+
+    usernames = []
+    for _ in range(instructor_count):
+        username = f'ogr{len(instructors) + 1:05d}'
+        instructors.append({
+            'username': username,
+            'password': username,
+            'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'role': 'instructor',
+            'department_code': code,
+        })
+        usernames.append(username)
+
+    # Dersleri 8 yarıyıla eşit dağıt; uygulama ağırlıklı (lab) derslerin oranı mevcut fakülteye yakın
+    for index in range(course_count):
+        semester = index % 8 + 1
+        topic = rng.choice(COURSE_TOPICS)
+        if rng.random() < 0.15:
+            theory, practice = 0, 3
+        else:
+            theory, practice = rng.choice([(2, 0), (3, 0), (3, 0), (3, 1), (2, 1), (3, 2)])
+        courses.append({
+            'code': f'{code}{semester}{index // 8 + 1:03d}',
+            'name': f'{topic} {ROMAN[index // 8 % len(ROMAN)]}',
+            'theory': theory,
+            'practice': practice,
+            'credits': theory + practice + rng.choice([0, 1, 2]),
+            'semester': semester,
+            'is_elective': semester >= 7 and rng.random() < 0.5,
+            'department_code': code,
+            'instructor_username': rng.choice(usernames),
+        })
+    return department
+
+
+def _generate_schedule(rng, courses, classrooms, sections=1):
+    """
+    Dersleri çakışmasız (derslik, öğretim üyesi, sınıf grubu) açgözlü olarak yerleştirir;
+    yer bulunamayan oturumlar atlanır
+    :param sections: Her dersin şube sayısı (şubeler aynı sınıf grubunu paylaşır, saatleri çakışmaz)
+    """
+    normal_rooms = [room['code'] for room in classrooms if room['type'] != 'LAB']
+    lab_rooms = [room['code'] for room in classrooms if room['type'] == 'LAB'] or normal_rooms
+    busy = {}  # (sahip, gün) -> dolu ders saatleri maskesi
+
+    def free(owner, day, mask):
+        return not busy.get((owner, day), 0) & mask
+
+    def occupy(owner, day, mask):
+        busy[(owner, day)] = busy.get((owner, day), 0) | mask
+
+    # Gün içinde aynı bloğa (öğleden önce / sonra) sığan başlangıç saatleri
+    starts_by_length = {}
+    for length in range(1, 4):
+        starts_by_length[length] = [
+            first for first in range(len(PERIODS) - length + 1)
+            if PERIODS[first][2] == PERIODS[first + length - 1][2]
+        ]
+
+    schedule = []
+    for course in courses * sections:
+        # Sınıf grubu uygulamadaki gibi (bölüm, yarıyıl); şube numarası gruba dahil değildir
+        cohort = ('cohort', course['department_code'], course['semester'])
+        instructor = ('instructor', course['instructor_username'])
+        sessions = [(length, normal_rooms) for length in split_hours(course['theory'])]
+        sessions += [(length, lab_rooms) for length in split_hours(course['practice'])]
+        for length, rooms in sessions:
+            slots = [(day, first) for day in DAYS for first in starts_by_length[min(length, 3)]]
+            rng.shuffle(slots)
+            for day, first in slots:
+                mask = ((1 << length) - 1) << first
+                if not (free(cohort, day, mask) and free(instructor, day, mask)):
+                    continue
+                # Tüm derslikleri denemek yerine rastgele bir örneklemde boş derslik ara
+                candidates = rng.sample(rooms, min(len(rooms), 12))
+                room = next((code for code in candidates if free(('room', code), day, mask)), None)
+                if room is None:
+                    continue
+                for owner in (cohort, instructor, ('room', room)):
+                    occupy(owner, day, mask)
+                start = PERIODS[first][0]
+                schedule.append({
+                    'course_code': course['code'],
+                    'department_code': course['department_code'],
+                    'classroom_code': room,
+                    'day': day,
+                    'start_time': minutes_to_time(start),
+                    'end_time': minutes_to_time(start + length * PERIOD_MINUTES),
+                })
+                break
+    return schedule
+
+
+def generate_university(scale=10, seed=0, with_schedule=True, departments=None, courses_per_department=None,
+                        instructors_per_department=None, classrooms=None, sections=1):
+    """
+    Mevcut fakültenin scale katı büyüklüğünde sentetik bir üniversite üretir
+    :param scale: Ölçek katsayısı (1-100; 10 -> 20 bölüm, 220 derslik, 800 ders)
+    :param seed: Rastgele sayı tohumu (aynı tohum aynı veriyi üretir)
+    :param with_schedule: Haftalık program da üretilsin mi
+    :param departments: Bölüm sayısı (varsayılan: ölçeğe göre)
+    :param courses_per_department: Bölüm başına ders sayısı
+    :param instructors_per_department: Bölüm başına öğretim üyesi sayısı
+    :param classrooms: Derslik sayısı (varsayılan: ölçeğe göre)
+    :param sections: Her dersin şube sayısı
+    :return: SyntheticUniversity
+    """
+    if not MIN_SCALE <= scale <= MAX_SCALE:
+        raise ValueError(f'Ölçek {MIN_SCALE} ile {MAX_SCALE} arasında olmalı')
+    rng = random.Random(seed)
+    instructors, courses = [], []
+    department_rows = [
+        _generate_department(rng, number, instructors, courses,
+                             courses_per_department or COURSES_PER_DEPARTMENT,
+                             instructors_per_department or INSTRUCTORS_PER_DEPARTMENT)
+        for number in range(departments or BASE_DEPARTMENTS * scale)
+    ]
+    classroom_rows = _generate_classrooms(rng, classrooms or BASE_CLASSROOMS * scale)
+    schedule = _generate_schedule(rng, courses, classroom_rows, sections) if with_schedule else []
+    return SyntheticUniversity(department_rows, classroom_rows, instructors, courses, schedule)
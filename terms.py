@@ -0,0 +1,228 @@
+"""
+Akademik dönemler ve dönem arşivi
+
+Program öğeleri (schedule_items) bir döneme bağlıdır. Tüm program sorguları ve
+eklemeleri aktif dönemle sınırlıdır (models.in_active_term / Schedule.term_id
+varsayılanı). Dersler, derslikler ve kullanıcılar dönemden bağımsız kataloglardır.
+
+Biten bir dönem arşivlendiğinde program öğeleri ders, bölüm, öğretim üyesi ve
+derslik bilgileriyle birlikte ayrı bir SQLite dosyasına (ARCHIVE_DATABASE)
+kopyalanır ve ana tablodan silinir. Böylece sık kullanılan tablolar tek bir
+dönem büyüklüğünde kalır; arşiv katalog sonradan değişse de olduğu gibi okunur.
+Arşiv dosyası okunurken salt okunur açılır.
+
+    flask --app app create-term 2025-BAHAR "2025-2026 Bahar Dönemi" --activate
+    flask --app app archive-term 2025-GUZ
+    GET /api/v1/terms/<id>/schedule
+"""
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from flask import current_app
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, case, create_engine, func
+from sqlalchemy.pool import NullPool
+
+from models import db, Classroom, Course, Department, Schedule, Term, User, in_active_term
+from versioning import bump_version
+
+# Arşivlenen program öğelerinin sütunları (sıcak tablodan okunan sırayla)
+ARCHIVE_COLUMNS = ['schedule_id', 'day', 'day_index', 'start_time', 'end_time', 'start_minute', 'end_minute',
+                   'course_code', 'course_name', 'department_code', 'semester', 'instructor_name',
+                   'classroom_code']
+
+archive_metadata = MetaData()
+
+archived_terms = Table(
+    'archived_terms', archive_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('code', String(20), nullable=False),
+    Column('name', String(100), nullable=False),
+    Column('archived_at', DateTime, nullable=False),
+    Column('items', Integer, nullable=False),
+)
+
+archived_schedule_items = Table(
+    'archived_schedule_items', archive_metadata,
+    Column('term_id', Integer, primary_key=True),
+    Column('schedule_id', Integer, primary_key=True),
+    Column('day', String(20), nullable=False),
+    Column('day_index', Integer),
+    Column('start_time', String(5), nullable=False),
+    Column('end_time', String(5), nullable=False),
+    Column('start_minute', Integer),
+    Column('end_minute', Integer),
+    Column('course_code', String(10)),
+    Column('course_name', String(100)),
+    Column('department_code', String(10)),
+    Column('semester', Integer),
+    Column('instructor_name', String(120)),
+    Column('classroom_code', String(20)),
+)
+
+# Arşiv dosyası yolu -> salt okunur bağlantı motoru
+_readers = {}
+
+
+def archive_path():
+    """
+    Arşiv veritabanı dosyasının yolu
+    """
+    return current_app.config['ARCHIVE_DATABASE']
+
+
+def _archive_reader(path):
+    # Dosya salt okunur açılır; arşiv sorguları arşiv dosyasına yazamaz
+    engine = _readers.get(path)
+    if engine is None:
+        uri = Path(path).resolve().as_uri() + '?mode=ro'
+        engine = _readers[path] = create_engine(
+            'sqlite://', creator=lambda: sqlite3.connect(uri, uri=True, check_same_thread=False)
+        )
+    return engine
+
+
+def get_term(code):
+    """
+    Kodu verilen dönemi döndürür
+    :raises ValueError: Dönem yoksa
+    """
+    term = Term.query.filter_by(code=code).first()
+    if term is None:
+        raise ValueError(f'Dönem bulunamadı: {code}')
+    return term
+
+
+def schedule_usage(column, value):
+    """
+    Bir derse veya dersliğe bağlı program öğelerini döneme göre sayar
+    Arşivlenmiş dönemlerin öğeleri ana tabloda olmadığından sayılmaz.
+    :param column: Schedule.course_id veya Schedule.classroom_id
+    :param value: Ders veya derslik ID'si
+    :return: (aktif dönemdeki öğe sayısı, arşivlenmemiş diğer dönemlerdeki öğe sayısı)
+    """
+    total, active = db.session.query(
+        func.count(Schedule.id), func.coalesce(func.sum(case((in_active_term(), 1), else_=0)), 0)
+    ).filter(column == value).one()
+    return active, total - active
+
+
+def create_term(code, name, activate=False):
+    """
+    Yeni bir dönem oluşturur
+    :param activate: Yeni dönem aktif dönem yapılsın mı
+    :return: Term
+    """
+    if Term.query.filter_by(code=code).first():
+        raise ValueError(f'Bu dönem kodu zaten kullanımda: {code}')
+    term = Term(code=code, name=name, is_active=False)
+    db.session.add(term)
+    db.session.commit()
+    if activate:
+        activate_term(code)
+    return term
+
+
+def activate_term(code):
+    """
+    Dönemi aktif dönem yapar; program sayfaları, çakışma kontrolleri ve yeni program öğeleri bu döneme geçer
+    Eski aktif dönem aynı işlemde pasif yapılır, sistem hiçbir an aktif dönemsiz kalmaz.
+    :return: Term
+    """
+    term = get_term(code)
+    if term.archived_at:
+        raise ValueError('Arşivlenmiş bir dönem aktif yapılamaz')
+    try:
+        # Tek aktif dönem kısıtı nedeniyle önce diğer dönem pasif yapılır
+        Term.query.filter(Term.is_active == db.true(), Term.id != term.id).update(
+            {'is_active': False}, synchronize_session=False)
+        term.is_active = True
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return term
+
+
+def _snapshot_query():
+    # Program öğesini ders, bölüm, öğretim üyesi ve derslik bilgileriyle tek satır olarak okur
+    return (db.session.query(
+        Schedule.id, Schedule.day, Schedule.day_index, Schedule.start_time, Schedule.end_time,
+        Schedule.start_minute, Schedule.end_minute, Course.code, Course.name, Department.code,
+        Course.semester, User.name, Classroom.code)
+        .outerjoin(Course, Schedule.course_id == Course.id)
+        .outerjoin(Department, Course.department_id == Department.id)
+        .outerjoin(User, Course.instructor_id == User.id)
+        .outerjoin(Classroom, Schedule.classroom_id == Classroom.id))
+
+
+def archive_term(code):
+    """
+    Biten bir dönemin programını arşiv dosyasına taşır
+    Önce arşive yazılır, sonra ana tablodan silinir; ikinci adım başarısız olursa
+    komut tekrar çalıştırılabilir (arşivdeki kayıtlar yenisiyle değiştirilir).
+    :return: Arşivlenen program öğesi sayısı
+    """
+    term = get_term(code)
+    if term.is_active:
+        raise ValueError('Aktif dönem arşivlenemez; önce başka bir dönemi aktif yapın')
+    if not Term.query.filter(Term.is_active == db.true()).count():
+        raise ValueError('Aktif dönem yok; arşivlemeden önce bir dönemi aktif yapın')
+    if term.archived_at:
+        raise ValueError('Dönem zaten arşivlenmiş')
+
+    rows = [dict(zip(ARCHIVE_COLUMNS, row), term_id=term.id)
+            for row in _snapshot_query().filter(Schedule.term_id == term.id)]
+    archived_at = datetime.now()
+
+    engine = create_engine(f'sqlite:///{archive_path()}', poolclass=NullPool)
+    try:
+        archive_metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(archived_schedule_items.delete().where(archived_schedule_items.c.term_id == term.id))
+            connection.execute(archived_terms.delete().where(archived_terms.c.id == term.id))
+            connection.execute(archived_terms.insert(), {'id': term.id, 'code': term.code, 'name': term.name,
+                                                         'archived_at': archived_at, 'items': len(rows)})
+            if rows:
+                connection.execute(archived_schedule_items.insert(), rows)
+    finally:
+        engine.dispose()
+
+    try:
+        # Toplu silme oturum olaylarını tetiklemez, veri sürümü elle artırılır
+        bump_version()
+        Schedule.query.filter(Schedule.term_id == term.id).delete(synchronize_session=False)
+        term.archived_at = archived_at
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def term_schedule(term, cursor=None, limit=100):
+    """
+    Dönemin program öğelerini (arşivlenmişse arşiv dosyasından) schedule_id sırasıyla getirir
+    :param term: Term
+    :param cursor: Bu schedule_id'den sonraki öğeler
+    :param limit: En fazla öğe sayısı
+    :return: (ARCHIVE_COLUMNS anahtarlı sözlükler, sonraki sayfa var mı)
+    """
+    if term.archived_at:
+        path = archive_path()
+        if not os.path.exists(path):
+            return [], False
+        table = archived_schedule_items
+        query = table.select().where(table.c.term_id == term.id)
+        if cursor is not None:
+            query = query.where(table.c.schedule_id > cursor)
+        query = query.order_by(table.c.schedule_id).limit(limit + 1)
+        with _archive_reader(path).connect() as connection:
+            rows = [{name: row._mapping[name] for name in ARCHIVE_COLUMNS} for row in connection.execute(query)]
+    else:
+        query = _snapshot_query().filter(Schedule.term_id == term.id)
+        if cursor is not None:
+            query = query.filter(Schedule.id > cursor)
+        rows = [dict(zip(ARCHIVE_COLUMNS, row)) for row in query.order_by(Schedule.id).limit(limit + 1)]
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,68 @@
+"""
+Testler için geçici SQLite veritabanı
+
+Uygulama veritabanı adresini içe aktarılırken okuduğundan ortam değişkenleri
+app modülü yüklenmeden önce ayarlanır. Şema bir kez migrasyonlarla oluşturulur;
+her test tabloları boşaltıp küçük bir örnek veriyle başlar. Veri sürümleri
+sıfırlanmaz, artırılır; böylece sürüme bağlı önbellekler önceki testin
+verisini göstermez.
+"""
+import os
+import tempfile
+
+import pytest
+
+_tmpdir = tempfile.mkdtemp(prefix='ders_programi_test_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmpdir, 'test.db')
+os.environ['ARCHIVE_DATABASE'] = os.path.join(_tmpdir, 'arsiv.db')
+os.environ['STORAGE_MODE'] = 'test'
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app
+    from migrations import upgrade
+    from models import db
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        upgrade(db.engine, echo=None)
+    return app
+
+
+@pytest.fixture
+def database(app):
+    """
+    Boş tablolar, aktif bir dönem, iki bölüm, iki öğretim üyesi, dört ders ve üç derslik
+    """
+    from models import db, Classroom, Course, Department, Term, User
+    from versioning import bump_user_version, bump_version
+
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            if table.name != 'app_state':
+                db.session.execute(table.delete())
+        bump_version()
+        bump_user_version()
+
+        db.session.add(Term(code='2025-GUZ', name='2025-2026 Güz Dönemi', is_active=True))
+        blm = Department(code='BLM', name='Bilgisayar Mühendisliği')
+        yzm = Department(code='YZM', name='Yazılım Mühendisliği')
+        first = User(username='ayilmaz', password='x', name='Ali Yılmaz', role='instructor', department=blm)
+        second = User(username='zkaya', password='x', name='Zeynep Kaya', role='instructor', department=yzm)
+        db.session.add_all([
+            User(username='admin', password='admin123', name='Sistem Yöneticisi', role='admin'),
+            Course(code='BLM101', name='Programlama I', theory=3, practice=0, semester=1,
+                   department=blm, instructor=first),
+            Course(code='BLM103', name='Matematik I', theory=2, practice=1, semester=1,
+                   department=blm, instructor=first),
+            Course(code='YZM101', name='Yazılım Mühendisliğine Giriş', theory=3, practice=0, semester=1,
+                   department=yzm, instructor=second),
+            Course(code='MAT110', name='Lineer Cebir', theory=3, practice=0, semester=1, department=yzm),
+            Classroom(code='D101', capacity=60, type='NORMAL'),
+            Classroom(code='D102', capacity=40, type='NORMAL'),
+            Classroom(code='LAB1', capacity=30, type='LAB'),
+        ])
+        db.session.commit()
+        yield db
+        db.session.remove()
@@ -0,0 +1,78 @@
+"""
+Toplu program yerleştirme testleri: hep ya da hiç kaydı ve geri alma
+"""
+from sqlalchemy.orm import Session
+
+from batch_placement import place_batch
+from models import db, Classroom, Course, Schedule
+from occupancy import OccupancyIndex
+from versioning import bump_version, current_version
+
+
+def ids():
+    courses = {course.code: course.id for course in Course.query}
+    classrooms = {classroom.code: classroom.id for classroom in Classroom.query}
+    return courses, classrooms
+
+
+def item(course_id, classroom_id, day='Pazartesi', start='09:00', end='10:50'):
+    return {'course_id': course_id, 'classroom_id': classroom_id, 'day': day, 'start_time': start, 'end_time': end}
+
+
+def test_batch_is_saved_in_one_transaction(database):
+    courses, classrooms = ids()
+    index = OccupancyIndex()
+    version = current_version()
+
+    created, report = place_batch([
+        item(courses['BLM101'], classrooms['D101']),
+        item(courses['YZM101'], classrooms['D102']),
+        item(courses['BLM103'], classrooms['LAB1'], day='Salı'),
+    ], index=index)
+
+    assert report == []
+    assert sorted(created) == sorted(row.id for row in Schedule.query)
+    assert current_version() == version + 1
+    assert index.version == current_version()
+
+
+def test_conflicting_batch_saves_nothing(database):
+    courses, classrooms = ids()
+
+    created, report = place_batch([
+        item(courses['BLM101'], classrooms['D101']),
+        item(courses['YZM101'], classrooms['D101'], start='10:00', end='11:50'),
+        item(courses['MAT110'], 999),
+    ], index=OccupancyIndex())
+
+    assert created == []
+    assert [entry['index'] for entry in report] == [1, 2]
+    assert report[0]['conflicts'][0]['batch_index'] == 0
+    assert report[1]['errors']
+    assert Schedule.query.count() == 0
+
+
+def test_write_after_check_rolls_back_the_batch(database, monkeypatch):
+    courses, classrooms = ids()
+    index = OccupancyIndex()
+    ensure_built = index.ensure_built
+
+    def concurrent_write():
+        # Kontrol ile kayıt arasında başka bir oturum aynı dersliği doldurur
+        ensure_built()
+        other = Session(db.engine)
+        other.add(Schedule(course_id=courses['YZM101'], classroom_id=classrooms['D101'],
+                           day='Pazartesi', start_time='09:00', end_time='10:50'))
+        bump_version(other)
+        other.commit()
+        other.close()
+
+    monkeypatch.setattr(index, 'ensure_built', concurrent_write)
+    version = current_version()
+    created, report = place_batch([item(courses['BLM101'], classrooms['D101'])], index=index)
+
+    assert created == []
+    assert report[0]['conflicts'][0]['course_code'] == 'YZM101'
+    assert [row.course_id for row in Schedule.query] == [courses['YZM101']]
+    # Sürümü sadece diğer oturumun yazması artırır; geri alınan işlemin artırımı kaydedilmez
+    assert current_version() == version + 1
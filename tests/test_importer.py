@@ -0,0 +1,74 @@
+"""
+Toplu veri aktarımı (CSV / Excel) doğrulama ve hata raporu testleri
+"""
+import io
+
+import pytest
+
+from importer import CLASSROOMS, COURSES, SCHEDULE, RowError, import_table, read_table
+from models import Classroom, Course, Schedule
+
+
+def read_csv(text):
+    return read_table(io.BytesIO(text.encode('utf-8')), 'tablo.csv')
+
+
+def test_valid_courses_are_inserted(database):
+    frame = read_csv('Kod;Ad;Bölüm;Yarıyıl;Teori;Uygulama\n'
+                     'BLM201;Veri Yapıları;BLM;3;3;0\n'
+                     'YZM201;Nesneye Dayalı Programlama;YZM;3;2;2\n')
+
+    report = import_table(COURSES, frame)
+
+    assert report.ok
+    assert report.inserted == 2
+    course = Course.query.filter_by(code='YZM201').one()
+    assert (course.theory, course.practice, course.semester) == (2, 2, 3)
+
+
+def test_course_errors_are_reported_by_row(database):
+    frame = read_csv('Kod;Ad;Bölüm\n'
+                     'BLM201;Veri Yapıları;XYZ\n'
+                     'BLM202;Algoritmalar;BLM\n'
+                     'BLM202;Algoritmalar;BLM\n'
+                     'BLM101;Programlama I;BLM\n'
+                     ';Adsız;BLM\n')
+
+    report = import_table(COURSES, frame)
+
+    assert not report.ok
+    assert report.inserted == 0
+    assert RowError(2, 'department', 'Bilinmeyen bölüm') in report.errors
+    assert RowError(3, 'code', 'Dosyada tekrar eden ders kodu') in report.errors
+    assert RowError(4, 'code', 'Dosyada tekrar eden ders kodu') in report.errors
+    assert RowError(5, 'code', 'Bu ders kodu bölümde zaten kayıtlı') in report.errors
+    assert {error.row for error in report.errors} >= {2, 3, 4, 5, 6}
+    # Hatalı dosyadan hiçbir satır eklenmez
+    assert Course.query.count() == 4
+
+
+def test_missing_required_column_is_reported_on_header_row(database):
+    report = import_table(CLASSROOMS, read_csv('Kod;Tip\nD201;NORMAL\n'))
+
+    assert report.errors == [RowError(1, 'capacity', 'Zorunlu sütun eksik')]
+    assert Classroom.query.count() == 3
+
+
+def test_schedule_rows_are_validated_against_existing_data(database):
+    frame = read_csv('Ders;Bölüm;Derslik;Gün;Başlangıç;Bitiş\n'
+                     'BLM101;BLM;D101;Pazartesi;09:00;10:50\n'
+                     'BLM101;BLM;Z999;Salı;09:00;10:50\n'
+                     'BLM101;BLM;D101;Pazar;09:00;10:50\n')
+
+    report = import_table(SCHEDULE, frame)
+
+    messages = {(error.row, error.column): error.message for error in report.errors}
+    assert messages[(3, 'classroom')] == 'Bilinmeyen derslik'
+    assert messages[(4, 'day')] == 'Geçersiz gün'
+    assert 2 not in {error.row for error in report.errors}
+    assert Schedule.query.count() == 0
+
+
+def test_unknown_kind_is_rejected(database):
+    with pytest.raises(ValueError):
+        import_table('students', read_csv('Kod\nX\n'))
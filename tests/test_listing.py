@@ -0,0 +1,53 @@
+"""
+Anahtar tabanlı (keyset) sayfalama imleci testleri
+"""
+import base64
+import json
+
+import pytest
+
+from listing import decode_cursor, encode_cursor
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('value, row_id', [('BLM101', 3), ('', 1), (7, 12), (2.5, 4), ('İşletim Sistemleri', 9)])
+def test_cursor_round_trip(value, row_id):
+    assert decode_cursor(encode_cursor(value, row_id)) == (value, row_id)
+
+
+@pytest.mark.parametrize('payload', [
+    '[{"a": 1}, 5]',
+    '[[1], 5]',
+    '[null, 5]',
+    '[true, 5]',
+    '["a", "b"]',
+    '["a", {"x": 1}]',
+    '["a", Infinity]',
+    '["a", 1e30]',
+    '[100000000000000000000, 5]',
+    '["a", 1, 2]',
+    '{"a": 1, "b": 2}',
+    '"ab"',
+    'not json',
+])
+def test_invalid_cursor_is_rejected(payload):
+    assert decode_cursor(raw_cursor(payload)) is None
+
+
+@pytest.mark.parametrize('cursor', [None, '', '!!!', 'e30'])
+def test_malformed_cursor_is_rejected(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def test_rejected_cursor_falls_back_to_first_page(app, database):
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+
+    first = client.get('/users')
+    tampered = client.get('/users?after=' + raw_cursor(json.dumps([{'a': 1}, 5])))
+
+    assert tampered.status_code == 200
+    assert tampered.data == first.data
@@ -0,0 +1,97 @@
+"""
+İlk sürümün şemasıyla oluşturulmuş bir veritabanının migrasyonlarla yükseltilmesi
+"""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from migrations import MIGRATIONS, pending_migrations, upgrade
+from models import search_key
+
+# İlk sürümde db.create_all ile oluşturulan şema (migrasyonlardan önce)
+BASELINE_SCHEMA = [
+    'CREATE TABLE departments (id INTEGER PRIMARY KEY, code VARCHAR(10) NOT NULL UNIQUE, name VARCHAR(100) NOT NULL)',
+    'CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL UNIQUE, '
+    'password VARCHAR(120) NOT NULL, name VARCHAR(120), role VARCHAR(20) NOT NULL, '
+    'department_id INTEGER REFERENCES departments(id))',
+    'CREATE TABLE courses (id INTEGER PRIMARY KEY, code VARCHAR(10) NOT NULL, name VARCHAR(100) NOT NULL, '
+    'theory INTEGER, practice INTEGER, credits INTEGER, semester INTEGER, is_elective BOOLEAN, '
+    'has_fixed_time BOOLEAN, department_id INTEGER REFERENCES departments(id), '
+    'instructor_id INTEGER REFERENCES users(id))',
+    'CREATE TABLE classrooms (id INTEGER PRIMARY KEY, code VARCHAR(20) NOT NULL UNIQUE, '
+    'capacity INTEGER NOT NULL, type VARCHAR(10))',
+    'CREATE TABLE schedule_items (id INTEGER PRIMARY KEY, course_id INTEGER REFERENCES courses(id), '
+    'classroom_id INTEGER REFERENCES classrooms(id), day VARCHAR(20) NOT NULL, '
+    'start_time VARCHAR(5) NOT NULL, end_time VARCHAR(5) NOT NULL)',
+]
+
+BASELINE_ROWS = [
+    "INSERT INTO departments (id, code, name) VALUES (1, 'BLM', 'Bilgisayar Mühendisliği')",
+    "INSERT INTO users (id, username, password, name, role, department_id) "
+    "VALUES (1, 'iozturk', 'x', 'İsmail Öztürk', 'instructor', 1)",
+    "INSERT INTO courses (id, code, name, theory, practice, credits, semester, is_elective, has_fixed_time, "
+    "department_id, instructor_id) VALUES (1, 'BLM101', 'Işık ve Görüntü', 3, 0, 4, 1, 0, 0, 1, 1)",
+    "INSERT INTO classrooms (id, code, capacity, type) VALUES (1, 'D101', 60, 'SINIF')",
+    "INSERT INTO schedule_items (id, course_id, classroom_id, day, start_time, end_time) "
+    "VALUES (1, 1, 1, 'Çarşamba', '13:00', '14:50')",
+]
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_engine('sqlite:///' + str(tmp_path / 'eski.db'))
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA + BASELINE_ROWS:
+            connection.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_from_baseline_schema(baseline_engine):
+    applied = upgrade(baseline_engine, echo=None)
+
+    assert [version for version, _ in applied] == [version for version, _, _ in MIGRATIONS]
+    assert pending_migrations(baseline_engine) == []
+
+    with baseline_engine.connect() as connection:
+        item = connection.execute(text(
+            'SELECT day_index, start_minute, end_minute, term_id FROM schedule_items WHERE id = 1'
+        )).mappings().one()
+        term = connection.execute(text('SELECT id, code FROM terms WHERE is_active = 1')).mappings().one()
+        course = connection.execute(text('SELECT code_key, name_key FROM courses WHERE id = 1')).mappings().one()
+        user = connection.execute(text('SELECT username_key, name_key FROM users WHERE id = 1')).mappings().one()
+        admin = connection.execute(text("SELECT role FROM users WHERE username = 'admin'")).scalar()
+
+    # Mevcut program öğesi tamsayı saatlere çevrilir ve varsayılan döneme bağlanır
+    assert (item['day_index'], item['start_minute'], item['end_minute']) == (2, 13 * 60, 14 * 60 + 50)
+    assert term['code'] == 'VARSAYILAN'
+    assert item['term_id'] == term['id']
+    # Eski kayıtların arama anahtarları doldurulur
+    assert course['name_key'] == search_key('Işık ve Görüntü')
+    assert (course['code_key'], user['username_key']) == (search_key('BLM101'), 'iozturk')
+    assert user['name_key'] == search_key('İsmail Öztürk')
+    assert admin == 'admin'
+
+
+def test_upgrade_adds_indexes_and_term_guard(baseline_engine):
+    upgrade(baseline_engine, echo=None)
+
+    indexes = {index['name'] for index in inspect(baseline_engine).get_indexes('schedule_items')}
+    assert {'ix_schedule_items_day_classroom_start_minute', 'ix_schedule_items_term_id'} <= indexes
+    assert 'ix_schedule_items_day_classroom_start' not in indexes
+
+    # Dönemsiz program öğesi eklenemez
+    with pytest.raises(Exception, match='term_id'):
+        with baseline_engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO schedule_items (course_id, classroom_id, day, start_time, end_time) "
+                "VALUES (1, 1, 'Cuma', '09:00', '09:50')"
+            ))
+
+
+def test_upgrade_is_idempotent(baseline_engine):
+    upgrade(baseline_engine, echo=None)
+
+    assert upgrade(baseline_engine, echo=None) == []
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM users WHERE username = 'admin'")).scalar() == 1
+        assert connection.execute(text('SELECT COUNT(*) FROM terms')).scalar() == 1
@@ -0,0 +1,81 @@
+"""
+Program oluşturma motoru (timetable) testleri
+"""
+import sys
+
+from synthetic import generate_university
+from timetable import PRACTICE, THEORY, Room, Session, TimetableProblem, period_mask, solve, split_hours
+
+
+def synthetic_problem(scale, seed=0):
+    """
+    Sentetik üniversiteden veritabanı kullanmadan bir TimetableProblem üretir (load_problem ile aynı oturumlar)
+    """
+    university = generate_university(scale, seed, with_schedule=False)
+    rooms = [Room(number, room['code'], room['capacity'], room['type'])
+             for number, room in enumerate(university.classrooms, 1)]
+    instructors = {user['username']: number for number, user in enumerate(university.instructors, 1)}
+    sessions = []
+    for course_id, course in enumerate(university.courses, 1):
+        cohort = (course['department_code'], course['semester'])
+        for kind, hours in ((THEORY, course['theory']), (PRACTICE, course['practice'])):
+            for length in split_hours(hours):
+                sessions.append(Session(course_id, kind, length, instructors[course['instructor_username']],
+                                        cohort, f"{course['code']} ({kind}{length})"))
+    return TimetableProblem(sessions, rooms)
+
+
+def assert_no_clashes(solution):
+    busy = {}
+    for assignment in solution.assignments:
+        session = assignment.session
+        mask = period_mask(assignment.start, assignment.end)
+        for owner in (('room', assignment.classroom_id), ('instructor', session.instructor_id),
+                      ('cohort', session.cohort)):
+            key = (owner, assignment.day)
+            assert not busy.get(key, 0) & mask, f'{owner} {assignment.day} çakışıyor'
+            busy[key] = busy.get(key, 0) | mask
+
+
+def test_solve_small_problem():
+    problem = synthetic_problem(1)
+    solution = solve(problem)
+
+    assert solution.complete
+    assert len(solution.assignments) == len(problem.sessions)
+    assert_no_clashes(solution)
+
+
+def test_solve_is_deterministic_without_seed():
+    problem = synthetic_problem(1)
+    first = solve(problem).assignments
+    second = solve(problem).assignments
+
+    assert first == second
+
+
+def test_solve_at_scale_does_not_hit_recursion_limit():
+    # Arama derinliği oturum sayısı kadardır; özyinelemeli arama burada RecursionError veriyordu
+    problem = synthetic_problem(15)
+    assert len(problem.sessions) >= 1500
+    assert len(problem.sessions) > sys.getrecursionlimit()
+
+    solution = solve(problem, node_limit=len(problem.sessions) * 4, time_limit=60)
+
+    assert not solution.unplaced
+    assert len(solution.assignments) == len(problem.sessions)
+    assert_no_clashes(solution)
+
+
+def test_solve_reports_sessions_that_do_not_fit():
+    # Tek derslikte her bloğa en fazla bir 3 saatlik oturum sığar (haftada 10); 11. oturum yerleşemez
+    rooms = [Room(1, 'B1', 60, 'NORMAL')]
+    sessions = [Session(course_id, THEORY, 3, course_id, None, f'C{course_id}') for course_id in range(1, 12)]
+    problem = TimetableProblem(sessions, rooms)
+
+    solution = solve(problem, node_limit=2000, time_limit=10)
+
+    assert not solution.complete
+    assert len(solution.assignments) == 10
+    assert len(solution.unplaced) == 1
+    assert_no_clashes(solution)
@@ -0,0 +1,611 @@
+"""
+Otomatik ders programı oluşturma motoru
+
+Ders (teorik / uygulama saatleri, yarıyıl, öğretim üyesi) ve derslik (kapasite,
+tip) bilgilerinden çakışmasız bir haftalık program üretir. Arama, kısıt
+yayılımı (ileri kontrol) ve sezgisel geri izleme ile yapılır:
+- Her adımda en az seçeneği kalan oturum seçilir (MRV)
+- Her atamadan sonra etkilenen oturumların kalan seçenekleri yeniden sayılır,
+  seçeneği kalmayan oturum varsa hemen geri dönülür
+- Değerler derslik uygunluğu, günlük yük ve boşluklara göre sıralanır
+
+Problem ve çözüm düz Python verileriyle temsil edilir; böylece arama
+veritabanından bağımsız çalışır ve ayrı süreçlere gönderilebilir.
+"""
+import random
+import time
+from collections import namedtuple
+
+from models import db, Course, Classroom, Schedule, DAYS, in_active_term, schedule_columns, time_to_minutes
+from occupancy import schedule_index, load_placements
+from versioning import bump_version
+
+# Ders yapılabilecek zaman blokları (öğle arası blokların arasında kalır)
+DAY_BLOCKS = [('08:00', '12:00'), ('13:00', '17:00')]
+
+# Bir ders saatinin süresi (dakika)
+PERIOD_MINUTES = 60
+
+# Tek oturumda art arda yapılabilecek en fazla ders saati
+MAX_SESSION_PERIODS = 3
+
+# Derslik kapasitesi karşılaştırmasında kullanılan varsayılan şube mevcudu
+DEFAULT_GROUP_SIZE = 60
+
+# Oturum türleri
+THEORY = 'T'
+PRACTICE = 'P'
+
+# Yerleştirilecek bir ders oturumu
+Session = namedtuple('Session', [
+    'course_id', 'kind', 'length', 'instructor_id', 'cohort', 'label'
+])
+
+# Derslik bilgisi
+Room = namedtuple('Room', ['id', 'code', 'capacity', 'type'])
+
+# Çözümde bir oturumun yerleşimi
+Assignment = namedtuple('Assignment', [
+    'session', 'classroom_id', 'day', 'start', 'end'
+])
+
+
+def build_periods():
+    """
+    Gün içindeki ders saatlerini ve her saatin ait olduğu bloğu hesaplar
+    :return: [(başlangıç dakika, bitiş dakika, blok no)] listesi
+    """
+    periods = []
+    for block_no, (block_start, block_end) in enumerate(DAY_BLOCKS):
+        start = time_to_minutes(block_start)
+        end = time_to_minutes(block_end)
+        while start + PERIOD_MINUTES <= end:
+            periods.append((start, start + PERIOD_MINUTES, block_no))
+            start += PERIOD_MINUTES
+    return periods
+
+
+PERIODS = build_periods()
+
+
+def period_mask(start, end):
+    """
+    [start, end) dakika aralığıyla kesişen ders saatlerinin bit maskesi
+    """
+    mask = 0
+    for index, (period_start, period_end, _) in enumerate(PERIODS):
+        if period_start < end and period_end > start:
+            mask |= 1 << index
+    return mask
+
+
+def split_hours(hours):
+    """
+    Haftalık ders saatini en fazla MAX_SESSION_PERIODS uzunluğunda, mümkün
+    olduğunca eşit oturumlara böler (örn. 4 -> [2, 2], 5 -> [3, 2])
+    """
+    if not hours or hours <= 0:
+        return []
+    count = -(-hours // MAX_SESSION_PERIODS)
+    base, extra = divmod(hours, count)
+    return [base + 1] * extra + [base] * (count - extra)
+
+
+def is_lab(room_type):
+    """
+    Derslik tipinin laboratuvar olup olmadığını döndürür
+    """
+    return (room_type or '').upper() == 'LAB'
+
+
+def session_starts(length):
+    """
+    Verilen uzunluktaki bir oturumun tek bir blok içinde kalan başlangıç saatleri
+    :param length: Ders saati sayısı
+    :return: [(gün no, ilk ders saati no, ders saatleri maskesi)] listesi
+    """
+    values = []
+    for day in range(len(DAYS)):
+        for first in range(len(PERIODS) - length + 1):
+            block = PERIODS[first][2]
+            if PERIODS[first + length - 1][2] != block:
+                continue
+            mask = ((1 << length) - 1) << first
+            values.append((day, first, mask))
+    return values
+
+
+def room_penalty(room, wants_lab, group_size):
+    """
+    Dersliğin oturuma uygunluk cezası (küçük olan daha uygun)
+    :param room: Room
+    :param wants_lab: Oturum laboratuvar gerektiriyorsa True
+    :param group_size: Beklenen şube mevcudu
+    """
+    penalty = 0.0
+    if is_lab(room.type) != wants_lab:
+        penalty += 50
+    if group_size:
+        if room.capacity >= group_size:
+            # Kapasite fazlası ne kadar azsa o kadar iyi
+            penalty += 5.0 * (room.capacity - group_size) / group_size
+        else:
+            penalty += 20 + 20.0 * (group_size - room.capacity) / group_size
+    return penalty
+
+
+class TimetableProblem:
+    """
+    Veritabanından bağımsız program oluşturma problemi
+
+    :param sessions: Yerleştirilecek Session listesi
+    :param rooms: Room listesi
+    :param pinned: Yerinde kalacak program öğeleri (Placement listesi)
+    :param group_size: Derslik kapasitesi için beklenen şube mevcudu
+    """
+
+    def __init__(self, sessions, rooms, pinned=(), group_size=DEFAULT_GROUP_SIZE):
+        self.sessions = list(sessions)
+        self.rooms = list(rooms)
+        self.pinned = list(pinned)
+        self.group_size = group_size
+
+    @property
+    def pinned_ids(self):
+        return [placement.id for placement in self.pinned]
+
+
+def load_problem(group_size=DEFAULT_GROUP_SIZE):
+    """
+    Mevcut ders, derslik ve programdan bir TimetableProblem oluşturur
+
+    Sabit saatli (has_fixed_time) dersler ile saat bilgisi girilmemiş derslerin
+    mevcut program öğeleri yerinde bırakılır; diğer dersler için teorik ve
+    uygulama saatlerinden oturumlar üretilir.
+    :param group_size: Beklenen şube mevcudu
+    :return: TimetableProblem
+    """
+    courses = Course.query.order_by(Course.id).all()
+    rooms = [Room(room.id, room.code, room.capacity or 0, room.type)
+             for room in Classroom.query.order_by(Classroom.code).all()]
+    placements = load_placements()
+
+    sessions = []
+    generated = set()
+    for course in courses:
+        theory_parts = split_hours(course.theory)
+        practice_parts = split_hours(course.practice)
+        if course.has_fixed_time or not (theory_parts or practice_parts):
+            continue
+        generated.add(course.id)
+        cohort = (course.department_id, course.semester) if course.department_id else None
+        for kind, parts in ((THEORY, theory_parts), (PRACTICE, practice_parts)):
+            for length in parts:
+                sessions.append(Session(course.id, kind, length, course.instructor_id,
+                                        cohort, f'{course.code} ({kind}{length})'))
+
+    # Oluşturulacak derslere ait olmayan mevcut öğeler sabit kabul edilir
+    pinned = [placement for placement in placements if placement.course_id not in generated]
+    return TimetableProblem(sessions, rooms, pinned, group_size)
+
+
+class TimetableSolution:
+    """
+    Arama sonucu: yerleştirilen ve yerleştirilemeyen oturumlar
+    """
+
+    def __init__(self, assignments, unplaced, nodes, elapsed, complete):
+        self.assignments = assignments
+        self.unplaced = unplaced
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.complete = complete
+
+    def summary(self):
+        """
+        Sonucun kısa özetini sözlük olarak döndürür
+        """
+        return {
+            'placed': len(self.assignments),
+            'unplaced': [session.label for session in self.unplaced],
+            'nodes': self.nodes,
+            'elapsed': round(self.elapsed, 3),
+            'complete': self.complete,
+        }
+
+
+class Solver:
+    """
+    İleri kontrollü, MRV sezgisel geri izleme araması
+
+    construct() programı oluşturur; candidates(), place() ve remove() oluşturulan
+    program üzerinde yerel arama (portfolio.improve) yapmak için kullanılır.
+    """
+
+    def __init__(self, problem, rng=None, node_limit=20000, time_limit=10.0, strict_room_types=True,
+                 preferences=None):
+        self.problem = problem
+        self.rng = rng
+        self.preferences = preferences or {}
+        self.node_limit = node_limit
+        self.deadline = time.monotonic() + time_limit if time_limit else None
+        self.strict_room_types = strict_room_types
+        self.nodes = 0
+        self.exhausted = False
+
+        self.sessions = problem.sessions
+        self.rooms = problem.rooms
+        days = len(DAYS)
+
+        # Kaynakların gün bazında dolu ders saatleri
+        self.room_busy = [[0] * days for _ in self.rooms]
+        self.instructor_busy = {}
+        self.cohort_busy = {}
+        for session in self.sessions:
+            if session.instructor_id:
+                self.instructor_busy.setdefault(session.instructor_id, [0] * days)
+            if session.cohort:
+                self.cohort_busy.setdefault(session.cohort, [0] * days)
+
+        # Derslik grupları: oturum türüne göre uygun derslikler
+        lab_rooms = [i for i, room in enumerate(self.rooms) if is_lab(room.type)]
+        normal_rooms = [i for i, room in enumerate(self.rooms) if not is_lab(room.type)]
+        self.groups = {'LAB': lab_rooms, 'NORMAL': normal_rooms, 'ALL': list(range(len(self.rooms)))}
+        self.room_groups = [[name for name, members in self.groups.items() if i in members]
+                            for i in range(len(self.rooms))]
+        # Gruptaki tüm dersliklerin dolu olduğu saatler (boş grupta her saat dolu sayılır)
+        self.group_full = {name: [0 if members else -1] * days for name, members in self.groups.items()}
+
+        # Sabit öğeleri işaretle
+        room_index = {room.id: i for i, room in enumerate(self.rooms)}
+        day_index = {day: i for i, day in enumerate(DAYS)}
+        for placement in problem.pinned:
+            day = day_index.get(placement.day)
+            if day is None:
+                continue
+            mask = period_mask(placement.start, placement.end)
+            if placement.classroom_id in room_index:
+                self.room_busy[room_index[placement.classroom_id]][day] |= mask
+            if placement.instructor_id in self.instructor_busy:
+                self.instructor_busy[placement.instructor_id][day] |= mask
+            cohort = (placement.department_id, placement.semester)
+            if cohort in self.cohort_busy:
+                self.cohort_busy[cohort][day] |= mask
+        for day in range(days):
+            self._refresh_group_full(range(len(self.rooms)), day)
+
+        # Oturum uzunluğuna göre olası (gün, başlangıç saati, maske) değerleri
+        self.time_values = {}
+        for session in self.sessions:
+            if session.length not in self.time_values:
+                self.time_values[session.length] = session_starts(session.length)
+
+        # Oturum bazında uygun derslikler (tercih sırasına göre) ve cezaları
+        self.room_choices = [self._room_choices(session) for session in self.sessions]
+        self.session_group = [self._session_group(session) for session in self.sessions]
+
+        # Aynı öğretim üyesini veya sınıf grubunu paylaşan oturumlar
+        by_instructor, by_cohort = {}, {}
+        for i, session in enumerate(self.sessions):
+            if session.instructor_id:
+                by_instructor.setdefault(session.instructor_id, []).append(i)
+            if session.cohort:
+                by_cohort.setdefault(session.cohort, []).append(i)
+        self.neighbours = []
+        for i, session in enumerate(self.sessions):
+            related = set(by_instructor.get(session.instructor_id, ())) | set(by_cohort.get(session.cohort, ()))
+            related.discard(i)
+            self.neighbours.append(related)
+        self.by_group = {}
+        for i, group in enumerate(self.session_group):
+            self.by_group.setdefault(group, []).append(i)
+
+        self.assignment = {}
+        self.course_days = {}
+        self.unassigned = set(range(len(self.sessions)))
+        self.domain_size = {i: self._domain_size(i) for i in self.unassigned}
+
+    # ------------------------------------------------------------------
+    # Hazırlık
+    # ------------------------------------------------------------------
+    def _session_group(self, session):
+        if not self.strict_room_types:
+            return 'ALL'
+        return 'LAB' if session.kind == PRACTICE else 'NORMAL'
+
+    def _room_choices(self, session):
+        wants_lab = session.kind == PRACTICE
+        group_size = self.problem.group_size
+        choices = []
+        for i in self.groups[self._session_group(session)]:
+            room = self.rooms[i]
+            choices.append((room_penalty(room, wants_lab, group_size), room.code, i))
+        choices.sort()
+        return [(penalty, i) for penalty, _, i in choices]
+
+    def _refresh_group_full(self, room_indexes, day):
+        groups = set()
+        for i in room_indexes:
+            groups.update(self.room_groups[i])
+        changed = False
+        for group in groups:
+            full = -1
+            for i in self.groups[group]:
+                full &= self.room_busy[i][day]
+            if self.group_full[group][day] != full:
+                self.group_full[group][day] = full
+                changed = True
+        return groups if changed else set()
+
+    # ------------------------------------------------------------------
+    # Kısıt kontrolleri
+    # ------------------------------------------------------------------
+    def _busy(self, index, day):
+        session = self.sessions[index]
+        busy = self.group_full[self.session_group[index]][day]
+        if session.instructor_id:
+            busy |= self.instructor_busy[session.instructor_id][day]
+        if session.cohort:
+            busy |= self.cohort_busy[session.cohort][day]
+        return busy
+
+    def _domain_size(self, index):
+        # Derslikler saat saat değerlendirildiği için bu sayı iyimser bir üst sınırdır
+        count = 0
+        busy_by_day = [self._busy(index, day) for day in range(len(DAYS))]
+        for day, _, mask in self.time_values[self.sessions[index].length]:
+            if not busy_by_day[day] & mask:
+                count += 1
+        return count
+
+    def _values(self, index):
+        session = self.sessions[index]
+        values = []
+        for day, first, mask in self.time_values[session.length]:
+            busy = 0
+            if session.instructor_id:
+                busy |= self.instructor_busy[session.instructor_id][day]
+            if session.cohort:
+                busy |= self.cohort_busy[session.cohort][day]
+            if busy & mask:
+                continue
+            room = None
+            for penalty, i in self.room_choices[index]:
+                if not self.room_busy[i][day] & mask:
+                    room = (penalty, i)
+                    break
+            if room is None:
+                continue
+            score = room[0] + self._placement_penalty(session, day, first, mask)
+            if index in self.preferences:
+                # Tercih edilen güne ve saate uzaklık kadar ceza
+                preferred_day, preferred_first = self.preferences[index]
+                score += 30 * abs(day - preferred_day) + 5 * abs(first - preferred_first)
+            if self.rng is not None:
+                score += self.rng.random() * 4
+            values.append((score, day, first, mask, room[1]))
+        values.sort()
+        return values
+
+    def _placement_penalty(self, session, day, first, mask):
+        penalty = 0.1 * first
+        # Aynı dersin oturumlarını farklı günlere dağıt
+        penalty += 10 * self.course_days.get((session.course_id, day), 0)
+        if session.cohort:
+            cohort_mask = self.cohort_busy[session.cohort][day]
+            load = bin(cohort_mask).count('1')
+            penalty += 2 * load
+            # Sınıf grubunun o günkü derslerine bitişik yerleşimi tercih et
+            if cohort_mask and not ((mask << 1) | (mask >> 1)) & cohort_mask:
+                penalty += 3
+        return penalty
+
+    # ------------------------------------------------------------------
+    # Atama
+    # ------------------------------------------------------------------
+    def _assign(self, index, day, first, mask, room):
+        session = self.sessions[index]
+        self.nodes += 1
+        self.unassigned.discard(index)
+        self.assignment[index] = (day, first, mask, room)
+        self.room_busy[room][day] |= mask
+        if session.instructor_id:
+            self.instructor_busy[session.instructor_id][day] |= mask
+        if session.cohort:
+            self.cohort_busy[session.cohort][day] |= mask
+        key = (session.course_id, day)
+        self.course_days[key] = self.course_days.get(key, 0) + 1
+        return self._refresh_group_full([room], day)
+
+    def _unassign(self, index):
+        session = self.sessions[index]
+        day, first, mask, room = self.assignment.pop(index)
+        self.unassigned.add(index)
+        self.room_busy[room][day] &= ~mask
+        if session.instructor_id:
+            self.instructor_busy[session.instructor_id][day] &= ~mask
+        if session.cohort:
+            self.cohort_busy[session.cohort][day] &= ~mask
+        key = (session.course_id, day)
+        self.course_days[key] -= 1
+        changed = self._refresh_group_full([room], day)
+        self._update_domains(index, changed)
+
+    def _update_domains(self, index, changed_groups):
+        """
+        Atamadan etkilenen oturumların kalan seçeneklerini yeniden sayar
+        :return: Seçeneği kalmayan oturum yoksa True
+        """
+        affected = set(self.neighbours[index])
+        for group in changed_groups:
+            affected.update(self.by_group.get(group, ()))
+        ok = True
+        for other in affected:
+            if other in self.unassigned:
+                size = self._domain_size(other)
+                self.domain_size[other] = size
+                if size == 0:
+                    ok = False
+        return ok
+
+    def _select(self):
+        def key(index):
+            session = self.sessions[index]
+            tie = self.rng.random() if self.rng is not None else index
+            return (self.domain_size[index], -session.length, -len(self.neighbours[index]), tie)
+        return min(self.unassigned, key=key)
+
+    def _budget_exhausted(self):
+        if not self.exhausted:
+            if self.nodes >= self.node_limit or (self.deadline and time.monotonic() > self.deadline):
+                self.exhausted = True
+        return self.exhausted
+
+    # ------------------------------------------------------------------
+    # Arama
+    # ------------------------------------------------------------------
+    def _backtrack(self):
+        """
+        Geri izleme araması; özyineleme yerine açık bir yığın kullanılır, böylece
+        arama derinliği (oturum sayısı) Python'un özyineleme sınırına takılmaz
+        :return: Tüm oturumlar yerleştirildiyse True
+        """
+        # Yığın çerçevesi: (oturum indeksi, denenmemiş değerler)
+        stack = []
+        descend = True
+        while True:
+            if descend:
+                if not self.unassigned:
+                    return True
+                if self._budget_exhausted():
+                    return False
+                index = self._select()
+                stack.append((index, iter(self._values(index))))
+            index, values = stack[-1]
+            if index in self.assignment:
+                # Önceki değer başarısız oldu
+                if self.exhausted:
+                    # Bütçe bitti: mevcut kısmi atamayı koru, kalanları açgözlü yerleştir
+                    return False
+                self._unassign(index)
+            value = next(values, None)
+            if value is None:
+                # Değerler tükendi: bir üst oturumun sonraki değerine dön
+                stack.pop()
+                if not stack:
+                    return False
+                descend = False
+                continue
+            _, day, first, mask, room = value
+            changed = self._assign(index, day, first, mask, room)
+            descend = self._update_domains(index, changed)
+
+    def _greedy(self):
+        """
+        Kalan oturumları geri izleme yapmadan yerleştirir; yer bulunamayanların
+        indekslerini döndürür
+        """
+        unplaced = []
+        while self.unassigned:
+            index = self._select()
+            values = self._values(index)
+            if not values:
+                self.unassigned.discard(index)
+                unplaced.append(index)
+                continue
+            _, day, first, mask, room = values[0]
+            changed = self._assign(index, day, first, mask, room)
+            self._update_domains(index, changed)
+        return unplaced
+
+    # ------------------------------------------------------------------
+    # Genel arayüz
+    # ------------------------------------------------------------------
+    def construct(self):
+        """
+        Programı oluşturur: geri izleme araması, bütçe biterse kalan oturumların açgözlü yerleştirilmesi
+        :return: Yerleştirilemeyen oturumların indeksleri
+        """
+        if self._backtrack():
+            return []
+        return self._greedy()
+
+    def candidates(self, index):
+        """
+        Atanmamış bir oturumun kısıtlara uyan yerleşimleri (iyiden kötüye)
+        :return: [(sıralama puanı, gün no, ilk ders saati, maske, derslik indeksi)] listesi
+        """
+        return self._values(index)
+
+    def place(self, index, day, first, mask, room):
+        """
+        Oturumu verilen yerleşime atar (yerleşim candidates() ile alınmış olmalıdır)
+        """
+        changed = self._assign(index, day, first, mask, room)
+        self._update_domains(index, changed)
+
+    def remove(self, index):
+        """
+        Atanmış bir oturumu yerinden çıkarır
+        :return: Oturumun eski yerleşimi (gün no, ilk ders saati, maske, derslik indeksi)
+        """
+        placement = self.assignment[index]
+        self._unassign(index)
+        return placement
+
+    def run(self):
+        started = time.monotonic()
+        unplaced = [self.sessions[index] for index in self.construct()]
+        return TimetableSolution(self.assignments(), unplaced, self.nodes,
+                                 time.monotonic() - started, not self.exhausted and not unplaced)
+
+    def assignments(self):
+        result = []
+        for index, (day, first, mask, room) in sorted(self.assignment.items()):
+            session = self.sessions[index]
+            start = PERIODS[first][0]
+            end = PERIODS[first + session.length - 1][1]
+            result.append(Assignment(session, self.rooms[room].id, DAYS[day], start, end))
+        return result
+
+
+def solve(problem, seed=None, node_limit=20000, time_limit=10.0, strict_room_types=True, preferences=None):
+    """
+    Verilen problem için ders programı arar
+    :param problem: TimetableProblem
+    :param seed: Rastgele eşitlik bozma için tohum (None ise deterministik)
+    :param node_limit: Geri izlemede denenecek en fazla atama sayısı
+    :param time_limit: Saniye cinsinden süre sınırı
+    :param strict_room_types: True ise uygulama oturumları sadece LAB, teorik
+        oturumlar sadece normal dersliklere yerleştirilir
+    :param preferences: Oturum indeksi -> (gün indeksi, ilk ders saati) tercihleri;
+        oturumlar bu konuma yakın yerleşimlere öncelik verir
+    :return: TimetableSolution
+    """
+    rng = random.Random(seed) if seed is not None else None
+    return Solver(problem, rng, node_limit, time_limit, strict_room_types, preferences).run()
+
+
+def apply_solution(problem, solution):
+    """
+    Çözümü tek bir işlemde schedule_items tablosuna (aktif döneme) yazar; aktif dönemin
+    sabit öğeler dışındaki mevcut program öğeleri silinir
+    :param problem: Çözümün üretildiği TimetableProblem
+    :param solution: TimetableSolution
+    :return: Eklenen program öğesi sayısı
+    """
+    try:
+        Schedule.query.filter(in_active_term(), ~Schedule.id.in_(problem.pinned_ids)).delete(synchronize_session=False)
+        bump_version()
+        db.session.bulk_insert_mappings(Schedule, [
+            dict(schedule_columns(assignment.day, assignment.start, assignment.end),
+                 course_id=assignment.session.course_id,
+                 classroom_id=assignment.classroom_id)
+            for assignment in solution.assignments
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    schedule_index.invalidate()
+    return len(solution.assignments)
@@ -0,0 +1,86 @@
+"""
+Giriş yapmış kullanıcılar için süreç içi önbellek
+
+Flask-Login her istekte oturumdaki kullanıcıyı user_loader ile yükler. Bu
+önbellek kullanıcı satırının sütun değerlerini, okundukları kullanıcı sürümüyle
+birlikte belirli bir süre (TTL) saklar; istek sırasında kullanıcı nesnesi bu
+değerlerden oluşturulup session.merge(load=False) ile oturuma bağlanır.
+
+Kullanıcı sürümü sadece kullanıcı tablosundaki yazmalarda artar (versioning);
+başka bir sunucu sürecinde rolü değiştirilen veya silinen kullanıcının kaydı
+bir sonraki istekte geçersiz sayılır, program / ders / derslik yazmaları ise
+önbelleği boşaltmaz. Sürüm veri sürümüyle aynı sorguda, istek başına bir kez
+okunur.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from models import db, User
+from versioning import current_user_version
+
+
+class UserCache:
+    """
+    Kullanıcı kimliğine göre, süreli ve en son kullanılanları tutan (LRU) önbellek
+    :param maxsize: Tutulacak en fazla kullanıcı sayısı
+    :param ttl: Bir kaydın geçerli kalacağı süre (saniye)
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, user_id, version):
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            values, expires, entry_version = entry
+            if expires <= time.monotonic() or entry_version != version:
+                del self._data[user_id]
+                return None
+            self._data.move_to_end(user_id)
+            return values
+
+    def _set(self, user_id, values, version):
+        with self._lock:
+            self._data[user_id] = (values, time.monotonic() + self.ttl, version)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def load(self, user_id):
+        """
+        Kullanıcıyı önbellekten veya (yoksa) veritabanından yükler
+        :param user_id: Kullanıcı kimlik numarası
+        :return: Aktif oturuma bağlı User nesnesi veya None
+        """
+        version = current_user_version()
+        values = self._get(user_id, version)
+        if values is None:
+            user = User.query.get(user_id)
+            if user is None:
+                return None
+            self._set(user_id, {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}, version)
+            return user
+
+        # Önbellekteki değerlerden kalıcı (detached) bir nesne oluşturup sorgusuz bağla
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, user_id=None):
+        """
+        Bir kullanıcının (veya user_id verilmezse tüm kullanıcıların) kaydını siler
+        """
+        with self._lock:
+            if user_id is None:
+                self._data.clear()
+            else:
+                self._data.pop(user_id, None)
@@ -0,0 +1,180 @@
+"""
+Veri sürümü sayacı ve sürüme bağlı önbellek
+
+Program, ders, derslik, bölüm, kullanıcı veya dönem tablolarında yapılan her yazma
+işlemi app_state tablosundaki sürüm sayacını aynı veritabanı işlemi içinde bir
+artırır. Önbellekler anahtarlarına bu sürümü ekler; böylece birden fazla
+sunucu süreci çalışırken de hiçbir süreç eski veriyi göstermez.
+
+Kullanıcı tablosundaki yazmalar ayrıca yalnızca kullanıcılar için tutulan
+ikinci bir sayacı artırır; giriş yapmış kullanıcı önbelleği (user_cache) bu
+sayaca bağlıdır ve program / ders / derslik yazmalarında boşaltılmaz. İki
+sayaç bir istekte tek sorguyla okunur.
+"""
+import threading
+from collections import OrderedDict
+from itertools import chain
+
+from flask import g, has_request_context
+from sqlalchemy import event, insert, select, update
+
+from models import db, AppState, Classroom, Course, Department, Schedule, Term, User
+
+# Sürüm sayaçlarının app_state tablosundaki anahtarları
+SCHEDULE_VERSION = 'schedule_version'
+USER_VERSION = 'user_version'
+
+# Değiştiğinde sürümü artıran modeller
+TRACKED_MODELS = (Schedule, Course, Classroom, Department, User, Term)
+
+# İş parçacığının son commit ettiği sürüm
+_local = threading.local()
+
+
+def _versions():
+    # Veri ve kullanıcı sürümünü tek sorguda okur; istek içinde bir kez okunur (kullanıcı yükleme,
+    # önbellekler ve ETag'ler aynı değerleri paylaşır), istek sırasında yapılan commit değerleri sıfırlar
+    if has_request_context() and 'versions' in g:
+        return g.versions
+    values = dict(db.session.query(AppState.key, AppState.value)
+                  .filter(AppState.key.in_((SCHEDULE_VERSION, USER_VERSION))))
+    versions = (values.get(SCHEDULE_VERSION) or 0, values.get(USER_VERSION) or 0)
+    if has_request_context():
+        g.versions = versions
+    return versions
+
+
+def current_version():
+    """
+    Veritabanındaki güncel veri sürümünü döndürür
+    """
+    return _versions()[0]
+
+
+def current_user_version():
+    """
+    Veritabanındaki güncel kullanıcı sürümünü döndürür (sadece kullanıcı yazmalarında artar)
+    """
+    return _versions()[1]
+
+
+def _increment(connection, key):
+    # Sayacı bir artırır (satır yoksa oluşturur)
+    table = AppState.__table__
+    result = connection.execute(update(table).where(table.c.key == key).values(value=table.c.value + 1))
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(key=key, value=1))
+
+
+def bump_version(session=None):
+    """
+    Aktif veritabanı işlemi içinde veri sürümünü bir artırır (işlem başına bir kez)
+
+    Toplu yazma işlemleri (bulk_insert_mappings, query.delete vb.) oturum
+    olaylarını tetiklemediği için bu fonksiyonu doğrudan çağırmalıdır.
+    :param session: Veritabanı oturumu (varsayılan: db.session)
+    :return: İşlem commit edildiğinde geçerli olacak sürüm
+    """
+    session = session if session is not None else db.session
+    if session.info.get('version_bumped'):
+        return session.info['pending_version']
+
+    table = AppState.__table__
+    connection = session.connection()
+    _increment(connection, SCHEDULE_VERSION)
+    version = connection.execute(select(table.c.value).where(table.c.key == SCHEDULE_VERSION)).scalar()
+    session.info['version_bumped'] = True
+    session.info['pending_version'] = version
+    return version
+
+
+def bump_user_version(session=None):
+    """
+    Aktif veritabanı işlemi içinde kullanıcı sürümünü bir artırır (işlem başına bir kez)
+    Kullanıcıları toplu güncelleyen veya silen işlemler bu fonksiyonu doğrudan çağırmalıdır.
+    :param session: Veritabanı oturumu (varsayılan: db.session)
+    """
+    session = session if session is not None else db.session
+    if not session.info.get('user_version_bumped'):
+        _increment(session.connection(), USER_VERSION)
+        session.info['user_version_bumped'] = True
+
+
+def committed_version():
+    """
+    Bu iş parçacığında son commit edilen işlemin ürettiği sürümü döndürür
+    :return: Sürüm veya son işlem sürümü değiştirmediyse None
+    """
+    return getattr(_local, 'committed_version', None)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _track_changes(session, flush_context):
+    # Takip edilen modellerden birinde değişiklik varsa veri sürümünü, kullanıcı değiştiyse kullanıcı sürümünü artır
+    if session.info.get('version_bumped') and session.info.get('user_version_bumped'):
+        return
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, TRACKED_MODELS):
+            bump_version(session)
+        if isinstance(instance, User):
+            bump_user_version(session)
+            return
+
+
+@event.listens_for(db.session, 'after_commit')
+def _remember_version(session):
+    _local.committed_version = session.info.pop('pending_version', None)
+    session.info.pop('version_bumped', None)
+    session.info.pop('user_version_bumped', None)
+    if has_request_context():
+        g.pop('versions', None)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _forget_version(session, previous_transaction):
+    session.info.pop('pending_version', None)
+    session.info.pop('version_bumped', None)
+    session.info.pop('user_version_bumped', None)
+
+
+class VersionedCache:
+    """
+    Veri sürümüne bağlı, en son kullanılanları tutan (LRU) süreç içi önbellek
+
+    Anahtarlar (sürüm, ...) biçimindedir; sürüm değiştiğinde eski girdiler
+    kullanılmaz hale gelir ve zamanla önbellekten düşer.
+    :param maxsize: Tutulacak en fazla girdi sayısı
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """
+        Anahtar önbellekte yoksa factory() ile üretip saklar
+        """
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()